@@ -1,11 +1,18 @@
 """
 Automation Agent — System control (open apps, create folders, run commands).
+Apps are resolved through the cached AppIndex and launched without a shell.
+Commands run as async subprocesses via ProcessService; their output streams
+line by line to the requesting client. A foreground command that outlives
+the request deadline is left running in the background and reported by id.
 """
 
+import asyncio
 import os
-import subprocess
 from typing import Any, Dict
 
+from app.config import settings
+from services.app_index import app_index
+from services.process_service import process_service
 from .base import BaseAgent
 
 
@@ -23,25 +30,23 @@ class AutomationAgent(BaseAgent):
 
         try:
             if action == "open_application":
-                app_name = parameters.get("app_name")
-                print(f"Attempting to open {app_name}...")
-
-                try:
-                    known_apps = {
-                        "notepad", "calc", "calculator", "mspaint", "cmd", "explorer"
-                    }
-                    if app_name.lower() in known_apps:
-                        subprocess.Popen(app_name)
-                    elif app_name.lower() == "chrome":
-                        subprocess.Popen(["start", "chrome"], shell=True)
-                    elif app_name.lower() == "vscode":
-                        subprocess.Popen(["code"], shell=True)
-                    else:
-                        subprocess.Popen(["start", app_name], shell=True)
-                    result["details"] = f"Launched {app_name}"
-                except Exception as e:
+                app_name = parameters.get("app_name") or parameters.get("query") or ""
+                entry = await asyncio.to_thread(app_index.resolve, app_name)
+                if entry is None:
                     result["status"] = "error"
-                    result["error"] = f"Failed to open {app_name}: {e}"
+                    result["error"] = f"No installed application matches '{app_name}'"
+                else:
+                    try:
+                        pid = await asyncio.to_thread(app_index.launch, entry)
+                        result["details"] = f"Launched {entry.name}"
+                        result["pid"] = pid
+                        result["command"] = entry.argv
+                    except OSError as e:
+                        result["status"] = "error"
+                        result["error"] = f"Failed to open {entry.name}: {e}"
+
+            elif action == "find_application":
+                result["details"] = await asyncio.to_thread(app_index.search, parameters.get("app_name", ""))
 
             elif action == "create_folder":
                 folder_name = parameters.get("folder_name")
@@ -50,13 +55,42 @@ class AutomationAgent(BaseAgent):
 
             elif action == "execute_command":
                 cmd = parameters.get("command")
-                print(f"Executing shell command: {cmd}")
-                process = subprocess.Popen(
-                    cmd, shell=True,
-                    stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
-                )
-                stdout, stderr = process.communicate()
-                result["details"] = stdout if stdout else stderr
+                if not cmd:
+                    return {"status": "error", "agent": "AutomationAgent", "action": action, "error": "No command given"}
+                if parameters.get("background"):
+                    timeout = parameters.get("timeout") or settings.PROC_BACKGROUND_TIMEOUT
+                    proc = await process_service.start(cmd, timeout=timeout)
+                    result["process_id"] = proc.id
+                    result["details"] = f"Started in background (process {proc.id})"
+                else:
+                    proc = await process_service.run(
+                        cmd, timeout=parameters.get("timeout"), wait=self.deadline.timeout()
+                    )
+                    if proc.status == "running":
+                        self.deadline.cut("AutomationAgent.execute_command")
+                        result.update(process_id=proc.id, exit_status="running")
+                        result["details"] = f"Still running, moved to background (process {proc.id})"
+                        return result
+                    stdout, stderr = proc.text("stdout"), proc.text("stderr")
+                    result["details"] = stdout if stdout else stderr
+                    result.update(
+                        process_id=proc.id, returncode=proc.returncode,
+                        exit_status=proc.status, truncated=proc.truncated,
+                    )
+                    if proc.status != "exited":
+                        result["status"] = "error"
+                        result["error"] = f"Command {proc.status} (rc={proc.returncode})"
+
+            elif action == "list_processes":
+                result["details"] = process_service.list()
+
+            elif action == "cancel_process":
+                process_id = parameters.get("process_id")
+                if not await process_service.cancel(process_id):
+                    result["status"] = "error"
+                    result["error"] = f"No running process {process_id}"
+                else:
+                    result["details"] = f"Cancelled process {process_id}"
 
         except Exception as e:
             result["status"] = "error"
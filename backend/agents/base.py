@@ -1,5 +1,8 @@
 from abc import ABC, abstractmethod
 from typing import Any, Dict, List
+from app.config import settings
+from services.agent_cache import CachePolicy, agent_cache, make_key
+from utils.deadline import Deadline, current_deadline, use_deadline
 from utils.logger import log
 
 
@@ -13,11 +16,44 @@ class BaseAgent(ABC):
         self.name = name
         self.description = description
 
-    async def execute(self, command: str, context: Dict[str, Any] = None) -> Dict[str, Any]:
-        """Wrapper with logging and error handling."""
+    # Per-action result caching; actions without a policy are never cached
+    cache_policies: Dict[str, CachePolicy] = {}
+
+    async def execute(
+        self, command: str, context: Dict[str, Any] = None, deadline: Deadline = None
+    ) -> Dict[str, Any]:
+        """Wrapper with caching, logging, error handling and deadline propagation."""
+        policy = self.cache_policies.get(command)
+        if policy is None or not settings.AGENT_CACHE_ENABLED:
+            return await self._execute(command, context, deadline)
+
+        key = make_key(self.name, command, context, policy)
+        return await agent_cache.get_or_compute(
+            key,
+            policy,
+            lambda: self._execute_cacheable(command, context, deadline),
+            # Background revalidation is not tied to any request's deadline
+            refresh=lambda: self._execute_cacheable(command, context, Deadline()),
+        )
+
+    async def _execute_cacheable(
+        self, command: str, context: Dict[str, Any], deadline: Deadline = None
+    ) -> Dict[str, Any]:
+        """Run the action, marking results degraded by the deadline as uncacheable."""
+        deadline = deadline or current_deadline()
+        cuts_before = len(deadline.stages_cut)
+        result = await self._execute(command, context, deadline)
+        if len(deadline.stages_cut) > cuts_before and isinstance(result, dict):
+            result["degraded"] = True
+        return result
+
+    async def _execute(
+        self, command: str, context: Dict[str, Any] = None, deadline: Deadline = None
+    ) -> Dict[str, Any]:
         log.info(f"[{self.name}] Processing: {command[:50]}...")
         try:
-            result = await self.process_request(command, context)
+            with use_deadline(deadline or current_deadline()):
+                result = await self.process_request(command, context)
             log.success(f"[{self.name}] Processing complete.")
             return result
         except Exception as e:
@@ -31,6 +67,11 @@ class BaseAgent(ABC):
         """Process a user command and return a structured result."""
         pass
 
+    @property
+    def deadline(self) -> Deadline:
+        """Deadline of the request currently being processed."""
+        return current_deadline()
+
     @property
     def tools(self) -> List[Dict[str, Any]]:
         """Return list of tools this agent provides to the ChiefAgent/LLM."""
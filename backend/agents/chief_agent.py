@@ -4,15 +4,22 @@ Chief Agent — Main orchestrator for JARVIS.
 Routes user commands to specialized agents via LLM.
 """
 
+import asyncio
 import json
 import re
+import time
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 from langchain_ollama import OllamaLLM
 
 from app.config import settings
+from utils.deadline import Deadline
 from utils.logger import log
+from services.interaction_log import interaction_log
+from services.session_service import estimate_tokens, session_service, truncate_to_tokens
+from services.memory_lifecycle import memory_compactor
+from services.process_service import use_output_sink
 from schemas.command_schema import AgentAction, AgentResponse
 
 from .automation_agent import AutomationAgent
@@ -25,6 +32,15 @@ from .vision_agent import VisionAgent
 from .voice_agent import VoiceAgent
 from .search_agent import SearchAgent
 
+# (agent, action) results that may carry command output or secrets: sent in
+# full only to the requesting socket, redacted for everyone else and the log
+PRIVATE_RESULTS = {
+    ("AutomationAgent", "execute_command"),
+    ("AutomationAgent", "list_processes"),
+    ("AutomationAgent", "cancel_process"),
+    ("VisionAgent", "analyze_screen"),
+}
+
 
 class ChiefAgent(BaseAgent):
     def __init__(self):
@@ -38,14 +54,19 @@ class ChiefAgent(BaseAgent):
         self.video_agent = VideoAgent()
         self.search_agent = SearchAgent()
 
-        # Ollama LLM via LangChain (Deterministic)
-        self.llm = OllamaLLM(
-            base_url=settings.OLLAMA_BASE_URL,
-            model=settings.LLM_MODEL,
-            temperature=0.0,
-            stop=["\n\n", "User:", "###"],
-            num_predict=256,
-        )
+        # Ollama LLMs via LangChain (Deterministic), one tier per call site.
+        # Routing stays on the small model; briefings/summaries can be pointed elsewhere.
+        self._llm_pool: Dict[tuple, OllamaLLM] = {}
+        self.llm = self._get_llm(settings.LLM_ROUTER_MODEL, settings.LLM_ROUTER_NUM_PREDICT)
+        self.briefing_llm = self._get_llm(settings.LLM_BRIEFING_MODEL, settings.LLM_BRIEFING_NUM_PREDICT)
+        self.summary_llm = self._get_llm(settings.LLM_SUMMARY_MODEL, settings.LLM_SUMMARY_NUM_PREDICT)
+        self.briefing_stats = {"generated": 0, "truncated": 0, "skipped": 0, "failed": 0}
+        self.memory_stats = {
+            "injected": 0, "empty": 0, "skipped_deadline": 0, "skipped_timeout": 0, "failed": 0,
+            "memories": 0, "added_ms_total": 0.0, "last_added_ms": 0.0,
+        }
+        session_service.set_summarizer(self._summarise_turns)
+        memory_compactor.set_summarizer(self._summarise_memories)
 
         self.system_prompt = """You are JARVIS, a world-class AI system controller (Project AVALON).
 [BEHAVIOR]
@@ -58,13 +79,16 @@ class ChiefAgent(BaseAgent):
 - Never output conversational text outside the JSON.
 
 [AGENTS]
-- SearchAgent (web_search): For news, facts, and general knowledge.
+- SearchAgent (web_search): For news, facts, and general knowledge. Add "deep": true to its parameters to read the top pages for detailed questions.
 - ImageAgent (fetch_image): For photos, portraits, and pictures.
 - VideoAgent (fetch_video): For video clips.
-- AutomationAgent (open_application): To open apps like Chrome, Notepad, VSCode.
-- VisionAgent (capture_frame): To analyze the camera feed.
+- AutomationAgent (open_application): To open apps like Chrome, Notepad, VSCode. Use action execute_command with parameters {"command": ...} to run a shell command (add "background": true for long-running ones); list_processes and cancel_process manage them.
+- VisionAgent (capture_frame): To analyze the camera feed. Use action analyze_screen to read what is on the user's screen.
 - CanvasAgent: To draw shapes.
 
+[MEMORY]
+- Facts the user told you earlier may be listed under [MEMORY]; use them to resolve "my", "home", names and preferences.
+
 [ENTITY RESOLUTION]
 - For images of people, include country and profession.
 - Example: "suriya pic" -> ImageAgent, resolved_query: "Suriya Tamil actor India official portrait"
@@ -77,6 +101,20 @@ class ChiefAgent(BaseAgent):
   "response_to_user": "Your spoken reply"
 }"""
 
+    # ── Model Tiers ──────────────────────────────────
+    def _get_llm(self, model: str, num_predict: int) -> OllamaLLM:
+        """Return a shared client per (model, num_predict) tier."""
+        key = (model or settings.LLM_MODEL, num_predict)
+        if key not in self._llm_pool:
+            self._llm_pool[key] = OllamaLLM(
+                base_url=settings.OLLAMA_BASE_URL,
+                model=key[0],
+                temperature=0.0,
+                stop=["\n\n", "User:", "###"],
+                num_predict=num_predict,
+            )
+        return self._llm_pool[key]
+
     # ── Agent Dispatcher ─────────────────────────────
     def _get_agent(self, name: str):
         """Map agent name string to the actual agent instance."""
@@ -119,13 +157,129 @@ class ChiefAgent(BaseAgent):
             return text
 
     # ── Build prompt with live context ────────────────
-    def _build_prompt(self, command: str) -> str:
-        return f'{self.system_prompt}\n\nUser: "{command}"\n{{'
+    def _build_prompt(self, command: str, client_id: str = None, memories: str = "") -> str:
+        conversation = session_service.context_for(client_id)
+        sections = self.system_prompt
+        if memories:
+            sections += f"\n\n[MEMORY]\n{memories}"
+        if conversation:
+            sections += f"\n\n[CONVERSATION]\n{conversation}"
+        return f'{sections}\n\nUser: "{command}"\n{{'
+
+    # ── Memory-Augmented Routing ─────────────────────
+    @staticmethod
+    def _memory_owner(user_id: Optional[str]) -> str:
+        """Long-term memories belong to a stable user key, not the per-tab/per-run client id."""
+        return user_id or settings.MEMORY_USER_ID
+
+    def _start_recall(self, command: str, client_id: str, deadline: Deadline = None) -> Optional[asyncio.Task]:
+        """Begin fetching this owner's memories for the prompt, or None if it can't fit the deadline."""
+        if not settings.MEMORY_INJECT_ENABLED or not client_id:
+            return None
+        if deadline is not None and not deadline.allows(settings.MEMORY_INJECT_MIN_BUDGET):
+            self.memory_stats["skipped_deadline"] += 1
+            return None
+        return asyncio.create_task(
+            self.memory_agent.recall(command, settings.MEMORY_INJECT_K, {"client_id": client_id})
+        )
+
+    async def _await_recall(self, task: Optional[asyncio.Task], deadline: Deadline = None) -> str:
+        """Memories for the [MEMORY] section within the time and token budget ("" if none)."""
+        if task is None:
+            return ""
+        start = time.perf_counter()
+        timeout = settings.MEMORY_INJECT_TIMEOUT
+        if deadline is not None:
+            timeout = deadline.timeout(timeout)
+        try:
+            recall = await asyncio.wait_for(task, timeout=timeout)
+        except asyncio.TimeoutError:
+            self.memory_stats["skipped_timeout"] += 1
+            return ""
+        except Exception as e:
+            log.warning(f"Memory recall for routing failed: {e}")
+            self.memory_stats["failed"] += 1
+            return ""
+        finally:
+            added = (time.perf_counter() - start) * 1000
+            self.memory_stats["added_ms_total"] += added
+            self.memory_stats["last_added_ms"] = round(added, 1)
+
+        lines, used = [], 0
+        for hit in recall["results"]:
+            if "distance" in hit:
+                if hit["distance"] > settings.MEMORY_INJECT_MAX_DISTANCE:
+                    continue   # Weak vector match
+            elif hit.get("lexical_score", 0.0) < settings.MEMORY_INJECT_MIN_BM25:
+                continue   # Lexical-only and no strong term match
+            line = f"- {hit['document']}"
+            if used + estimate_tokens(line) > settings.MEMORY_INJECT_TOKENS:
+                if not lines:
+                    lines.append(truncate_to_tokens(line, settings.MEMORY_INJECT_TOKENS))
+                break
+            lines.append(line)
+            used += estimate_tokens(line)
+        if not lines:
+            self.memory_stats["empty"] += 1
+            return ""
+        self.memory_stats["injected"] += 1
+        self.memory_stats["memories"] += len(lines)
+        return "\n".join(lines)
+
+    def memory_metrics(self) -> Dict[str, Any]:
+        stats = dict(self.memory_stats)
+        attempts = sum(stats[k] for k in ("injected", "empty", "skipped_deadline", "skipped_timeout", "failed"))
+        waited = attempts - stats["skipped_deadline"]
+        stats["hit_rate"] = round(stats["injected"] / attempts, 3) if attempts else 0.0
+        stats["skip_rate"] = round((stats["skipped_deadline"] + stats["skipped_timeout"]) / attempts, 3) if attempts else 0.0
+        stats["avg_added_ms"] = round(stats.pop("added_ms_total") / waited, 1) if waited else 0.0
+        return stats
+
+    # ── Session Context ──────────────────────────────
+    @staticmethod
+    def _describe_actions(execution_results: list) -> str:
+        """Compact trace of what was executed, so follow-ups can refer back to it."""
+        parts = []
+        for res in execution_results:
+            if not isinstance(res, dict):
+                continue
+            target = res.get("query") or res.get("details") or ""
+            parts.append(f"{res.get('agent')}.{res.get('action')}({str(target)[:60]})")
+        return "; ".join(parts)
+
+    async def _summarise_turns(self, previous: str, turns: list) -> str:
+        """Fold evicted turns into the rolling session summary (runs in background)."""
+        transcript = "\n".join(t.render() for t in turns)
+        prompt = (
+            "Summarise this conversation in at most two short sentences, keeping names, "
+            "topics and anything the user may refer back to.\n"
+            f"Previous summary: {previous or 'none'}\n{transcript}\nSummary:"
+        )
+        return await self.summary_llm.ainvoke(prompt)
+
+    async def _summarise_memories(self, memories: list) -> str:
+        """Fold stale long-term memories into one (memory compaction, background)."""
+        listing = "\n".join(f"- {m}" for m in memories)
+        prompt = (
+            "Combine these notes into one short paragraph, keeping names, preferences, "
+            f"paths and numbers exactly.\n{listing}\nCombined note:"
+        )
+        return await self.summary_llm.ainvoke(prompt)
 
     # ── Streaming Request ────────────────────────────
-    async def stream_request(self, command: str):
+    async def stream_request(
+        self, command: str, client_id: str = None, deadline: Deadline = None, client_hints: Dict = None,
+        timings: Dict = None, recall: asyncio.Task = None, user_id: str = None,
+    ):
         log.info(f"ChiefAgent streaming: {command}")
-        prompt = self._build_prompt(command)
+        timings = timings if timings is not None else {}
+        start = time.perf_counter()
+        if recall is None:
+            recall = self._start_recall(command, self._memory_owner(user_id), deadline)
+        await session_service.restore(client_id, deadline.timeout(settings.SESSION_RESTORE_TIMEOUT) if deadline else None)
+        memories = await self._await_recall(recall, deadline)
+        timings["memory_ms"] = _ms_since(start)
+        prompt = self._build_prompt(command, client_id, memories)
 
         # We start with { but we only yield it if the model doesn't provide it
         full_response = "{"
@@ -166,9 +320,14 @@ class ChiefAgent(BaseAgent):
                     break
 
             print("\n[STREAM COMPLETE]")
+            timings["route_ms"] = _ms_since(start)
 
             # 🔥 NEW: Process actions and yield results for handle_ws_request
-            results = await self._process_actions(full_response)
+            actions_start = time.perf_counter()
+            results = await self._process_actions(
+                full_response, deadline, client_hints, timings, self._memory_owner(user_id)
+            )
+            timings["actions_ms"] = _ms_since(actions_start)
             yield f"__EXECUTION_RESULTS__:{json.dumps(results)}"
 
         except Exception as e:
@@ -178,15 +337,30 @@ class ChiefAgent(BaseAgent):
     # ── WebSocket Handler ───────────────────────────
     async def handle_ws_request(self, websocket, manager, data_str: str):
         """Standardized handler for WebSocket requests."""
+        start = time.perf_counter()
+        timings: Dict[str, Any] = {}
+        command = client_id = None
         try:
             request_data = json.loads(data_str)
             command = request_data.get("command")
             source = request_data.get("source", "unknown")
             client_id = request_data.get("client_id", "unknown")
+            # Optional viewport/bandwidth hints used for media selection
+            client_hints = request_data.get("client_hints") or {}
+            # Clients without an id still get a per-connection session
+            session_id = client_id if client_id != "unknown" else f"ws-{id(websocket)}"
+            # Conversation context follows the session; long-term memory follows the user
+            user_id = self._memory_owner(request_data.get("user_id"))
 
             if not command:
                 return
 
+            # Per-request time budget, propagated to every agent
+            deadline = Deadline.for_source(source)
+
+            # Memory recall overlaps with the status message and prompt setup
+            recall = self._start_recall(command, user_id, deadline)
+
             # 1. Notify Requester
             await manager.send_message(
                 json.dumps({"type": "status", "message": "Synchronizing neural links..."}),
@@ -196,21 +370,32 @@ class ChiefAgent(BaseAgent):
             full_response_text = ""
             execution_results = []
 
+            # Output of commands started by this request streams back to the requester
+            async def send_output(process_id: str, stream: str, line: str):
+                await manager.send_message(
+                    json.dumps({"type": "command_output", "process_id": process_id, "stream": stream, "line": line}),
+                    websocket
+                )
+
             # 2. Stream from LLM
-            async for chunk in self.stream_request(command):
-                if isinstance(chunk, str) and chunk.startswith("__EXECUTION_RESULTS__:"):
-                    try:
-                        json_str = chunk.replace("__EXECUTION_RESULTS__:", "")
-                        execution_results = json.loads(json_str)
-                    except Exception as e:
-                        log.error(f"Failed to parse execution results: {e}")
-                else:
-                    full_response_text += chunk
-                    # Stream tokens only to the requester for real-time feel
-                    await manager.send_message(
-                        json.dumps({"type": "stream_token", "token": chunk}),
-                        websocket
-                    )
+            with use_output_sink(send_output):
+                async for chunk in self.stream_request(
+                    command, session_id, deadline, client_hints, timings, recall, user_id
+                ):
+                    timings.setdefault("first_token_ms", _ms_since(start))
+                    if isinstance(chunk, str) and chunk.startswith("__EXECUTION_RESULTS__:"):
+                        try:
+                            json_str = chunk.replace("__EXECUTION_RESULTS__:", "")
+                            execution_results = json.loads(json_str)
+                        except Exception as e:
+                            log.error(f"Failed to parse execution results: {e}")
+                    else:
+                        full_response_text += chunk
+                        # Stream tokens only to the requester for real-time feel
+                        await manager.send_message(
+                            json.dumps({"type": "stream_token", "token": chunk}),
+                            websocket
+                        )
 
             # 3. Final Parse & Broadcast
             parsed_json = {}
@@ -246,9 +431,24 @@ class ChiefAgent(BaseAgent):
                  final_text = "I've handled that, Sir."
 
             log.info(f"Broadcasting response to {source} (len={len(final_text)})")
-            
-            await manager.broadcast(
-                json.dumps({
+
+            # Decide on the briefing up front so the result records whether it was cut
+            briefing_budget = None
+            if self._briefing_context(execution_results):
+                briefing_budget = self._briefing_budget(deadline)
+
+            # Start the briefing now so it overlaps with the result broadcast
+            briefing_task = None
+            briefing_start = time.perf_counter()
+            if briefing_budget and settings.BRIEFING_MODE == "concurrent":
+                briefing_task = asyncio.create_task(
+                    self._explain_results(command, execution_results, briefing_budget, deadline)
+                )
+
+            # Command output and the like go to the requester only; other
+            # clients (e.g. the dashboard mirroring a voice request) get a redacted copy
+            def result_message(results: list) -> str:
+                return json.dumps({
                     "type": "result",
                     "data": {
                         "original_response": {
@@ -257,16 +457,46 @@ class ChiefAgent(BaseAgent):
                             "source": source,
                             "client_id": client_id
                         },
-                        "execution_results": execution_results,
+                        "execution_results": results,
+                        "deadline": deadline.as_dict(),
                     },
                 })
+
+            shared_results = self._redact_private(execution_results)
+            await manager.send_message(result_message(execution_results), websocket)
+            await manager.broadcast(result_message(shared_results), exclude=websocket)
+
+            session_service.record_turn(
+                session_id, command, final_text, self._describe_actions(execution_results)
             )
 
             # 4. Supplemental Briefing (Explanation after display)
-            explanation = await self._explain_results(command, execution_results)
+            if briefing_task is not None:
+                explanation = await briefing_task
+            elif briefing_budget and settings.BRIEFING_MODE == "serial":
+                explanation = await self._explain_results(
+                    command, execution_results, briefing_budget, deadline
+                )
+            else:
+                explanation = None
+            if briefing_budget:
+                timings["briefing_ms"] = _ms_since(briefing_start)
+            timings["total_ms"] = _ms_since(start)
+            interaction_log.interaction(
+                client_id=client_id, session_id=session_id, source=source, command=command,
+                routing=parsed_json, response=final_text, execution_results=shared_results,
+                agents=sorted({r.get("agent") for r in execution_results if isinstance(r, dict) and r.get("agent")}),
+                timings=timings, deadline=deadline.as_dict(),
+            )
+
             if explanation:
                 log.info(f"Broadcasting supplemental briefing")
-                await manager.broadcast(
+                # A briefing over private results is as private as the results
+                send = (
+                    (lambda message: manager.send_message(message, websocket))
+                    if shared_results != execution_results else manager.broadcast
+                )
+                await send(
                     json.dumps({
                         "type": "result",
                         "data": {
@@ -277,6 +507,7 @@ class ChiefAgent(BaseAgent):
                                 "client_id": client_id
                             },
                             "execution_results": [],
+                            "deadline": deadline.as_dict(),
                         },
                     })
                 )
@@ -285,10 +516,17 @@ class ChiefAgent(BaseAgent):
             await manager.send_message(json.dumps({"error": "Invalid protocol format"}), websocket)
         except Exception as e:
             log.exception(f"Handler error: {e}")
+            interaction_log.error(
+                client_id=client_id, command=command, error=f"{type(e).__name__}: {e}",
+                timings={**timings, "total_ms": _ms_since(start)},
+            )
             await manager.send_message(json.dumps({"error": "Neural link failure"}), websocket)
 
     # ── Action Processing ────────────────────────────
-    async def _process_actions(self, response_text: str):
+    async def _process_actions(
+        self, response_text: str, deadline: Deadline = None, client_hints: Dict = None, timings: Dict = None,
+        memory_owner: str = None,
+    ):
         log.debug("Processing agent actions")
         results = []
         parsed = {}
@@ -366,9 +604,19 @@ class ChiefAgent(BaseAgent):
                     })
                     continue
 
+                if client_hints:
+                    params = {**params, "client": client_hints}
+                if agent_name == "MemoryAgent" and memory_owner:
+                    params = self._scope_memory(action_name, params, memory_owner)
+
                 agent = self._get_agent(agent_name)
                 if agent:
-                    res = await agent.execute(action_name, params)
+                    agent_start = time.perf_counter()
+                    res = await agent.execute(action_name, params, deadline)
+                    if timings is not None:
+                        timings.setdefault("agents", []).append(
+                            {"agent": agent_name, "action": action_name, "ms": _ms_since(agent_start)}
+                        )
                     if res:
                         if isinstance(res, dict):
                            res["agent"] = agent_name
@@ -380,20 +628,69 @@ class ChiefAgent(BaseAgent):
             log.error(f"Action processing error: {e}")
             return []
 
-    async def _explain_results(self, original_query: str, execution_results: list) -> str:
-        """Generate a natural explanation based on agent findings."""
-        if not execution_results:
-            return None
-            
-        # Combine all summaries/messages
+    @staticmethod
+    def _scope_memory(action: str, params: Dict[str, Any], client_id: str) -> Dict[str, Any]:
+        """Pin memory saves and recalls to the requesting user (the model can't override it).
+
+        The owner is stored in the memories' `client_id` metadata field.
+        """
+        params = dict(params)
+        if action == "save_memory":
+            params["metadata"] = {**(params.get("metadata") or {}), "client_id": client_id}
+        elif action == "save_memories":
+            params["items"] = [
+                {**m, "metadata": {**(m.get("metadata") or {}), "client_id": client_id}}
+                for m in params.get("items") or [] if isinstance(m, dict)
+            ]
+        elif action == "recall_memory":
+            params["client_id"] = client_id
+        return params
+
+    @staticmethod
+    def _redact_private(execution_results: list) -> list:
+        """Results safe to share beyond the requester (PRIVATE_RESULTS reduced to their status)."""
+        shared = []
+        for res in execution_results or []:
+            if isinstance(res, dict) and (res.get("agent"), res.get("action")) in PRIVATE_RESULTS:
+                res = {k: res[k] for k in ("agent", "action", "status", "process_id", "exit_status") if k in res}
+                res["details"] = "Shown to the requesting client only."
+            shared.append(res)
+        return shared
+
+    @staticmethod
+    def _briefing_context(execution_results: list) -> str:
+        """Combine result summaries/messages worth explaining ("" if none)."""
         context_data = ""
-        for res in execution_results:
+        for res in execution_results or []:
             if isinstance(res, dict):
                 # Check for summary first (SearchAgent), then message (ImageAgent)
                 data = res.get("summary") or res.get("message")
                 if data and len(data) > 10: # Only explain if there's actual content
                     context_data += f"\n- Findings: {data}"
-                    
+        return context_data
+
+    def _briefing_budget(self, deadline: Deadline) -> float:
+        """Time the briefing may take, or None if it should be skipped."""
+        if settings.BRIEFING_MODE not in ("concurrent", "serial"):
+            return None
+        budget = min(settings.BRIEFING_LATENCY_BUDGET, deadline.remaining())
+        if budget < settings.BRIEFING_MIN_BUDGET:
+            deadline.cut("briefing")
+            self.briefing_stats["skipped"] += 1
+            return None
+        return budget
+
+    async def _explain_results(
+        self, original_query: str, execution_results: list, budget: float = None,
+        deadline: Deadline = None,
+    ) -> str:
+        """
+        Generate a natural explanation based on agent findings.
+
+        Streams from the briefing tier and stops at the latency budget; whatever
+        was produced by then is kept (truncated), otherwise the briefing is skipped.
+        """
+        context_data = self._briefing_context(execution_results)
         if not context_data:
             return None
             
@@ -404,20 +701,62 @@ class ChiefAgent(BaseAgent):
             f"Current findings: {context_data}"
         )
         
+        budget = settings.BRIEFING_LATENCY_BUDGET if budget is None else budget
+        if budget <= 0:
+            self.briefing_stats["skipped"] += 1
+            return None
+
+        stop_at = time.monotonic() + budget
+        chunks = []
+        truncated = False
+        stream = self.briefing_llm.astream(prompt).__aiter__()
         try:
-            explanation = await self.llm.ainvoke(prompt)
-            # Remove any JSON artifacts or headers if model hallucinates
-            explanation = explanation.strip().replace('"', '').split('\n')[0]
-            return explanation
+            while True:
+                remaining = stop_at - time.monotonic()
+                if remaining <= 0:
+                    truncated = True
+                    break
+                try:
+                    chunks.append(await asyncio.wait_for(stream.__anext__(), remaining))
+                except StopAsyncIteration:
+                    break
+                except asyncio.TimeoutError:
+                    truncated = True
+                    break
         except Exception as e:
             log.warning(f"Supplemental briefing failed: {e}")
+            self.briefing_stats["failed"] += 1
             return None
+        finally:
+            await _aclose(stream)
+
+        # Remove any JSON artifacts or headers if model hallucinates
+        explanation = "".join(chunks).strip().replace('"', '').split('\n')[0]
+        if truncated:
+            if deadline is not None:
+                deadline.cut("briefing_truncated")
+            # Cut back to the last complete sentence, if there is one
+            cut = max(explanation.rfind(". "), explanation.rfind("! "), explanation.rfind("? "))
+            explanation = explanation[:cut + 1] if cut > 0 else ""
+            if not explanation:
+                log.info("Supplemental briefing skipped (latency budget exceeded)")
+                self.briefing_stats["skipped"] += 1
+                return None
+            self.briefing_stats["truncated"] += 1
+        if explanation:
+            self.briefing_stats["generated"] += 1
+        return explanation or None
 
     async def process_request(self, command: str, context: Dict[str, Any] = None) -> Dict[str, Any]:
         """Standard synchronous request."""
-        prompt = self._build_prompt(command)
+        client_id = (context or {}).get("client_id")
+        user_id = self._memory_owner((context or {}).get("user_id"))
+        recall = self._start_recall(command, user_id, self.deadline)
+        await session_service.restore(client_id, self.deadline.timeout(settings.SESSION_RESTORE_TIMEOUT))
+        memories = await self._await_recall(recall, self.deadline)
+        prompt = self._build_prompt(command, client_id, memories)
         response_text = await self.llm.ainvoke(prompt)
-        results = await self._process_actions(response_text)
+        results = await self._process_actions(response_text, self.deadline, memory_owner=user_id)
         try:
             parsed = json.loads(self._extract_json(response_text))
             if not isinstance(parsed, dict):
@@ -427,6 +766,20 @@ class ChiefAgent(BaseAgent):
             return {"original_response": {"thought_process": response_text}, "execution_results": results}
 
 
+def _ms_since(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 1)
+
+
+async def _aclose(stream):
+    """Close an async generator if it supports it (cancels the Ollama request)."""
+    aclose = getattr(stream, "aclose", None)
+    if aclose:
+        try:
+            await aclose()
+        except Exception:
+            pass
+
+
 # Singleton Pattern
 _chief_agent = None
 
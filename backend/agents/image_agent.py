@@ -3,39 +3,38 @@ Image Agent — Search and fetch real images from the internet.
 Uses DuckDuckGo Image Search (no API key required).
 """
 
-from typing import Any, Dict, List
-
-from ddgs import DDGS
-from pexelsapi.pexels import Pexels as PexelsAPI
-import wikipediaapi
-import httpx
-import re
+import asyncio
+from typing import Any, Callable, Dict, List, Optional
 
 from app.config import settings
+from services.agent_cache import CachePolicy
+from services.http_service import HttpService, http_service
+from services.media_cache import proxy_media
+from services.pexels_service import PexelsService, PexelsUnavailable, pexels_service
+from services.wiki_index import WikiIndex, wiki_index
+from utils.deadline import Deadline, use_deadline
 from utils.logger import log
 from .base import BaseAgent
 
 
 class ImageAgent(BaseAgent):
-    def __init__(self):
+    cache_policies = {
+        "fetch_image": CachePolicy(ttl=3600, stale_ttl=86400, key_params=("query",)),
+    }
+
+    WIKI_API_URL = "https://en.wikipedia.org/w/api.php"
+
+    def __init__(self, http: HttpService = None, index: WikiIndex = None, pexels: PexelsService = None):
         super().__init__(
             name="ImageAgent",
             description="Search and fetch real images from the internet.",
         )
-        self.pexels = None
-        if settings.PEXELS_API_KEY:
-            try:
-                self.pexels = PexelsAPI(settings.PEXELS_API_KEY)
-                log.info("Pexels API initialized for ImageAgent.")
-            except Exception as e:
-                log.warning(f"Failed to init Pexels API: {e}")
-        
-        # Init Wikipedia API
-        self.wiki = wikipediaapi.Wikipedia(
-            user_agent="JARVIS/2.0 (contact: support@jarvis.ai)",
-            language="en",
-            extract_format=wikipediaapi.ExtractFormat.WIKI
-        )
+        self.http = http or http_service
+        self.pexels = pexels or pexels_service
+
+        # Persistent query → page/thumbnail index for Wikipedia lookups
+        self.wiki_index = index or wiki_index
+        self._wiki_refresh: Optional[asyncio.Task] = None
 
     async def process_request(
         self, action: str, parameters: Dict[str, Any]
@@ -46,37 +45,80 @@ class ImageAgent(BaseAgent):
             personality_keywords = ["actor", "actress", "singer", "director", "player", "person", "man", "woman", "leader", "vijay", "rajini", "samantha", "dhoni", "kohli", "modi"]
             is_personality = any(word in query.lower() for word in personality_keywords)
 
-            # Try sources in order based on type
+            # Source priority based on type
             if is_personality:
-                # 1. Try Wikipedia (best for specific real people)
-                res = self._try_wikipedia(query)
-                if res["status"] == "success": return res
-                # 2. Try DDG (better for news/current faces)
-                res = self._try_ddg(query)
-                if res["status"] == "success": return res
-                # 3. Try Pexels (fallback)
-                res = self._try_pexels(query)
-                if res["status"] == "success": return res
+                # Wikipedia (best for specific real people) → DDG (news/current faces) → Pexels
+                sources = [("wikipedia", self._try_wikipedia), ("ddg", self._try_ddg), ("pexels", self._try_pexels)]
             else:
-                # 1. Try Pexels (high quality stock)
-                res = self._try_pexels(query)
-                if res["status"] == "success": return res
-                # 2. Try Wikipedia (maybe it's a famous object?)
-                res = self._try_wikipedia(query)
-                if res["status"] == "success": return res
-                # 3. Try DDG (fallback)
-                res = self._try_ddg(query)
-                if res["status"] == "success": return res
+                # Pexels (high quality stock) → Wikipedia (famous object?) → DDG
+                sources = [("pexels", self._try_pexels), ("wikipedia", self._try_wikipedia), ("ddg", self._try_ddg)]
+
+            # Pexels stays in the fan-out even when out of quota: cached responses
+            # are still served, and otherwise it fails fast (PexelsUnavailable)
+            res = await self._fan_out(sources, query)
+            if res is not None: return proxy_media(res)
 
             return {"status": "error", "message": "Could not find any images, sir."}
         return {"error": "Unknown action"}
 
-    def _try_pexels(self, query: str) -> Dict[str, Any]:
-        if not self.pexels:
-            return {"status": "error", "message": "Pexels not configured"}
+    async def _fan_out(self, sources: List, query: str) -> Dict[str, Any]:
+        """
+        Query all sources concurrently and return the best success.
+
+        A success is returned as soon as every higher-priority source has
+        failed, or once IMAGE_HEDGE_DELAY has passed — so a fast preferred
+        source still wins, but a slow one can't hold up a good fallback.
+        Remaining lookups are cancelled.
+        """
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        hedge = settings.IMAGE_HEDGE_DELAY
+        pending = {
+            asyncio.create_task(self._run_source(name, source, query)): rank
+            for rank, (name, source) in enumerate(sources)
+        }
+        successes: Dict[int, Dict[str, Any]] = {}
+        try:
+            while pending:
+                timeout = None
+                if successes:
+                    best = min(successes)
+                    waited = loop.time() - started
+                    if all(rank > best for rank in pending.values()) or waited >= hedge:
+                        break
+                    timeout = hedge - waited
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    rank = pending.pop(task)
+                    res = task.result() if task.exception() is None else {"status": "error"}
+                    if res.get("status") == "success":
+                        log.info(f"ImageAgent: {sources[rank][0]} answered in {loop.time() - started:.2f}s")
+                        successes[rank] = res
+        finally:
+            for task in pending:
+                task.cancel()
+        return successes[min(successes)] if successes else None
+
+    async def _run_source(self, source_name: str, source: Callable, query: str) -> Dict[str, Any]:
+        """Run one source, bounded by the request deadline."""
+        deadline = self.deadline
+        stage = f"ImageAgent.{source_name}"
+        if not deadline.allows():
+            deadline.cut(stage)
+            return {"status": "error"}
+        try:
+            return await asyncio.wait_for(
+                source(query), deadline.timeout(settings.SOURCE_TIMEOUT)
+            )
+        except asyncio.TimeoutError:
+            log.warning(f"{stage} timed out for: {query}")
+            deadline.cut(stage)
+            return {"status": "error"}
+
+    async def _try_pexels(self, query: str) -> Dict[str, Any]:
         try:
             log.info(f"Trying Pexels for: {query}")
-            results_dict = self.pexels.search_photos(query, page=1, per_page=5)
+            results_dict = await self.pexels.search_photos(query)
             photos = results_dict.get("photos", [])
             if photos:
                 all_images = []
@@ -98,47 +140,96 @@ class ImageAgent(BaseAgent):
                     "source_name": "Pexels",
                     "message": f"Found a high-quality photo related to {query} from Pexels."
                 }
+        except PexelsUnavailable as e:
+            log.info(f"Pexels skipped: {e}")
         except Exception as e:
             log.warning(f"Pexels failed: {e}")
         return {"status": "error"}
 
-    def _try_wikipedia(self, query: str) -> Dict[str, Any]:
+    async def _try_wikipedia(self, query: str) -> Dict[str, Any]:
         log.info(f"Trying Wikipedia for: {query}")
+        known = self.wiki_index.get(query)
+        if known == {}:
+            return {"status": "error"}  # Remembered: Wikipedia has no image for this
+        if known:
+            log.info(f"Wiki index hit: {query} → {known['title']}")
+            if known["stale"]:
+                self._schedule_wiki_refresh()
+            return self._wiki_result(query, known["title"], known["thumbnail"])
+
         try:
-            # 1. Search for the correct Page Title first
-            search_api = f"https://en.wikipedia.org/w/api.php?action=query&list=search&srsearch={query}&format=json&srlimit=1"
-            search_resp = httpx.get(search_api).json()
-            search_results = search_resp.get("query", {}).get("search", [])
-            
-            if not search_results:
+            # Search + lead image in a single round trip
+            resp = await self.http.get_json(self.WIKI_API_URL, params={
+                "action": "query", "generator": "search", "gsrsearch": query, "gsrlimit": 1,
+                "prop": "pageimages", "piprop": "thumbnail", "pithumbsize": 1000,
+                "format": "json", "formatversion": 2,
+            })
+            pages = resp.get("query", {}).get("pages", [])
+            if not pages:
                 log.warning(f"No Wikipedia search results for: {query}")
+                self.wiki_index.put(query)
                 return {"status": "error"}
-            
-            correct_title = search_results[0]["title"]
-            log.info(f"Wiki Found Correct Title: {correct_title}")
-
-            # 2. Pull the 'original' image from Wikipedia API via httpx
-            api_url = f"https://en.wikipedia.org/w/api.php?action=query&titles={correct_title}&prop=pageimages&format=json&pithumbsize=1000"
-            resp = httpx.get(api_url).json()
-            pages = resp.get("query", {}).get("pages", {})
-            for pid in pages:
-                pdata = pages[pid]
-                if "thumbnail" in pdata:
-                    img_url = pdata["thumbnail"]["source"]
-                    return {
-                        "status": "success",
-                        "image_url": img_url,
-                        "thumbnail": img_url,
-                        "all_images": [{"image_url": img_url, "thumbnail": img_url, "title": correct_title, "source": f"https://en.wikipedia.org/wiki/{correct_title.replace(' ', '_')}"}],
-                        "query": query,
-                        "source_name": "Wikipedia",
-                        "message": f"Found an official portrait and article for {correct_title} on Wikipedia."
-                    }
+
+            page = pages[0]
+            title = page.get("title", query)
+            img_url = page.get("thumbnail", {}).get("source")
+            self.wiki_index.put(query, title, img_url)
+            log.info(f"Wiki Found Correct Title: {title}")
+            if img_url:
+                return self._wiki_result(query, title, img_url)
         except Exception as e:
             log.warning(f"Wikipedia failed for {query}: {e}")
         return {"status": "error"}
 
-    def _try_ddg(self, query: str) -> Dict[str, Any]:
+    @staticmethod
+    def _wiki_result(query: str, title: str, img_url: str) -> Dict[str, Any]:
+        return {
+            "status": "success",
+            "image_url": img_url,
+            "thumbnail": img_url,
+            "all_images": [{"image_url": img_url, "thumbnail": img_url, "title": title, "source": f"https://en.wikipedia.org/wiki/{title.replace(' ', '_')}"}],
+            "query": query,
+            "source_name": "Wikipedia",
+            "message": f"Found an official portrait and article for {title} on Wikipedia."
+        }
+
+    async def wikipedia_thumbnails(self, titles: List[str]) -> Dict[str, Optional[str]]:
+        """Lead images for many known titles in one request (up to 50 per batch)."""
+        thumbnails: Dict[str, Optional[str]] = {}
+        for i in range(0, len(titles), 50):
+            batch = titles[i:i + 50]
+            resp = await self.http.get_json(self.WIKI_API_URL, params={
+                "action": "query", "titles": "|".join(batch),
+                "prop": "pageimages", "piprop": "thumbnail", "pithumbsize": 1000,
+                "format": "json", "formatversion": 2,
+            })
+            query_data = resp.get("query", {})
+            # Map normalised titles back to what we asked for
+            aliases = {n["to"]: n["from"] for n in query_data.get("normalized", [])}
+            for page in query_data.get("pages", []):
+                title = aliases.get(page.get("title"), page.get("title"))
+                thumbnails[title] = page.get("thumbnail", {}).get("source")
+        return thumbnails
+
+    def _schedule_wiki_refresh(self):
+        """Refresh all stale index entries with one batched request, off the request path."""
+        if self._wiki_refresh and not self._wiki_refresh.done():
+            return
+        self._wiki_refresh = asyncio.create_task(self._refresh_wiki_index())
+
+    async def _refresh_wiki_index(self):
+        titles = self.wiki_index.stale_titles()
+        if not titles:
+            return
+        try:
+            with use_deadline(Deadline()):
+                thumbnails = await self.wikipedia_thumbnails(titles)
+            self.wiki_index.refresh_titles(thumbnails)
+            log.info(f"Refreshed {len(thumbnails)} Wikipedia index entries.")
+        except Exception as e:
+            log.warning(f"Wiki index refresh failed: {e}")
+
+    async def _try_ddg(self, query: str) -> Dict[str, Any]:
         log.info(f"Trying DDG for: {query}")
         try:
             # Refine query for personalities to get better results
@@ -146,8 +237,11 @@ class ImageAgent(BaseAgent):
             if any(word in query.lower() for word in ["actor", "actress", "singer", "person", "vijay", "samantha"]):
                 refined_query = f"{query} official portrait high quality"
 
-            with DDGS() as ddgs:
-                results = list(ddgs.images(refined_query, max_results=5, safesearch="moderate"))
+            ddgs = self.http.ddgs()
+            async with self.http.limit("duckduckgo.com"):
+                results = await asyncio.to_thread(
+                    lambda: list(ddgs.images(refined_query, max_results=5, safesearch="moderate"))
+                )
             
             if results:
                 all_images = [
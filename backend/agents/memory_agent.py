@@ -1,37 +1,122 @@
 """
 Memory Agent — Short-term and long-term memory management.
+
+Recall is hybrid: a BM25 lexical branch (exact names, paths, codes) and the
+vector branch run in parallel and are fused by reciprocal rank.
 """
 
-from typing import Any, Dict
+import asyncio
+import time
+from typing import Any, Dict, List, Set
 
+from app.config import settings
+from services.memory_lexicon import MemoryLexicon, memory_lexicon
 from services.vector_service import vector_service
 from services.db_service import get_database
+from utils.ranking import reciprocal_rank_fusion
 from .base import BaseAgent
 
+FILTER_KEYS = ("client_id", "source", "since", "until")
+
 
 class MemoryAgent(BaseAgent):
-    def __init__(self):
+    def __init__(self, lexicon: MemoryLexicon = None):
         super().__init__(
             name="MemoryAgent",
             description="Manage short-term and long-term memory.",
         )
         self.vector_service = vector_service
+        self.lexicon = lexicon or memory_lexicon
+        self.recall_stats = {"recalls": 0, "vector_ms": 0.0, "lexical_ms": 0.0, "lexical_only_hits": 0}
+        self._touches: Set[asyncio.Task] = set()
 
     async def process_request(
         self, action: str, parameters: Dict[str, Any]
     ) -> Dict[str, Any]:
         if action == "save_memory":
             content = parameters.get("content")
-            metadata = parameters.get("metadata", {})
-            doc_id = self.vector_service.add_memory(content, metadata)
+            metadata = {**parameters.get("metadata", {}), **self._lifecycle(parameters)}
+            # Concurrent saves share one embedding pass; near-duplicates return the existing id
+            doc_id = (await self.vector_service.add_memories([(content, metadata)]))[0]
             return {"status": "success", "id": doc_id}
 
+        elif action == "save_memories":
+            items = [
+                (m.get("content"), {**m.get("metadata", {}), **self._lifecycle(m)})
+                for m in parameters.get("items", []) if m.get("content")
+            ]
+            ids = await self.vector_service.add_memories(items)
+            return {"status": "success", "ids": ids, "message": f"Saved {len(ids)} memories."}
+
         elif action == "recall_memory":
-            query = parameters.get("query")
-            results = self.vector_service.search_memory(query)
-            return {"status": "success", "results": results}
+            filters = {k: parameters[k] for k in FILTER_KEYS if parameters.get(k) is not None}
+            n_results = parameters.get("n_results", settings.MEMORY_RECALL_K)
+            queries = parameters.get("queries")
+            if queries:
+                recalls = await asyncio.gather(*(self.recall(q, n_results, filters) for q in queries))
+                return {"status": "success", "results": [r["results"] for r in recalls],
+                        "latency_ms": [r["latency_ms"] for r in recalls]}
+            recall = await self.recall(parameters.get("query", ""), n_results, filters)
+            return {"status": "success", **recall}
 
         return {"error": "Unknown action"}
 
+    @staticmethod
+    def _lifecycle(parameters: Dict[str, Any]) -> Dict[str, Any]:
+        """Per-memory ttl (seconds) and importance (0–1), when given."""
+        return {k: parameters[k] for k in ("ttl", "importance") if parameters.get(k) is not None}
+
+    async def recall(self, query: str, n_results: int = 3, filters: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Hybrid recall: vector + BM25 in parallel, fused by reciprocal rank."""
+        candidates = max(n_results * 3, settings.MEMORY_CANDIDATES)
+
+        async def vector_branch():
+            start = time.perf_counter()
+            res = await self.vector_service.search_memory_async(query, candidates, filters)
+            hits = [
+                {"id": i, "document": d, "metadata": m, "distance": dist}
+                for i, d, m, dist in zip(res["ids"][0], res["documents"][0], res["metadatas"][0], res["distances"][0])
+            ] if res["ids"] else []
+            return hits, (time.perf_counter() - start) * 1000
+
+        async def lexical_branch():
+            start = time.perf_counter()
+            hits = await asyncio.to_thread(self.lexicon.search, query, candidates, filters)
+            return hits, (time.perf_counter() - start) * 1000
+
+        (vector_hits, vector_ms), (lexical_hits, lexical_ms) = await asyncio.gather(vector_branch(), lexical_branch())
+
+        fused = reciprocal_rank_fusion(
+            ([h["id"] for h in vector_hits], [h["id"] for h in lexical_hits]), settings.MEMORY_RRF_K
+        )
+        by_id: Dict[str, Dict[str, Any]] = {h["id"]: dict(h) for h in lexical_hits}
+        for hit in vector_hits:
+            by_id.setdefault(hit["id"], {}).update(hit)   # Vector hits carry full metadata
+        results: List[Dict[str, Any]] = []
+        for doc_id in sorted(fused, key=fused.get, reverse=True)[:n_results]:
+            hit = by_id[doc_id]
+            if "score" in hit:
+                hit["lexical_score"] = round(hit.pop("score"), 3)
+            hit["rrf_score"] = round(fused[doc_id], 5)
+            results.append(hit)
+
+        # Recalled memories count as used; only vector hits carry full metadata to write back
+        touched = [(r["id"], r["metadata"]) for r in results if "distance" in r]
+        if touched:
+            task = asyncio.create_task(asyncio.to_thread(self.vector_service.touch, touched))
+            self._touches.add(task)
+            task.add_done_callback(self._touches.discard)
+
+        lexical_only = sum(1 for r in results if "distance" not in r)
+        self.recall_stats["recalls"] += 1
+        self.recall_stats["vector_ms"] = round(vector_ms, 2)
+        self.recall_stats["lexical_ms"] = round(lexical_ms, 2)
+        self.recall_stats["lexical_only_hits"] += lexical_only
+        return {
+            "results": results,
+            "summary": "\n".join(f"- {r['document']}" for r in results),
+            "latency_ms": {"vector": round(vector_ms, 2), "lexical": round(lexical_ms, 2)},
+        }
+
 
 memory_agent = MemoryAgent()
@@ -3,37 +3,118 @@ Search Agent — Search the web for real-time information.
 Uses DuckDuckGo Search (no API key required).
 """
 
+import asyncio
 from typing import Any, Dict, List
-from ddgs import DDGS
+from app.config import settings
+from services.agent_cache import CachePolicy
+from services.http_service import HttpService, http_service
+from services.local_index import LocalIndex, local_index
+from services.page_reader import PageReader, page_reader
 from utils.logger import log
 from .base import BaseAgent
 
 
 class SearchAgent(BaseAgent):
-    def __init__(self):
+    cache_policies = {
+        "web_search": CachePolicy(
+            ttl=300, stale_ttl=900,
+            key_fn=lambda p: {"query": p.get("query"), "deep": bool(p.get("deep", settings.SEARCH_DEEP_MODE))},
+        ),
+    }
+
+    def __init__(self, http: HttpService = None, reader: PageReader = None, index: LocalIndex = None):
         super().__init__(
             name="SearchAgent",
             description="Search the web for real-time information.",
         )
+        self.http = http or http_service
+        self.reader = reader or page_reader
+        self.local_index = index or local_index
 
     async def process_request(
         self, action: str, parameters: Dict[str, Any]
     ) -> Dict[str, Any]:
         if action == "web_search":
             query = parameters.get("query", "")
-            return self.web_search(query)
+            deadline = self.deadline
+            if not deadline.allows():
+                deadline.cut("SearchAgent.web_search")
+                return {"status": "skipped", "query": query, "message": "Out of time for a web search."}
+
+            # Offline index first: milliseconds, no network variance or rate limits
+            local = None
+            if settings.SEARCH_LOCAL_MODE in ("first", "only"):
+                local = await asyncio.to_thread(self.local_search, query, settings.SEARCH_MAX_RESULTS)
+                strong = local.get("status") == "success" and self.local_index.is_confident(local["results"][0])
+                if strong or settings.SEARCH_LOCAL_MODE == "only":
+                    return local
+
+            # Ask for fewer results when the budget is tight
+            max_results = settings.SEARCH_MAX_RESULTS
+            if not deadline.allows(settings.SOURCE_TIMEOUT):
+                max_results = settings.SEARCH_REDUCED_RESULTS
+                deadline.cut("SearchAgent.full_results")
+
+            try:
+                async with self.http.limit("duckduckgo.com"):
+                    result = await asyncio.wait_for(
+                        asyncio.to_thread(self.web_search, query, max_results),
+                        deadline.timeout(settings.SOURCE_TIMEOUT),
+                    )
+            except asyncio.TimeoutError:
+                deadline.cut("SearchAgent.web_search")
+                result = {"status": "error", "query": query, "message": "Web search timed out."}
+
+            if result.get("status") != "success" and local and local.get("status") == "success":
+                return local  # Offline or web failed: weak local hits beat nothing
+
+            if parameters.get("deep", settings.SEARCH_DEEP_MODE) and result.get("status") == "success":
+                if deadline.allows(settings.SEARCH_DEEP_MIN_BUDGET):
+                    await self._deepen(query, result)
+                else:
+                    deadline.cut("SearchAgent.deep")
+            return result
         return {"error": "Unknown action"}
 
-    def web_search(self, query: str) -> Dict[str, Any]:
+    async def _deepen(self, query: str, result: Dict[str, Any]):
+        """Replace the snippet summary with the best passages from the top pages."""
+        passages = await self.reader.best_passages(query, result["results"])
+        if not passages:
+            return  # Keep the snippets
+        result["passages"] = passages
+        result["summary"] = "\n".join(f"- {p['title']} ({p['url']}): {p['text']}" for p in passages)
+        result["message"] = f"Read {len({p['url'] for p in passages})} pages for '{query}'."
+
+    def local_search(self, query: str, max_results: int = 5) -> Dict[str, Any]:
+        if self.local_index.is_empty:
+            return {"status": "no_results", "query": query, "message": "Local index is empty."}
+        try:
+            hits = self.local_index.search(query, max_results)
+        except Exception as e:
+            log.error(f"Local search error: {e}")
+            return {"status": "error", "query": query, "message": f"Local search failed: {e}"}
+        if not hits:
+            return {"status": "no_results", "query": query, "message": f"Nothing in the local index for '{query}'"}
+        return {
+            "status": "success",
+            "agent": "SearchAgent",
+            "action": "web_search",
+            "source_name": "local",
+            "results": hits,
+            "summary": "\n".join(f"- {h['title']}: {h['snippet']}" for h in hits),
+            "query": query,
+            "message": f"Found {len(hits)} passages in the local index.",
+        }
+
+    def web_search(self, query: str, max_results: int = 5) -> Dict[str, Any]:
         log.info(f"Searching internet (DDG) for info: {query}")
         try:
-            with DDGS() as ddgs:
-                # Text search
-                results = list(ddgs.text(
-                    query,
-                    max_results=5,
-                    safesearch="moderate",
-                ))
+            # Text search over the shared DDG session
+            results = list(self.http.ddgs().text(
+                query,
+                max_results=max_results,
+                safesearch="moderate",
+            ))
 
             if results:
                 formatted_results = [
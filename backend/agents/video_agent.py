@@ -3,76 +3,141 @@ Video Agent — Search and fetch real videos from the internet.
 Uses Pexels API.
 """
 
-from typing import Any, Dict, List
-
-from pexelsapi.pexels import Pexels as PexelsAPI
+import asyncio
+from typing import Any, Dict, List, Optional
 
 from app.config import settings
+from services.agent_cache import CachePolicy
+from services.pexels_service import PexelsService, PexelsUnavailable, pexels_service
+from services.media_cache import proxy_media
+from services.video_preview import preview_url, video_preview
 from utils.logger import log
 from .base import BaseAgent
 
+# Rendition ladder (short side, in pixels), tried from the target downwards
+QUALITY_TIERS = (2160, 1440, 1080, 720, 540, 360, 240)
+
+# Downlink (Mbps) → tallest tier worth streaming
+BANDWIDTH_TIERS = ((1.5, 360), (3.0, 540), (5.0, 720), (10.0, 1080), (20.0, 1440))
+
+
+def target_height(client: Dict[str, Any] = None) -> int:
+    """Tallest useful rendition for the client's declared viewport and bandwidth."""
+    if not client:
+        return settings.VIDEO_DEFAULT_MAX_HEIGHT
+    target = QUALITY_TIERS[0]
+    width = client.get("viewport_width")
+    if width:
+        # Videos are shown 16:9 at most the viewport width
+        target = min(target, int(width * (client.get("dpr") or 1) * 9 / 16))
+    if client.get("save_data"):
+        target = min(target, 360)
+    elif client.get("downlink_mbps"):
+        for limit, tier in BANDWIDTH_TIERS:
+            if client["downlink_mbps"] < limit:
+                target = min(target, tier)
+                break
+    return next((t for t in QUALITY_TIERS if t <= target), QUALITY_TIERS[-1])
+
+
+def _short_side(video_file: Dict[str, Any]) -> int:
+    return min(video_file.get("width") or 0, video_file.get("height") or 0)
+
+
+def select_rendition(video_files: List[Dict[str, Any]], max_height: int) -> Optional[Dict[str, Any]]:
+    """Best mp4 rendition at or below max_height, stepping down the tier ladder."""
+    files = [f for f in video_files if f.get("link") and f.get("file_type", "video/mp4") == "video/mp4"]
+    if not files:
+        return None
+    for tier in (t for t in QUALITY_TIERS if t <= max_height):
+        lower = QUALITY_TIERS[QUALITY_TIERS.index(tier) + 1] if tier != QUALITY_TIERS[-1] else 0
+        matches = [f for f in files if lower < _short_side(f) <= tier]
+        if matches:
+            # Prefer standard frame rates over high-fps variants of the same size
+            return min(matches, key=lambda f: (f.get("fps") or 30) > 31)
+    # Nothing small enough: take the lightest available
+    return min(files, key=_short_side)
+
 
 class VideoAgent(BaseAgent):
-    def __init__(self):
+    cache_policies = {
+        "fetch_video": CachePolicy(
+            ttl=3600, stale_ttl=86400,
+            key_fn=lambda p: {"query": p.get("query"), "max_height": target_height(p.get("client"))},
+        ),
+    }
+
+    def __init__(self, pexels: PexelsService = None):
         super().__init__(
             name="VideoAgent",
             description="Search and fetch real videos from the internet.",
         )
-        self.pexels = None
-        if settings.PEXELS_API_KEY:
-            try:
-                self.pexels = PexelsAPI(settings.PEXELS_API_KEY)
-                log.info("Pexels API initialized for VideoAgent.")
-            except Exception as e:
-                log.warning(f"Failed to init Pexels API for VideoAgent: {e}")
+        self.pexels = pexels or pexels_service
 
     async def process_request(
         self, action: str, parameters: Dict[str, Any]
     ) -> Dict[str, Any]:
         if action == "fetch_video":
             query = parameters.get("query", "nature")
-            return self.fetch_video(query)
+            max_height = target_height(parameters.get("client"))
+            deadline = self.deadline
+            if not deadline.allows():
+                deadline.cut("VideoAgent.fetch_video")
+                return {"status": "skipped", "query": query, "message": "Out of time for a video search."}
+            try:
+                return await asyncio.wait_for(
+                    self.fetch_video(query, max_height),
+                    deadline.timeout(settings.SOURCE_TIMEOUT),
+                )
+            except asyncio.TimeoutError:
+                deadline.cut("VideoAgent.fetch_video")
+                return {"status": "error", "query": query, "message": "Video search timed out."}
         return {"error": "Unknown action"}
 
-    def fetch_video(self, query: str) -> Dict[str, Any]:
-        if not self.pexels:
-            return {"error": "Pexels API key not configured for videos."}
-
+    async def fetch_video(self, query: str, max_height: int = None) -> Dict[str, Any]:
+        # No quota pre-check: cached responses are served even when the budget
+        # is exhausted, and _get fails fast with PexelsUnavailable otherwise
         log.info(f"Searching Pexels for video: {query}")
         try:
             # search_videos returns a dict with 'videos' list
-            results_dict = self.pexels.search_videos(query, page=1, per_page=5)
+            results_dict = await self.pexels.search_videos(query)
             videos = results_dict.get("videos", [])
 
             if videos:
+                max_height = max_height or settings.VIDEO_DEFAULT_MAX_HEIGHT
                 all_videos = []
                 for vid in videos:
-                    # Get the best link (usually the first one in video_files)
+                    # Pick the rendition that fits the client instead of video_files[0]
                     video_files = vid.get("video_files", [])
-                    video_url = ""
-                    if video_files:
-                        # Prefer HD or high quality
-                        video_url = video_files[0].get("link", "")
-                    
-                    all_videos.append({
+                    chosen = select_rendition(video_files, max_height) or {}
+                    video_url = chosen.get("link", "")
+
+                    entry = {
                         "video_url": video_url,
                         "thumbnail": vid.get("image", ""),
                         "title": f"Video by {vid.get('user', {}).get('name', 'Pexels')}",
                         "source": vid.get("url", ""),
-                        "duration": vid.get("duration", 0)
-                    })
+                        "duration": vid.get("duration", 0),
+                        "rendition": {"width": chosen.get("width"), "height": chosen.get("height")},
+                    }
+                    lightest = select_rendition(video_files, QUALITY_TIERS[-1])
+                    if video_preview.available and lightest:
+                        entry["preview_url"] = preview_url(lightest["link"], "clip")
+                        entry["sprite_url"] = preview_url(lightest["link"], "sprite")
+                    all_videos.append(entry)
 
                 best = all_videos[0]
-                return {
+                return proxy_media({
                     "status": "success",
                     "video_url": best["video_url"],
                     "thumbnail": best["thumbnail"],
                     "title": best["title"],
                     "source": best["source"],
+                    "preview_url": best.get("preview_url"),
                     "all_videos": all_videos,
                     "query": query,
                     "message": f"Found {len(all_videos)} high-quality videos from Pexels",
-                }
+                })
             else:
                 return {
                     "status": "no_results",
@@ -80,6 +145,9 @@ class VideoAgent(BaseAgent):
                     "message": f"No videos found for '{query}'",
                 }
 
+        except PexelsUnavailable as e:
+            log.info(f"Video search skipped: {e}")
+            return {"status": "error", "query": query, "message": f"Video search unavailable: {e}"}
         except Exception as e:
             log.error(f"Video search error: {e}")
             return {
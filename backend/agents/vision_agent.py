@@ -1,11 +1,18 @@
 """
 Vision Agent — Camera capture and hand detection.
+Frames come from the shared CameraService, so no call opens the device itself;
+screen analysis goes through the tile-diffing ScreenWatcher.
 """
 
+import asyncio
 import importlib.util
-import os
+import time
 from typing import Any, Dict
 
+from services.camera_service import CameraService, CameraUnavailable, camera_service
+from services.frame_encoder import capture_snapshot
+from services.hand_tracker import hand_tracker
+from services.screen_service import ScreenWatcher, screen_watcher
 from utils.logger import log
 from .base import BaseAgent
 
@@ -22,9 +29,10 @@ except ImportError:
     HAS_MEDIAPIPE = False
 
 class VisionAgent(BaseAgent):
-    def __init__(self):
+    def __init__(self, camera: CameraService = None, screen: ScreenWatcher = None):
         super().__init__(name="VisionAgent", description="Analyze visual input.")
-        self.camera_index = 0
+        self.camera = camera or camera_service
+        self.screen = screen or screen_watcher
         self.hands = None
         self.mp_hands = None
 
@@ -47,46 +55,77 @@ class VisionAgent(BaseAgent):
         if cv2 is None:
             return {"error": "OpenCV (cv2) not installed."}
 
+        # Waiting for a frame (first open only) blocks, so keep it off the loop
         if action == "capture_frame":
-            return self.capture_frame()
+            return await asyncio.to_thread(
+                self.capture_frame, parameters.get("quality"), parameters.get("width")
+            )
         elif action == "detect_hands":
-            return self.detect_hands()
+            return await asyncio.to_thread(self.detect_hands)
+        elif action == "analyze_screen":
+            deadline = self.deadline
+            if not deadline.allows():
+                deadline.cut("VisionAgent.analyze_screen")
+                return {"status": "skipped", "message": "Out of time for a screen analysis."}
+            result = await asyncio.to_thread(self.analyze_screen, deadline.timeout())
+            if result.get("pending"):
+                deadline.cut("VisionAgent.analyze_screen")
+            return result
         return {"error": "Unknown action"}
 
-    def capture_frame(self):
-        log.info("Capturing frame from webcam...")
-        cap = cv2.VideoCapture(self.camera_index)
-        if not cap.isOpened():
-            return {"error": "Could not open camera"}
-
-        for _ in range(5):
-            cap.read()
-
-        ret, frame = cap.read()
-        cap.release()
+    def analyze_screen(self, budget: float = None):
+        """Screen text, re-analysing only the regions that changed since the last look.
+
+        OCR stops when `budget` runs out; the rest of the screen is read on the next call.
+        """
+        if not self.screen.capture.available:
+            return {"status": "error", "message": "Screen capture not available (install mss)."}
+        if "ocr" not in self.screen.analyzers:
+            return {"status": "error", "message": "Screen text unavailable (needs pytesseract and tesseract)."}
+        pending = 0
+        if not self.screen.running:
+            try:
+                pending = self.screen.step(budget)["pending"]
+            except Exception as e:
+                return {"status": "error", "message": f"Screen capture failed: {e}"}
+        text = self.screen.screen_text()
+        return {
+            "status": "success",
+            "message": "Read part of the screen (out of time)." if pending else "Analyzed the screen.",
+            "summary": text[:2000],
+            "pending": pending,
+            "regions": {name: len(self.screen.results(name)) for name in self.screen.analyzers},
+            "dirty_ratio": self.screen.stats["dirty_ratio"],
+        }
 
-        if ret:
-            os.makedirs("data/images", exist_ok=True)
-            path = "data/images/capture.jpg"
-            cv2.imwrite(path, frame)
-            return {"status": "success", "image_path": path}
-        else:
-            return {"status": "error", "message": "Could not read frame"}
+    def capture_frame(self, quality: int = None, width: int = None):
+        log.info("Capturing frame from webcam...")
+        try:
+            snapshot = capture_snapshot(self.camera, quality, width)
+        except CameraUnavailable as e:
+            return {"status": "error", "message": str(e)}
+        return {"status": "success", **snapshot}
 
     def detect_hands(self):
+        tracked = hand_tracker.latest
+        if hand_tracker.running and tracked and time.time() - tracked["ts"] < 1.0:
+            # The stream already tracks hands; don't run a second model on the same frame
+            hands = tracked["hands"]
+            return {
+                "status": "success",
+                "hand_count": len(hands),
+                "message": f"Detected {len(hands)} hands.",
+                "details": [{"thumb_y": h["points"][4][1], "index_y": h["points"][8][1]} for h in hands],
+            }
+
         if not self.hands:
             return {"error": "Hand detection model not initialized"}
 
         log.info("Detecting hands...")
-        cap = cv2.VideoCapture(self.camera_index)
-        if not cap.isOpened():
-            return {"error": "Could not open camera"}
-
-        ret, frame = cap.read()
-        cap.release()
-
-        if not ret:
-            return {"error": "Could not capture frame"}
+        try:
+            _, _, frame = self.camera.latest(copy=False)
+        except CameraUnavailable as e:
+            return {"error": str(e)}
 
         image_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
         results = self.hands.process(image_rgb)
@@ -0,0 +1,54 @@
+"""
+Application Index REST API Routes
+─────────────────────────────────
+Inspect and query the installed-application index used by open_application.
+
+  GET  /api/apps                        index size, lookup latency, refresh stats
+  GET  /api/apps/search?q=vs+code       ranked matches
+  POST /api/apps/refresh                rescan changed sources now
+  POST /api/apps/aliases                add a user alias {"alias", "command"}
+
+Refresh and alias writes are behind utils.access (local clients or
+API_TOKEN); an alias may only name an installed app, without arguments.
+"""
+
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel
+
+from services.app_index import app_index
+from utils.access import require_access
+
+router = APIRouter(prefix="/api/apps", tags=["apps"])
+
+
+class AliasRequest(BaseModel):
+    alias: str
+    command: str
+
+
+@router.get("")
+async def index_status():
+    return app_index.metrics()
+
+
+@router.get("/search")
+async def search_apps(q: str = Query(..., min_length=1), limit: int = Query(5, ge=1, le=50)):
+    return {"query": q, "matches": await asyncio.to_thread(app_index.search, q, limit)}
+
+
+@router.post("/refresh", dependencies=[Depends(require_access)])
+async def refresh_index(full: bool = False):
+    rescanned = await asyncio.to_thread(app_index.refresh, full)
+    return {"rescanned": rescanned, **app_index.metrics()}
+
+
+@router.post("/aliases", dependencies=[Depends(require_access)])
+async def add_alias(body: AliasRequest):
+    try:
+        await asyncio.to_thread(app_index.add_alias, body.alias, body.command)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    match = await asyncio.to_thread(app_index.search, body.alias, 1)
+    return {"alias": body.alias.lower(), "resolves_to": match[0] if match else None}
@@ -0,0 +1,59 @@
+"""
+Local Index REST API Routes
+───────────────────────────
+Start and monitor offline index ingestion, and query the index directly.
+"""
+
+import asyncio
+import os
+
+from fastapi import APIRouter, HTTPException, Query
+from pydantic import BaseModel
+
+from services.local_index import local_index
+from utils.logger import log
+
+router = APIRouter(prefix="/api/local-index", tags=["local-index"])
+
+
+class IngestRequest(BaseModel):
+    path: str
+
+
+async def _ingest(path: str):
+    try:
+        await asyncio.to_thread(local_index.ingest, path)
+    except Exception as e:
+        log.error(f"Local index ingestion of {path} failed: {e}")
+
+
+@router.get("")
+async def index_status():
+    """Index size, last query latencies and ingestion progress."""
+    return local_index.metrics()
+
+
+@router.post("/ingest", status_code=202)
+async def start_ingest(body: IngestRequest):
+    """
+    Index a folder or dump file in the background. Re-posting the same path
+    resumes an interrupted load and only picks up changed files. Only paths
+    under LOCAL_INDEX_ROOTS are accepted (use the CLI for anything else).
+    """
+    if not local_index.allowed(body.path):
+        raise HTTPException(status_code=403, detail="Path is outside the configured LOCAL_INDEX_ROOTS")
+    if not os.path.exists(body.path):
+        raise HTTPException(status_code=404, detail=f"Path not found: {body.path}")
+    if local_index.progress.get("running"):
+        raise HTTPException(status_code=409, detail="An ingestion is already running")
+    asyncio.create_task(_ingest(body.path))
+    return {"status": "started", "path": os.path.abspath(body.path)}
+
+
+@router.get("/search")
+async def search_index(
+    q: str = Query(..., description="Query text"),
+    k: int = Query(5, ge=1, le=50),
+):
+    """Hybrid keyword + semantic search over the local index."""
+    return {"query": q, "results": await asyncio.to_thread(local_index.search, q, k)}
@@ -0,0 +1,88 @@
+"""
+Media Proxy REST API Routes
+───────────────────────────
+Serves cached, resized copies of third-party images referenced in agent
+results, so each asset is downloaded once for all dashboards. Videos
+(`fmt=original`) are streamed through with Range support.
+"""
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import FileResponse, StreamingResponse
+from starlette.background import BackgroundTask
+
+from services.media_cache import MediaError, is_safe_type, media_cache
+from services.video_preview import video_preview
+
+router = APIRouter(prefix="/api", tags=["media"])
+
+# Variants are keyed by source URL + size, so they never change
+CACHE_HEADERS = {"Cache-Control": "public, max-age=31536000, immutable", "X-Content-Type-Options": "nosniff"}
+
+# Upstream headers a streamed (Range) response needs to stay seekable
+STREAM_HEADERS = (
+    "content-length", "content-range", "accept-ranges", "content-encoding",
+    "etag", "last-modified", "cache-control",
+)
+
+
+@router.get("/media")
+async def get_media(
+    request: Request,
+    url: str = Query(..., description="Remote asset URL"),
+    w: int = Query(None, ge=16, le=4096, description="Target display width in pixels"),
+    fmt: str = Query("auto", description="auto | webp | jpeg | original"),
+):
+    """
+    Fetch a remote asset through the local cache.
+    With `fmt=auto` WebP is served to clients that accept it, JPEG otherwise.
+    """
+    if fmt == "auto":
+        fmt = "webp" if "image/webp" in request.headers.get("accept", "") else "jpeg"
+
+    try:
+        if fmt == "original":
+            cached = media_cache.cached_original(url)
+            if cached is None:
+                return await _stream_through(request, url)
+            path, media_type = cached
+        else:
+            path, media_type = await media_cache.variant(url, w, fmt)
+    except MediaError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+    headers = {**CACHE_HEADERS, **_disposition(media_type), "Vary": "Accept"}
+    return FileResponse(path, media_type=media_type, headers=headers)
+
+
+def _disposition(media_type: str) -> dict:
+    """Anything that isn't plain image/video/audio (e.g. an unsniffable cached file) is a download."""
+    return {} if is_safe_type(media_type) else {"Content-Disposition": "attachment"}
+
+
+async def _stream_through(request: Request, url: str) -> StreamingResponse:
+    """Relay the upstream body as it arrives; the client's Range header is passed on."""
+    resp = await media_cache.open_stream(url, request.headers.get("range"))
+    headers = {k: resp.headers[k] for k in STREAM_HEADERS if k in resp.headers}
+    media_type = resp.headers.get("content-type", "application/octet-stream")
+    headers.update({"X-Content-Type-Options": "nosniff", **_disposition(media_type)})
+    return StreamingResponse(
+        resp.aiter_raw(),
+        status_code=resp.status_code,
+        media_type=media_type,
+        headers=headers,
+        background=BackgroundTask(resp.aclose),
+    )
+
+
+@router.get("/media/preview")
+async def get_media_preview(
+    url: str = Query(..., description="Remote video URL"),
+    kind: str = Query("clip", description="clip (short silent loop) | sprite (frame strip)"),
+    sig: str = Query("", description="Signature from the agent-issued preview URL"),
+):
+    """Low-bitrate preview clip or poster sprite for a video, generated once with ffmpeg."""
+    try:
+        path, media_type = await video_preview.preview(url, kind, sig)
+    except MediaError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    return FileResponse(path, media_type=media_type, headers=CACHE_HEADERS)
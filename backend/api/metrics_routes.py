@@ -0,0 +1,86 @@
+"""
+Metrics REST API Routes
+───────────────────────
+Lightweight runtime metrics for tuning latency and prompt budgets.
+"""
+
+from fastapi import APIRouter
+
+from agents.chief_agent import chief_agent
+from services.agent_cache import agent_cache
+from services.app_index import app_index
+from services.camera_service import camera_service
+from services.db_service import db_service
+from services.embedding_service import embedding_service
+from services.frame_encoder import frame_encoder, snapshot_store
+from services.hand_tracker import hand_tracker
+from services.http_service import http_service
+from services.interaction_log import interaction_log
+from services.local_index import local_index
+from services.media_cache import media_cache
+from services.memory_lifecycle import memory_compactor
+from services.page_reader import page_reader
+from services.pexels_service import pexels_service
+from services.process_service import process_service
+from services.wiki_index import wiki_index
+from services.screen_service import screen_watcher
+from services.session_service import session_service
+from services.vector_service import vector_service
+
+router = APIRouter(prefix="/api/metrics", tags=["metrics"])
+
+
+@router.get("")
+async def all_metrics():
+    """All runtime metrics in a single payload."""
+    return {
+        "sessions": session_service.metrics(),
+        "briefing": chief_agent.briefing_stats,
+        "agent_cache": agent_cache.metrics(),
+        "http": http_service.metrics(),
+        "wiki_index": wiki_index.metrics(),
+        "media_cache": media_cache.metrics(),
+        "pexels": pexels_service.metrics(),
+        "deep_search": page_reader.metrics(),
+        "local_index": local_index.metrics(),
+        "embeddings": embedding_service.metrics(),
+        "memory": {
+            **vector_service.metrics(), "recall": chief_agent.memory_agent.recall_stats,
+            "routing": chief_agent.memory_metrics(),
+        },
+        "memory_lifecycle": memory_compactor.metrics(),
+        "interaction_log": interaction_log.metrics(),
+        "database": db_service.metrics(),
+        "camera": {**camera_service.metrics(), "encoder": frame_encoder.metrics(), **snapshot_store.metrics()},
+        "hand_tracking": hand_tracker.metrics(),
+        "screen": screen_watcher.metrics(),
+        "processes": process_service.metrics(),
+        "apps": app_index.metrics(),
+    }
+
+
+@router.get("/sessions")
+async def session_metrics():
+    """Prompt size and background summary lag for conversation sessions."""
+    return session_service.metrics()
+
+
+@router.get("/briefing")
+async def briefing_metrics():
+    """Supplemental briefing outcomes against the latency budget."""
+    return chief_agent.briefing_stats
+
+
+@router.get("/memory")
+async def memory_metrics():
+    """Long-term memory size, dedup merges and compaction history."""
+    return {
+        **vector_service.metrics(), "lifecycle": memory_compactor.metrics(),
+        "routing": chief_agent.memory_metrics(),
+    }
+
+
+@router.get("/cache")
+async def cache_metrics():
+    """Hit ratio, coalescing and size of the agent result cache."""
+    return agent_cache.metrics()
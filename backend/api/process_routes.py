@@ -0,0 +1,39 @@
+"""
+Process REST API Routes
+───────────────────────
+The process table of commands started by AutomationAgent.
+
+  GET    /api/processes                 running + recently finished processes
+  GET    /api/processes/{id}            one process, with its captured output
+  DELETE /api/processes/{id}            cancel (SIGTERM → SIGKILL)
+
+Command lines and output can hold secrets, so every route is behind
+utils.access (local clients or API_TOKEN).
+"""
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from services.process_service import process_service
+from utils.access import require_access
+
+router = APIRouter(prefix="/api/processes", tags=["processes"], dependencies=[Depends(require_access)])
+
+
+@router.get("")
+async def list_processes():
+    return {"processes": process_service.list(), **process_service.metrics()}
+
+
+@router.get("/{process_id}")
+async def get_process(process_id: str):
+    proc = process_service.get(process_id)
+    if proc is None:
+        raise HTTPException(status_code=404, detail="Unknown process")
+    return {**proc.as_dict(), "stdout": proc.text("stdout"), "stderr": proc.text("stderr")}
+
+
+@router.delete("/{process_id}")
+async def cancel_process(process_id: str):
+    if not await process_service.cancel(process_id):
+        raise HTTPException(status_code=404, detail="No running process with that id")
+    return process_service.get(process_id).as_dict()
@@ -0,0 +1,104 @@
+"""
+Vision REST API Routes
+──────────────────────
+Snapshots and a live MJPEG feed from the shared camera, encoded in memory.
+
+  POST /api/vision/snapshot             capture now → {capture_id, url, …}
+  GET  /api/vision/snapshot/latest      newest frame as JPEG (not stored)
+  GET  /api/vision/snapshot/{id}        a stored capture
+  GET  /api/vision/stream               multipart/x-mixed-replace MJPEG feed
+
+Every route is behind utils.access (local clients or API_TOKEN); a stored
+capture is also served for the signed `image_url` its capture returned.
+"""
+
+import asyncio
+import time
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
+
+from app.config import settings
+from services.camera_service import CameraUnavailable, camera_service
+from services.frame_encoder import capture_snapshot, frame_encoder, snapshot_store, verify_capture
+from utils.access import allowed, require_access
+from utils.logger import log
+
+router = APIRouter(prefix="/api/vision", tags=["vision"])
+guarded = [Depends(require_access)]
+
+BOUNDARY = "frame"
+
+
+@router.post("/snapshot", dependencies=guarded)
+async def create_snapshot(
+    quality: int = Query(None, ge=10, le=100),
+    w: int = Query(None, ge=16, le=4096, description="Target width in pixels"),
+):
+    try:
+        return await asyncio.to_thread(capture_snapshot, camera_service, quality, w)
+    except CameraUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+@router.get("/snapshot/latest", dependencies=guarded)
+async def latest_snapshot(
+    quality: int = Query(None, ge=10, le=100),
+    w: int = Query(None, ge=16, le=4096),
+):
+    try:
+        seq, _, frame = await asyncio.to_thread(camera_service.latest, None, False)
+        data = await asyncio.to_thread(frame_encoder.encode, frame, quality, w, seq)
+    except CameraUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return Response(data, media_type="image/jpeg", headers={"Cache-Control": "no-store"})
+
+
+@router.get("/snapshot/{capture_id}")
+async def get_snapshot(
+    request: Request,
+    capture_id: str,
+    sig: str = Query("", description="Signature from the capture's image_url"),
+):
+    if not (verify_capture(capture_id, sig) or allowed(request)):
+        raise HTTPException(status_code=403, detail="Local access, a valid API token or a signed URL is required")
+    item = snapshot_store.get(capture_id)
+    if item is None:
+        raise HTTPException(status_code=404, detail="Snapshot not found or expired")
+    data, _ = item
+    # A capture id always refers to the same image
+    return Response(data, media_type="image/jpeg", headers={"Cache-Control": "private, max-age=3600, immutable"})
+
+
+async def mjpeg_frames(quality: int, width: int, fps: float):
+    interval = 1.0 / fps
+    camera_service.subscribe()
+    try:
+        seq = 0
+        while True:
+            started = time.monotonic()
+            seq, _, frame = await asyncio.to_thread(camera_service.wait_frame, seq, None, False)
+            data = await asyncio.to_thread(frame_encoder.encode, frame, quality, width, seq)
+            yield (
+                f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\nContent-Length: {len(data)}\r\n\r\n".encode()
+                + data + b"\r\n"
+            )
+            await asyncio.sleep(max(0.0, interval - (time.monotonic() - started)))
+    except CameraUnavailable as e:
+        log.warning(f"MJPEG stream ended: {e}")
+    finally:
+        camera_service.unsubscribe()
+
+
+@router.get("/stream", dependencies=guarded)
+async def mjpeg_stream(
+    quality: int = Query(None, ge=10, le=100),
+    w: int = Query(None, ge=16, le=4096),
+    fps: float = Query(None, gt=0, le=60),
+):
+    fps = min(fps or settings.MJPEG_MAX_FPS, settings.MJPEG_MAX_FPS)
+    return StreamingResponse(
+        mjpeg_frames(quality or settings.MJPEG_QUALITY, w or settings.MJPEG_DEFAULT_WIDTH, fps),
+        media_type=f"multipart/x-mixed-replace; boundary={BOUNDARY}",
+        headers={"Cache-Control": "no-store"},
+    )
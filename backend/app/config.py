@@ -6,7 +6,7 @@ All config is driven by environment variables / .env file.
 """
 
 from functools import lru_cache
-from typing import List
+from typing import Dict, List
 
 from pydantic_settings import BaseSettings
 
@@ -18,17 +18,103 @@ class Settings(BaseSettings):
     API_V1_STR: str = "/api/v1"
     LOG_LEVEL: str = "INFO"
 
+    # ── Access ───────────────────────────────────────
+    API_TOKEN: str = ""                     # Required from non-local clients on guarded routes
+    API_TRUST_LOCALHOST: bool = True        # Loopback skips the token (off behind a proxy)
+
     # ── Database ─────────────────────────────────────
+    DB_BACKEND: str = "mongo"               # "mongo" | "sqlite"
+    SQLITE_DB_PATH: str = "./data/jarvis.sqlite3"
+    SQLITE_PURGE_INTERVAL: int = 3600       # Seconds between TTL sweeps (sqlite)
     MONGODB_URL: str = "mongodb://localhost:27017"
     DATABASE_NAME: str = "jarvis_db"
+    MONGODB_TIMEOUT_MS: int = 2000         # Server selection; fail fast when mongod is down
+
+    # ── Interaction Log (write-behind) ───────────────
+    LOG_ENABLED: bool = True
+    LOG_BATCH_SIZE: int = 200              # insert_many at this many documents…
+    LOG_FLUSH_INTERVAL: float = 2.0        # …or after this many seconds
+    LOG_QUEUE_MAX: int = 10000             # Drop new documents beyond this
+    LOG_SAMPLE_ABOVE: float = 0.5          # Queue fill ratio where sampling starts
+    LOG_SAMPLE_RATE: float = 0.1           # Fraction kept while sampling
+    LOG_MAX_FIELD_CHARS: int = 2000
+    LOG_MAX_LIST_ITEMS: int = 20
+    LOG_COLLECTIONS: Dict[str, int] = {    # Collection → TTL in seconds
+        "interactions": 30 * 86400,
+        "errors": 90 * 86400,
+    }
 
     # ── Vector DB ────────────────────────────────────
     CHROMA_DB_PATH: str = "./data/chroma_db"
+    EMBED_MODEL: str = "all-MiniLM-L6-v2"
+    EMBED_MAX_BATCH: int = 64             # Flush a micro-batch at this many texts…
+    EMBED_BATCH_WINDOW: float = 0.005     # …or after this many seconds
+    VECTOR_BACKEND: str = "chroma"        # "chroma" | "quantized"
+    QUANT_INDEX_DIR: str = "./data/memory_index"
+    QUANT_SEARCH: str = "auto"            # "exact" | "ivf" | "auto" (IVF past QUANT_IVF_MIN_ROWS)
+    QUANT_IVF_MIN_ROWS: int = 20000
+    QUANT_IVF_NPROBE: int = 8
+    MEMORY_LEXICON_PATH: str = "./data/memory_lexicon.sqlite3"
+    MEMORY_RECALL_K: int = 3
+    MEMORY_CANDIDATES: int = 20           # Per-branch depth before fusion
+    MEMORY_RRF_K: int = 60
+
+    # ── Memory Lifecycle ─────────────────────────────
+    MEMORY_DEDUP_SIMILARITY: float = 0.95   # Top-1 cosine at/above which an insert merges
+    MEMORY_DEFAULT_IMPORTANCE: float = 0.5
+    MEMORY_DEFAULT_TTL: int = 0             # Seconds; 0 = memories don't expire
+    MEMORY_COMPACT_INTERVAL: int = 3600
+    MEMORY_STALE_AFTER: int = 30 * 86400    # Not seen for this long → compaction candidate…
+    MEMORY_KEEP_IMPORTANCE: float = 0.7     # …unless at least this important
+    MEMORY_TOUCH_INTERVAL: int = 3600       # Min seconds between last_seen updates on recall
+    MEMORY_COMPACT_BATCH: int = 500
+    MEMORY_SUMMARY_GROUP: int = 20          # Stale memories folded per summary
+    MEMORY_TOMBSTONE_RATIO: float = 0.2     # Rewrite the quantized index past this
+    MEMORY_SIZE_HISTORY: int = 168          # Size samples kept (one per compaction run)
+
+    # ── Memory-Augmented Routing ─────────────────────
+    MEMORY_INJECT_ENABLED: bool = True
+    MEMORY_INJECT_K: int = 3
+    MEMORY_INJECT_TOKENS: int = 150         # Prompt tokens for the [MEMORY] section
+    MEMORY_INJECT_TIMEOUT: float = 0.25     # Seconds routing will wait for recall
+    MEMORY_INJECT_MIN_BUDGET: float = 0.5   # Skip recall with less request time left (< DEADLINE_VOICE)
+    MEMORY_INJECT_MAX_DISTANCE: float = 0.6 # Cosine distance above which a hit is ignored
+    MEMORY_INJECT_MIN_BM25: float = 2.0     # Lexical-only hits (no vector match) need this score
+    MEMORY_USER_ID: str = "local"           # Memory owner when a client sends no user_id
 
     # ── LLM (Ollama) ────────────────────────────────
     OLLAMA_BASE_URL: str = "http://localhost:11434"
     LLM_MODEL: str = "llama3.2:1b"
 
+    # Model tiers per call site (empty → LLM_MODEL)
+    LLM_ROUTER_MODEL: str = ""
+    LLM_BRIEFING_MODEL: str = ""
+    LLM_SUMMARY_MODEL: str = ""
+    LLM_ROUTER_NUM_PREDICT: int = 256
+    LLM_BRIEFING_NUM_PREDICT: int = 80
+    LLM_SUMMARY_NUM_PREDICT: int = 96
+
+    # Supplemental briefing: "concurrent" (with result broadcast), "serial" or "off"
+    BRIEFING_MODE: str = "concurrent"
+    BRIEFING_LATENCY_BUDGET: float = 4.0  # Seconds; partial text is kept on overrun
+    BRIEFING_MIN_BUDGET: float = 0.5      # Skip the briefing if less time is left
+
+    # ── Request Deadlines (seconds, 0 = unbounded) ───
+    DEADLINE_VOICE: float = 2.0
+    DEADLINE_DASHBOARD: float = 8.0
+    DEADLINE_DEFAULT: float = 10.0
+    DEADLINE_MIN_STAGE: float = 0.25      # Don't start an optional stage with less left
+
+    # ── Session Context ──────────────────────────────
+    SESSION_MAX_TURNS: int = 6            # Ring buffer size per client
+    SESSION_TOKEN_BUDGET: int = 384       # Hard cap for recent turns in the prompt
+    SESSION_SUMMARY_TOKENS: int = 96      # Hard cap for the rolling summary
+    SESSION_MAX_CLIENTS: int = 64
+    SESSION_IDLE_TTL: int = 3600          # Seconds before an idle session is dropped
+    SESSION_PERSIST: bool = True          # Mirror turns/summaries to db_service's store
+    SESSION_PERSIST_TTL: int = 7 * 86400  # Stored turns expire after this many seconds
+    SESSION_RESTORE_TIMEOUT: float = 0.25 # Max wait to reload a session on first contact
+
     # ── Voice / TTS ──────────────────────────────────
     WHISPER_MODEL_SIZE: str = "base"
     TTS_ENGINE: str = "kitten"  # KittenTTS (lightweight, 15M params)
@@ -38,6 +124,63 @@ class Settings(BaseSettings):
 
     # ── Vision ───────────────────────────────────────
     CAMERA_INDEX: int = 0
+    CAMERA_SOURCE: str = ""                 # Device index or video file path ("" = CAMERA_INDEX)
+    CAMERA_WIDTH: int = 640
+    CAMERA_HEIGHT: int = 480
+    CAMERA_BUFFER_FRAMES: int = 4           # Ring buffer size (frames kept in memory)
+    CAMERA_WARMUP_FRAMES: int = 5           # Discarded once per open, not per request
+    CAMERA_IDLE_TIMEOUT: float = 30.0       # Release the device after this long unused
+    CAMERA_OPEN_TIMEOUT: float = 5.0        # Max wait for the first frame
+    JPEG_QUALITY: int = 80                  # Snapshots (encoded in memory)
+    SNAPSHOT_MAX_ENTRIES: int = 32
+    SNAPSHOT_TTL: float = 300.0
+    MJPEG_QUALITY: int = 70
+    MJPEG_DEFAULT_WIDTH: int = 640
+    MJPEG_MAX_FPS: float = 15.0
+
+    # ── Screen Awareness ─────────────────────────────
+    SCREEN_MONITOR: int = 1                 # mss monitor index (0 = all monitors)
+    SCREEN_WATCH_ENABLED: bool = False      # Background watcher; otherwise on demand
+    SCREEN_FPS: float = 2.0
+    SCREEN_TILE_SIZE: int = 64              # Pixels per tile side
+    SCREEN_REGION_TILES: int = 4            # Max tiles per side of an analysed region
+    SCREEN_DIFF_STRIDE: int = 2             # Pixel subsampling for the diff
+    SCREEN_DIFF_THRESHOLD: float = 4.0      # Mean per-tile change (0–255) that marks it dirty
+    SCREEN_OCR_ENABLED: bool = True         # Needs pytesseract + tesseract
+    SCREEN_OCR_BAND_TILES: int = 2          # OCR region height in tiles; width spans the dirty run
+    SCREEN_OCR_MARGIN: int = 8              # Pixels of context added around each OCR crop
+
+    # ── Hand Tracking (stream mode) ──────────────────
+    HAND_TRACK_WIDTH: int = 320             # Frames are downscaled to this width
+    HAND_TRACK_FPS: float = 15.0            # Target rate…
+    HAND_TRACK_MIN_FPS: float = 5.0         # …lowered to no less than this under CPU load
+    HAND_TRACK_CPU_CEILING: float = 85.0    # System CPU % that triggers throttling
+    HAND_TRACK_MODEL_COMPLEXITY: int = 0    # 0 = lite model
+    HAND_TRACK_MAX_HANDS: int = 2
+
+    # ── Automation / Processes ───────────────────────
+    PROC_TIMEOUT: float = 60.0              # execute_command (foreground)
+    PROC_BACKGROUND_TIMEOUT: float = 3600.0 # execute_command with background=true
+    PROC_KILL_GRACE: float = 3.0            # SIGTERM → SIGKILL delay
+    PROC_MAX_OUTPUT_BYTES: int = 262144     # Kept per stream; the rest is dropped
+    PROC_READ_CHUNK: int = 4096
+    PROC_HISTORY: int = 50                  # Finished processes kept in the table
+
+    # ── Application Index ────────────────────────────
+    APP_INDEX_PATH: str = "./data/app_index.json"
+    APP_ALIASES_PATH: str = "./data/app_aliases.json"   # User aliases, e.g. {"editor": "code"}
+    APP_ALIASES: Dict[str, str] = {         # Ignored when the target isn't installed
+        "vs code": "code", "vscode": "code", "chrome": "google-chrome",
+        "terminal": "x-terminal-emulator", "calculator": "gnome-calculator",
+    }
+    APP_DENYLIST: List[str] = [             # Never indexed, from any source
+        "poweroff", "shutdown", "reboot", "halt", "suspend", "hibernate", "systemctl", "loginctl",
+        "init", "telinit", "logout", "logoff", "gnome-session-quit", "xfce4-session-logout",
+        "lxsession-logout", "kill", "pkill", "killall", "xkill", "rm", "rmdir", "dd", "mkfs", "shred",
+        "wipefs", "fdisk", "sfdisk", "parted", "diskpart", "format", "rundll32", "sudo", "su", "doas",
+    ]
+    APP_INDEX_REFRESH_INTERVAL: float = 30.0   # mtime rescan period without inotify
+    APP_INDEX_QUERY_CACHE: int = 256
 
     # ── System ───────────────────────────────────────
     ALLOW_ORIGINS: List[str] = ["*"]
@@ -48,11 +191,89 @@ class Settings(BaseSettings):
     AUDIO_BLOCK_SIZE: int = 4096
     SILENCE_THRESHOLD: float = 0.01
     SILENCE_DURATION: float = 1.5
+    VOICE_CLIENT_ID_PATH: str = "./data/voice_client_id"   # Keeps the session id across runs
+    VOICE_USER_ID: str = ""                 # Memory owner ("" → server's MEMORY_USER_ID)
 
     # ── External APIs ────────────────────────────────
     PEXELS_API_KEY: str = ""
     PICOVOICE_ACCESS_KEY: str = ""
     PICOVOICE_MODEL_PATH: str = "hey-jarvis_en_windows_v4_0_0/hey-jarvis_en_windows_v4_0_0.ppn"
+    SOURCE_TIMEOUT: float = 5.0           # Per external call cap (image/video/search)
+    SEARCH_MAX_RESULTS: int = 5
+    SEARCH_REDUCED_RESULTS: int = 2       # Used when the deadline is tight
+    IMAGE_HEDGE_DELAY: float = 0.3        # Grace period for the preferred image source
+
+    # ── Deep Search ──────────────────────────────────
+    SEARCH_DEEP_MODE: bool = False        # Default for web_search when "deep" isn't given
+    SEARCH_DEEP_PAGES: int = 3            # Top-k result pages fetched concurrently
+    SEARCH_DEEP_MAX_BYTES: int = 512 * 1024
+    SEARCH_DEEP_PAGE_TIMEOUT: float = 3.0
+    SEARCH_DEEP_PASSAGE_WORDS: int = 80
+    SEARCH_DEEP_TOKENS: int = 320         # Passage budget handed to the briefing
+    SEARCH_DEEP_MIN_BUDGET: float = 1.5   # Below this remaining time, snippets only
+
+    # ── Local Search Index ───────────────────────────
+    SEARCH_LOCAL_MODE: str = "off"        # "off" | "first" (web if no local hit) | "only"
+    LOCAL_INDEX_DIR: str = "./data/local_index"
+    LOCAL_INDEX_ROOTS: List[str] = ["./data/library"]   # Only paths under these can be ingested via the API
+    LOCAL_INDEX_EMBEDDINGS: bool = True   # MiniLM vectors alongside the inverted index
+    LOCAL_INDEX_BATCH_DOCS: int = 500     # Documents per segment / checkpoint
+    LOCAL_INDEX_PASSAGE_WORDS: int = 120
+    LOCAL_INDEX_RRF_K: int = 60
+    LOCAL_INDEX_MIN_SIMILARITY: float = 0.45      # Semantic-only hits below this are dropped
+    # A top hit answers without the web if it covers this share of query terms…
+    LOCAL_INDEX_MIN_COVERAGE: float = 0.6
+    LOCAL_INDEX_CONFIDENT_SIMILARITY: float = 0.6  # …or is this close semantically
+
+    # ── Wikipedia Image Index ────────────────────────
+    WIKI_INDEX_PATH: str = "./data/wiki_index.sqlite3"
+    WIKI_INDEX_TTL: int = 30 * 86400      # Thumbnail refresh age (seconds)
+    WIKI_INDEX_NEGATIVE_TTL: int = 86400  # How long "no image" is remembered
+
+    # ── Pexels Quota ─────────────────────────────────
+    PEXELS_RATE_PER_HOUR: int = 200       # Plan limit (free tier: 200/hour, 20k/month)
+    PEXELS_BURST: int = 10
+    PEXELS_QUOTA_RESERVE: int = 0         # Stop calling when this many requests remain
+    PEXELS_CACHE_PATH: str = "./data/pexels_cache.sqlite3"
+    PEXELS_CACHE_TTL: float = 24 * 3600
+
+    # ── HTTP Client Pool ─────────────────────────────
+    HTTP_TIMEOUT: float = 5.0
+    HTTP_CONNECT_TIMEOUT: float = 3.0
+    HTTP_MAX_CONNECTIONS: int = 50
+    HTTP_MAX_KEEPALIVE: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 60.0
+    HTTP_DNS_TTL: float = 300.0
+    HTTP_PER_HOST_LIMIT: int = 6
+    HTTP_HOST_LIMITS: Dict[str, int] = {"duckduckgo.com": 2}
+    HTTP_HOST_TIMEOUTS: Dict[str, float] = {}
+    HTTP_USER_AGENT: str = "JARVIS/2.0 (contact: support@jarvis.ai)"
+    HTTP_MAX_REDIRECTS: int = 5           # Hops followed by HttpService.open()
+
+    # ── Media Proxy ──────────────────────────────────
+    MEDIA_PROXY_ENABLED: bool = True
+    MEDIA_PUBLIC_BASE: str = "http://127.0.0.1:8000"   # Backend origin as seen by dashboards
+    MEDIA_CACHE_DIR: str = "./data/media_cache"
+    MEDIA_CACHE_MAX_BYTES: int = 512 * 1024 * 1024
+    MEDIA_MAX_ASSET_BYTES: int = 64 * 1024 * 1024    # Larger assets are not proxied
+    MEDIA_FETCH_TIMEOUT: float = 20.0
+    MEDIA_QUALITY: int = 80
+    MEDIA_IMAGE_WIDTH: int = 1280                    # Default width hints in rewritten URLs
+    MEDIA_THUMB_WIDTH: int = 320
+
+    # ── Video Renditions / Previews ──────────────────
+    VIDEO_DEFAULT_MAX_HEIGHT: int = 720               # Used when the client sends no hints
+    VIDEO_PREVIEWS_ENABLED: bool = True               # Needs ffmpeg on PATH
+    VIDEO_PREVIEW_SECONDS: int = 6
+    VIDEO_PREVIEW_WIDTH: int = 320
+    VIDEO_PREVIEW_TIMEOUT: float = 30.0
+    VIDEO_PREVIEW_CONCURRENCY: int = 2
+    VIDEO_PREVIEW_SECRET: str = ""                    # HMAC key for preview URLs ("" = random per run)
+
+    # ── Agent Result Cache ───────────────────────────
+    AGENT_CACHE_ENABLED: bool = True
+    AGENT_CACHE_MAX_ENTRIES: int = 512
+    AGENT_CACHE_MAX_BYTES: int = 8 * 1024 * 1024
 
     class Config:
         case_sensitive = True
@@ -13,7 +13,27 @@ from app.config import settings
 from utils.logger import log
 from ws.routes import router as websocket_router
 from api.tts_routes import router as tts_router
+from api.metrics_routes import router as metrics_router
+from api.media_routes import router as media_router
+from api.local_index_routes import router as local_index_router
+from api.vision_routes import router as vision_router
+from api.process_routes import router as process_router
+from api.app_routes import router as app_router
 from services.system_monitor import system_monitor
+from services.http_service import http_service
+from services.wiki_index import wiki_index
+from services.pexels_service import pexels_service
+from services.local_index import local_index
+from services.vector_service import vector_service
+from services.memory_lifecycle import memory_compactor
+from services.db_service import db_service
+from services.interaction_log import interaction_log
+from services.session_service import session_service
+from services.camera_service import camera_service
+from services.hand_tracker import hand_tracker
+from services.screen_service import screen_watcher
+from services.process_service import process_service
+from services.app_index import app_index
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -33,6 +53,12 @@ app.add_middleware(
 # ── Routers ─────────────────────────────────────────
 app.include_router(websocket_router)
 app.include_router(tts_router)
+app.include_router(metrics_router)
+app.include_router(media_router)
+app.include_router(local_index_router)
+app.include_router(vision_router)
+app.include_router(process_router)
+app.include_router(app_router)
 
 
 # ── Lifecycle Events ────────────────────────────────
@@ -42,13 +68,37 @@ async def startup_event():
     # Pre-load TTS model so voice is instant on first request
     from services.tts_service import preload_model
     preload_model()
+    await http_service.start()
+    await db_service.connect_to_database()
+    await interaction_log.start()
+    await session_service.start(db_service.store)
     asyncio.create_task(system_monitor.start_monitoring())
+    asyncio.create_task(memory_compactor.start())
+    if settings.SCREEN_WATCH_ENABLED:
+        screen_watcher.start()
+    # Load/refresh the app index off the loop so the first "open …" is instant
+    app_index.start_watcher()
+    asyncio.create_task(asyncio.to_thread(app_index.refresh))
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     log.info("Shutting down JARVIS System...")
     system_monitor.stop()
+    memory_compactor.stop()
+    hand_tracker.stop()
+    screen_watcher.stop()
+    camera_service.stop()
+    await process_service.shutdown()
+    app_index.stop()
+    await interaction_log.stop()
+    await session_service.stop()
+    await db_service.close_database_connection()
+    await http_service.close()
+    wiki_index.close()
+    pexels_service.close()
+    local_index.close()
+    vector_service.close()
 
 
 # ── Health Routes ───────────────────────────────────
@@ -0,0 +1,137 @@
+"""
+Storage Backend Benchmark — MongoDB vs embedded SQLite
+───────────────────────────────────────────────────────
+Writes interaction-log-shaped documents through each db_service store in
+insert_many batches and reports startup time, write throughput, batch
+latency, disk footprint and resident memory (the mongod server's own RSS
+from serverStatus, SQLite's is in-process).
+
+Usage (from backend/):
+  python -m benchmarks.storage_backends --docs 50000 --batch 200
+  python -m benchmarks.storage_backends --skip-mongo
+"""
+
+import argparse
+import asyncio
+import gc
+import os
+import random
+import shutil
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import psutil
+
+from app.config import settings
+from services.db_service import MongoStore, SqliteStore
+
+AGENTS = ["SearchAgent", "ImageAgent", "VideoAgent", "AutomationAgent", "MemoryAgent"]
+
+
+def make_doc(i: int) -> dict:
+    agent = random.choice(AGENTS)
+    return {
+        "client_id": f"client-{i % 4}",
+        "session_id": f"client-{i % 4}",
+        "source": "voice_client",
+        "command": f"show me something about topic {i}",
+        "routing": {"intent": "Search", "agent": agent, "resolved_query": f"topic {i}"},
+        "response": "I've fetched that for you.",
+        "execution_results": [{"agent": agent, "status": "success", "summary": "lorem ipsum " * 40}],
+        "agents": [agent],
+        "timings": {"first_token_ms": 180.0, "route_ms": 420.0, "actions_ms": 650.0, "total_ms": 1300.0},
+        "ts": datetime.now(timezone.utc),
+    }
+
+
+def rss() -> int:
+    gc.collect()
+    return psutil.Process().memory_info().rss
+
+
+def disk_usage(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(path) for f in files)
+
+
+async def run_store(name, open_store, footprint, docs, batch):
+    base = rss()
+    start = time.perf_counter()
+    store = open_store()
+    await store.ensure_collection("bench", 86400, [[("client_id", 1), ("ts", -1)]])
+    await store.insert_many("bench", [make_doc(-1)])
+    startup_s = time.perf_counter() - start
+
+    latencies = []
+    start = time.perf_counter()
+    for i in range(0, len(docs), batch):
+        t0 = time.perf_counter()
+        await store.insert_many("bench", [dict(d) for d in docs[i:i + batch]])
+        latencies.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - start
+
+    t0 = time.perf_counter()
+    await store.find("bench", {"client_id": "client-1"}, limit=50)
+    find_ms = (time.perf_counter() - t0) * 1000
+    row = {
+        "backend": name,
+        "startup_ms": round(startup_s * 1000, 1),
+        "docs_per_s": round(len(docs) / elapsed),
+        "p50_batch_ms": round(float(np.percentile(latencies, 50)) * 1000, 2),
+        "p95_batch_ms": round(float(np.percentile(latencies, 95)) * 1000, 2),
+        "find_ms": round(find_ms, 2),
+        "client_rss_mb": round((rss() - base) / 1e6, 1),
+        **await footprint(store),
+    }
+    await store.close()
+    return row
+
+
+def sqlite_case(workdir):
+    async def footprint(store):
+        return {"disk_mb": round(store.disk_bytes() / 1e6, 1), "server_rss_mb": 0.0}
+    return lambda: SqliteStore(os.path.join(workdir, "bench.sqlite3")), footprint
+
+
+def mongo_case():
+    settings.DATABASE_NAME = f"jarvis_bench_{int(time.time())}"
+
+    async def footprint(store):
+        stats = await store.db.command("dbStats")
+        status = await store.db.command("serverStatus")
+        await store.client.drop_database(settings.DATABASE_NAME)
+        return {
+            "disk_mb": round(stats.get("storageSize", 0) / 1e6 + stats.get("indexSize", 0) / 1e6, 1),
+            "server_rss_mb": float(status.get("mem", {}).get("resident", 0)),
+        }
+    return MongoStore, footprint
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=50000)
+    parser.add_argument("--batch", type=int, default=settings.LOG_BATCH_SIZE)
+    parser.add_argument("--skip-mongo", action="store_true")
+    args = parser.parse_args()
+
+    random.seed(0)
+    docs = [make_doc(i) for i in range(args.docs)]
+    print(f"{len(docs)} documents, insert_many batches of {args.batch}\n")
+
+    workdir = tempfile.mkdtemp(prefix="bench_storage_")
+    try:
+        rows = [await run_store("sqlite-wal", *sqlite_case(workdir), docs, args.batch)]
+        if not args.skip_mongo:
+            rows.insert(0, await run_store("mongo", *mongo_case(), docs, args.batch))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    columns = list(rows[0].keys())
+    print("  ".join(f"{c:>14}" for c in columns))
+    for row in rows:
+        print("  ".join(f"{str(row[c]):>14}" for c in columns))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,140 @@
+"""
+Vector Backend Benchmark — ChromaDB vs quantized int8 index
+────────────────────────────────────────────────────────────
+Compares recall@k (against float32 brute force), query latency, build time,
+resident memory and disk size for each VectorService backend, so the
+backend can be chosen per deployment.
+
+Usage (from backend/):
+  python -m benchmarks.vector_backends --n 20000 --queries 200
+  python -m benchmarks.vector_backends --from-chroma ./data/chroma_db
+"""
+
+import argparse
+import gc
+import os
+import shutil
+import tempfile
+import time
+import uuid
+
+import numpy as np
+import psutil
+
+from app.config import settings
+from services.quantized_index import QuantizedIndex
+
+
+def synthetic(n: int, dim: int, clusters: int = 200, seed: int = 0) -> np.ndarray:
+    """Clustered unit vectors (uniform random vectors have no meaningful neighbours)."""
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(clusters, dim))
+    data = centres[rng.integers(0, clusters, n)] + rng.normal(scale=0.6, size=(n, dim))
+    return (data / np.linalg.norm(data, axis=1, keepdims=True)).astype(np.float32)
+
+
+def from_chroma(path: str) -> np.ndarray:
+    import chromadb
+    collection = chromadb.PersistentClient(path=path).get_or_create_collection("jarvis_memory")
+    return np.asarray(collection.get(include=["embeddings"])["embeddings"], dtype=np.float32)
+
+
+def rss() -> int:
+    gc.collect()
+    return psutil.Process().memory_info().rss
+
+
+def disk_usage(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(path) for f in files)
+
+
+def percentile_ms(samples, q) -> float:
+    return round(float(np.percentile(samples, q)) * 1000, 3)
+
+
+def run_backend(name, build, data, queries, truth, k):
+    workdir = tempfile.mkdtemp(prefix=f"bench_{name}_")
+    try:
+        base = rss()
+        start = time.perf_counter()
+        search = build(workdir, data)
+        build_s = time.perf_counter() - start
+
+        latencies, hits = [], 0
+        for query, expected in zip(queries, truth):
+            t0 = time.perf_counter()
+            ids = search(query, k)
+            latencies.append(time.perf_counter() - t0)
+            hits += len(set(ids) & set(expected))
+        return {
+            "backend": name,
+            "build_s": round(build_s, 2),
+            f"recall@{k}": round(hits / (len(queries) * k), 4),
+            "p50_ms": percentile_ms(latencies, 50),
+            "p95_ms": percentile_ms(latencies, 95),
+            "rss_mb": round((rss() - base) / 1e6, 1),
+            "disk_mb": round(disk_usage(workdir) / 1e6, 1),
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def build_chroma(workdir, data):
+    import chromadb
+    collection = chromadb.PersistentClient(path=workdir).get_or_create_collection(
+        "bench", metadata={"hnsw:space": "cosine"}
+    )
+    for i in range(0, len(data), 5000):
+        chunk = data[i:i + 5000]
+        collection.add(ids=[str(j) for j in range(i, i + len(chunk))], embeddings=chunk.tolist(),
+                       documents=[""] * len(chunk))
+    return lambda q, k: [int(x) for x in collection.query(query_embeddings=[q.tolist()], n_results=k)["ids"][0]]
+
+
+def build_quantized(mode):
+    def build(workdir, data):
+        settings.QUANT_SEARCH = mode
+        index = QuantizedIndex(root=workdir)
+        for i in range(0, len(data), 10000):
+            chunk = data[i:i + 10000]
+            index.add([str(j) for j in range(i, i + len(chunk))], chunk, [""] * len(chunk))
+        if mode == "ivf":
+            index.train()
+
+        def search(q, k):
+            return [int(x) for x in index.query([q], k)["ids"][0]]
+        return search
+    return build
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--from-chroma", dest="chroma_path")
+    parser.add_argument("--skip-chroma", action="store_true")
+    args = parser.parse_args()
+
+    data = from_chroma(args.chroma_path) if args.chroma_path else synthetic(args.n, args.dim)
+    rng = np.random.default_rng(1)
+    queries = data[rng.choice(len(data), size=min(args.queries, len(data)), replace=False)]
+    queries = queries + rng.normal(scale=0.02, size=queries.shape).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    truth = [np.argsort(-(data @ q))[: args.k].tolist() for q in queries]
+    print(f"{len(data)} vectors × {data.shape[1]} dims, {len(queries)} queries, k={args.k}\n")
+
+    backends = [("quantized-exact", build_quantized("exact")), ("quantized-ivf", build_quantized("ivf"))]
+    if not args.skip_chroma:
+        backends.insert(0, ("chroma-hnsw", build_chroma))
+    rows = [run_backend(name, build, data, queries, truth, args.k) for name, build in backends]
+
+    columns = list(rows[0].keys())
+    print("  ".join(f"{c:>16}" for c in columns))
+    for row in rows:
+        print("  ".join(f"{str(row[c]):>16}" for c in columns))
+
+
+if __name__ == "__main__":
+    main()
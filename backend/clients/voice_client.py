@@ -41,9 +41,29 @@ WHISPER_MODEL = "tiny.en"
 TTS_VOICE = "Jasper"
 
 
+def load_client_id(path: str = None) -> str:
+    """Client id persisted across runs, so the backend can restore this client's session."""
+    path = path or settings.VOICE_CLIENT_ID_PATH
+    try:
+        with open(path, encoding="utf-8") as f:
+            client_id = f.read().strip()
+        if client_id:
+            return client_id
+    except OSError:
+        pass
+    client_id = str(uuid.uuid4())[:8]
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(client_id)
+    except OSError as e:
+        print(f"[INIT] Could not persist client id ({e}); using {client_id} for this run")
+    return client_id
+
+
 class JarvisClient:
     def __init__(self):
-        self.client_id = str(uuid.uuid4())[:8]
+        self.client_id = load_client_id()
         print("=" * 50)
         print(f"   JARVIS Voice Client (ID: {self.client_id})")
         print("   TTS Engine: KittenTTS (15M params)")
@@ -256,7 +276,8 @@ class JarvisClient:
                                     self.ws.send(json.dumps({
                                         "command": command, 
                                         "source": "voice_client",
-                                        "client_id": self.client_id
+                                        "client_id": self.client_id,
+                                        "user_id": settings.VOICE_USER_ID or None,
                                     }))
                                 else:
                                     print("[WS] Not connected. Reconnecting...")
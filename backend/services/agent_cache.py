@@ -0,0 +1,171 @@
+"""
+Agent Result Cache — Shared cache for BaseAgent.execute
+────────────────────────────────────────────────────────
+Caches results of idempotent agent actions (web search, image and video
+lookups) keyed on (agent, action, canonicalised parameters).
+
+  • Per-action CachePolicy declared by each agent (no policy → never cached)
+  • Single-flight: concurrent identical calls share one upstream request
+  • Stale-while-revalidate: expired entries are served once more while a
+    background refresh runs
+  • Bounded by entry count and approximate bytes, evicted LRU
+"""
+
+import asyncio
+import copy
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.config import settings
+from utils.logger import log
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    ttl: float                          # Seconds an entry is fresh
+    stale_ttl: float = 0.0              # Extra seconds it may be served while revalidating
+    key_params: Tuple[str, ...] = ()    # Parameters that identify the call (empty → all)
+    key_fn: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None  # Derived key parts
+
+    def is_cacheable(self, result: Any) -> bool:
+        # Results cut short by a request deadline are never stored
+        return (
+            isinstance(result, dict)
+            and result.get("status") == "success"
+            and not result.get("degraded")
+        )
+
+
+@dataclass
+class _Entry:
+    value: Dict[str, Any]
+    stored_at: float
+    size: int
+
+
+def _canonical(value: Any) -> Any:
+    """Normalise parameters so trivially different calls share a key."""
+    if isinstance(value, str):
+        return " ".join(value.lower().split())
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    return value
+
+
+def make_key(agent: str, action: str, parameters: Dict[str, Any], policy: CachePolicy) -> str:
+    params = parameters or {}
+    if policy.key_fn:
+        params = policy.key_fn(params)
+    elif policy.key_params:
+        params = {k: params.get(k) for k in policy.key_params}
+    return f"{agent}:{action}:{json.dumps(_canonical(params), sort_keys=True, default=str)}"
+
+
+class AgentResultCache:
+    def __init__(self, max_entries: int = None, max_bytes: int = None):
+        self.max_entries = max_entries or settings.AGENT_CACHE_MAX_ENTRIES
+        self.max_bytes = max_bytes or settings.AGENT_CACHE_MAX_BYTES
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._bytes = 0
+        self.stats = {
+            "hits": 0, "stale_hits": 0, "misses": 0,
+            "coalesced": 0, "revalidations": 0, "evictions": 0,
+        }
+
+    # ── Public API ───────────────────────────────────
+    async def get_or_compute(
+        self,
+        key: str,
+        policy: CachePolicy,
+        compute: Callable[[], Awaitable[Dict[str, Any]]],
+        refresh: Callable[[], Awaitable[Dict[str, Any]]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Return a cached result for `key` or run `compute` once for all
+        concurrent callers. `refresh` is used for background revalidation
+        (defaults to `compute`).
+        """
+        entry = self._entries.get(key)
+        now = time.monotonic()
+        if entry is not None:
+            age = now - entry.stored_at
+            if age <= policy.ttl:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return copy.deepcopy(entry.value)
+            if age <= policy.ttl + policy.stale_ttl:
+                self._entries.move_to_end(key)
+                self.stats["stale_hits"] += 1
+                if key not in self._inflight:
+                    self.stats["revalidations"] += 1
+                    self._start(key, policy, refresh or compute)
+                return copy.deepcopy(entry.value)
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.stats["coalesced"] += 1
+            return copy.deepcopy(await asyncio.shield(inflight))
+
+        self.stats["misses"] += 1
+        return copy.deepcopy(await asyncio.shield(self._start(key, policy, compute)))
+
+    def invalidate(self, key: str = None):
+        """Drop one entry, or everything when key is None."""
+        if key is None:
+            self._entries.clear()
+            self._bytes = 0
+            return
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def metrics(self) -> Dict[str, Any]:
+        served = self.stats["hits"] + self.stats["stale_hits"] + self.stats["coalesced"]
+        total = served + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_ratio": round(served / total, 3) if total else 0.0,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "inflight": len(self._inflight),
+        }
+
+    # ── Internals ────────────────────────────────────
+    def _start(self, key: str, policy: CachePolicy, compute: Callable) -> asyncio.Future:
+        task = asyncio.ensure_future(self._run(key, policy, compute))
+        self._inflight[key] = task
+        return task
+
+    async def _run(self, key: str, policy: CachePolicy, compute: Callable) -> Dict[str, Any]:
+        try:
+            result = await compute()
+            if policy.is_cacheable(result):
+                self._store(key, result)
+            return result
+        finally:
+            self._inflight.pop(key, None)
+
+    def _store(self, key: str, value: Dict[str, Any]):
+        try:
+            size = len(json.dumps(value, default=str))
+        except Exception as e:
+            log.debug(f"Agent cache skipped unserialisable result for {key}: {e}")
+            return
+        if size > self.max_bytes:
+            return
+        self.invalidate(key)
+        self._entries[key] = _Entry(copy.deepcopy(value), time.monotonic(), size)
+        self._bytes += size
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, old = self._entries.popitem(last=False)
+            self._bytes -= old.size
+            self.stats["evictions"] += 1
+
+
+agent_cache = AgentResultCache()
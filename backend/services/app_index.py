@@ -0,0 +1,616 @@
+"""
+App Index — Installed applications, fuzzy lookup and shell-free launching
+─────────────────────────────────────────────────────────────────────────
+Sources:
+  • .desktop files ($XDG_DATA_HOME, $XDG_DATA_DIRS, Flatpak/Snap exports):
+    Name, GenericName, Keywords and the Exec line (field codes stripped)
+  • on Windows, Start Menu shortcuts (.lnk, opened via os.startfile) and
+    the registry's App Paths
+  • executables on $PATH (PATHEXT-aware on Windows)
+  • user aliases (APP_ALIASES plus the alias file), e.g. "vs code" → code;
+    a target must be a single indexed app or command name, no arguments
+
+Bare executables (PATH, App Paths) only match their exact name; prefix,
+acronym and typo matching is reserved for launcher entries and aliases, so
+"shut" can never resolve to /sbin/shutdown. Anything in APP_DENYLIST
+(power/session control, destructive tools) is never indexed at all.
+
+The index is persisted to APP_INDEX_PATH together with each source's mtime,
+so a restart re-reads nothing that has not changed. refresh() only stats
+directories (and .desktop files) and rescans what moved; with inotify_simple
+installed, a watcher marks the index dirty as soon as a source changes.
+
+Lookups never scan the index: query tokens go through a token → entries map
+(plus a sorted vocabulary for prefixes and name acronyms, so "vs code" finds
+"Visual Studio Code"), a handful of candidates are scored, and results are
+memoised per query until the index changes. Typos fall back to difflib on
+the vocabulary. Launching passes an argv list to Popen — never a shell.
+"""
+
+import bisect
+import difflib
+import json
+import os
+import re
+import shlex
+import subprocess
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.config import settings
+from utils.logger import log
+
+try:
+    import inotify_simple
+    HAS_INOTIFY = True
+except ImportError:
+    HAS_INOTIFY = False
+
+if sys.platform == "win32":
+    import winreg
+else:
+    winreg = None
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_FIELD_CODE_RE = re.compile(r"%[fFuUdDnNickvm]")
+# Words that describe rather than name an app ("open the chrome app")
+FILLER = frozenset("a an the app application program open launch start please my".split())
+# Sources that take part in prefix/acronym/typo matching (the rest: exact name only)
+FUZZY_SOURCES = frozenset({"desktop", "shortcut", "alias"})
+LAUNCHER_EXT = ".lnk" if os.name == "nt" else ".desktop"
+
+
+def words(text: str) -> List[str]:
+    return _WORD_RE.findall(text.lower().replace("'", ""))
+
+
+def split_camel(name: str) -> str:
+    """"LibreOffice" → "Libre Office", so both halves are searchable."""
+    return re.sub(r"(?<=[a-z])(?=[A-Z])", " ", name)
+
+
+@dataclass
+class AppEntry:
+    name: str
+    argv: List[str]
+    source: str                                   # desktop | shortcut | path | alias
+    origin: str = ""                              # File or directory it came from
+    generic: str = ""
+    keywords: List[str] = field(default_factory=list)
+    terminal: bool = False
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"name": self.name, "command": self.argv, "source": self.source, "origin": self.origin}
+
+
+def parse_desktop_file(path: str) -> Optional[AppEntry]:
+    """The [Desktop Entry] of an application .desktop file (None if hidden or not an app)."""
+    values: Dict[str, str] = {}
+    in_entry = False
+    try:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            for line in f:
+                line = line.strip()
+                if line.startswith("["):
+                    if in_entry:
+                        break
+                    in_entry = line == "[Desktop Entry]"
+                elif in_entry and "=" in line and not line.startswith("#"):
+                    key, value = line.split("=", 1)
+                    values.setdefault(key.strip(), value.strip())   # Unlocalised keys come first
+    except OSError:
+        return None
+
+    if values.get("Type", "Application") != "Application":
+        return None
+    if values.get("NoDisplay", "").lower() == "true" or values.get("Hidden", "").lower() == "true":
+        return None
+    name, command = values.get("Name"), values.get("Exec")
+    if not name or not command:
+        return None
+    try:
+        argv = [a for a in shlex.split(_FIELD_CODE_RE.sub("", command).replace("%%", "%")) if a]
+    except ValueError:
+        return None
+    if not argv:
+        return None
+    return AppEntry(
+        name=name,
+        argv=argv,
+        source="desktop",
+        origin=path,
+        generic=values.get("GenericName", ""),
+        keywords=[k for k in values.get("Keywords", "").split(";") if k],
+        terminal=values.get("Terminal", "").lower() == "true",
+    )
+
+
+def parse_shortcut(path: str) -> Optional[AppEntry]:
+    """A Start Menu .lnk (None for uninstallers and help/readme links)."""
+    name = os.path.splitext(os.path.basename(path))[0]
+    if re.match(r"(uninstall|readme|help|website)\b", name, re.IGNORECASE):
+        return None
+    return AppEntry(name=name, argv=[path], source="shortcut", origin=path)
+
+
+def parse_launcher(path: str) -> Optional[AppEntry]:
+    return parse_shortcut(path) if os.name == "nt" else parse_desktop_file(path)
+
+
+def is_denied(argv: List[str]) -> bool:
+    """Power/session/destructive commands are never launchable by name."""
+    base = os.path.basename(argv[0]).lower() if argv else ""
+    if os.name == "nt":
+        base = os.path.splitext(base)[0]
+    denied = {d.lower() for d in settings.APP_DENYLIST}
+    return base in denied or base.split(".")[0] in denied
+
+
+def desktop_dirs() -> List[str]:
+    if os.name == "nt":
+        roots = [os.environ.get("APPDATA"), os.environ.get("PROGRAMDATA")]
+        return [os.path.join(r, "Microsoft", "Windows", "Start Menu", "Programs") for r in roots if r]
+    home = os.path.expanduser("~")
+    data_home = os.environ.get("XDG_DATA_HOME") or os.path.join(home, ".local", "share")
+    data_dirs = (os.environ.get("XDG_DATA_DIRS") or "/usr/local/share:/usr/share").split(os.pathsep)
+    dirs = [data_home, *data_dirs, "/var/lib/flatpak/exports/share", os.path.join(data_home, "flatpak", "exports", "share")]
+    result = [os.path.join(d, "applications") for d in dirs]
+    result.append("/var/lib/snapd/desktop/applications")
+    return list(dict.fromkeys(d for d in result if d))
+
+
+def scan_app_paths() -> List[AppEntry]:
+    """Executables registered under App Paths (Windows; e.g. chrome.exe, excel.exe)."""
+    if winreg is None:
+        return []
+    entries: Dict[str, AppEntry] = {}
+    key_path = r"SOFTWARE\Microsoft\Windows\CurrentVersion\App Paths"
+    for hive in (winreg.HKEY_CURRENT_USER, winreg.HKEY_LOCAL_MACHINE):
+        try:
+            root = winreg.OpenKey(hive, key_path)
+        except OSError:
+            continue
+        with root:
+            for n in range(winreg.QueryInfoKey(root)[0]):
+                try:
+                    sub = winreg.EnumKey(root, n)
+                    with winreg.OpenKey(root, sub) as key:
+                        target = os.path.expandvars(winreg.QueryValue(key, None).strip('"'))
+                except OSError:
+                    continue
+                name = os.path.splitext(sub)[0]
+                if target and name.lower() not in entries:   # HKCU wins over HKLM
+                    entries[name.lower()] = AppEntry(name=name, argv=[target], source="path", origin="App Paths")
+    return list(entries.values())
+
+
+def path_dirs() -> List[str]:
+    return list(dict.fromkeys(d for d in os.environ.get("PATH", "").split(os.pathsep) if d))
+
+
+def scan_path_dir(directory: str) -> List[AppEntry]:
+    exts = [e.lower() for e in os.environ.get("PATHEXT", ".EXE;.BAT;.CMD").split(";")] if os.name == "nt" else None
+    entries = []
+    try:
+        with os.scandir(directory) as it:
+            for item in it:
+                name = item.name
+                if exts is not None:
+                    stem, ext = os.path.splitext(name)
+                    if ext.lower() not in exts:
+                        continue
+                    name = stem
+                elif not os.access(item.path, os.X_OK):
+                    continue
+                try:
+                    if not item.is_file():
+                        continue
+                except OSError:
+                    continue
+                entries.append(AppEntry(name=name, argv=[item.path], source="path", origin=directory))
+    except OSError:
+        pass
+    return entries
+
+
+class AppIndex:
+    def __init__(self, path: str = None):
+        self.path = path or settings.APP_INDEX_PATH
+        self._lock = threading.RLock()
+        # Source state: directory → mtime, .desktop file → (mtime, entry or None)
+        self._dir_mtimes: Dict[str, float] = {}
+        self._path_entries: Dict[str, List[AppEntry]] = {}
+        self._desktop: Dict[str, Tuple[float, Optional[AppEntry]]] = {}
+        self._aliases: Dict[str, str] = {}
+        self._alias_mtime = 0.0
+        self._app_paths: List[AppEntry] = []
+        self._by_command: Dict[str, AppEntry] = {}
+
+        self.entries: List[AppEntry] = []
+        self._tokens: Dict[str, Set[int]] = {}     # token → entry ids
+        self._vocab: List[str] = []                # sorted tokens (prefix search)
+        self._exact: Dict[str, List[int]] = {}     # joined name/alias → entry ids
+        self._acronyms: List[Tuple[str, int]] = [] # sorted (initials, entry id)
+        self._name_words: List[List[str]] = []
+        self._other_words: List[List[str]] = []
+        self._cache: "OrderedDict[str, List[Tuple[float, int]]]" = OrderedDict()
+
+        self._loaded = False
+        self._dirty = True
+        self._last_refresh = 0.0
+        self._watcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.stats = {"refreshes": 0, "rescanned": 0, "lookups": 0, "cache_hits": 0, "lookup_us": 0.0, "refresh_ms": 0.0}
+
+    # ── Persistence ──────────────────────────────────
+    def _load(self):
+        self._loaded = True
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        self._dir_mtimes = data.get("dirs", {})
+        self._path_entries = {d: [AppEntry(**e) for e in items] for d, items in data.get("path", {}).items()}
+        self._desktop = {
+            p: (mtime, AppEntry(**e) if e else None) for p, (mtime, e) in data.get("desktop", {}).items()
+        }
+        log.info(f"App index loaded: {len(self._desktop)} desktop files, {len(self._path_entries)} PATH dirs")
+
+    def _save(self):
+        data = {
+            "dirs": self._dir_mtimes,
+            "path": {d: [asdict(e) for e in items] for d, items in self._path_entries.items()},
+            "desktop": {p: [mtime, asdict(e) if e else None] for p, (mtime, e) in self._desktop.items()},
+        }
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            log.warning(f"Could not persist app index: {e}")
+
+    # ── Refresh (stat-only unless something changed) ─
+    @staticmethod
+    def _mtime(path: str) -> Optional[float]:
+        try:
+            return os.stat(path).st_mtime
+        except OSError:
+            return None
+
+    def refresh(self, force: bool = False) -> int:
+        """Rescan changed sources; returns how many directories/files were re-read."""
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            start = time.perf_counter()
+            rescanned = 0
+
+            # $PATH: an executable appearing or vanishing changes the directory mtime
+            current = path_dirs()
+            for d in list(self._path_entries):
+                if d not in current:
+                    self._path_entries.pop(d)
+                    self._dir_mtimes.pop(d, None)
+                    rescanned += 1
+            for d in current:
+                mtime = self._mtime(d)
+                if mtime is None:
+                    if self._path_entries.pop(d, None) is not None:
+                        rescanned += 1
+                    continue
+                if force or self._dir_mtimes.get(d) != mtime or d not in self._path_entries:
+                    self._path_entries[d] = scan_path_dir(d)
+                    self._dir_mtimes[d] = mtime
+                    rescanned += 1
+
+            # Launchers (.desktop / Start Menu .lnk): edits don't touch the directory mtime, so stat each file
+            seen: Set[str] = set()
+            for d in desktop_dirs():
+                if self._mtime(d) is None:
+                    continue
+                for root, _, files in os.walk(d):
+                    for name in files:
+                        if not name.lower().endswith(LAUNCHER_EXT):
+                            continue
+                        path = os.path.join(root, name)
+                        seen.add(path)
+                        mtime = self._mtime(path)
+                        cached = self._desktop.get(path)
+                        if force or cached is None or cached[0] != mtime:
+                            self._desktop[path] = (mtime, parse_launcher(path))
+                            rescanned += 1
+            for path in set(self._desktop) - seen:
+                del self._desktop[path]
+                rescanned += 1
+
+            # App Paths is a handful of registry keys: cheap enough to re-read every time
+            app_paths = scan_app_paths()
+            registry_changed = [asdict(e) for e in app_paths] != [asdict(e) for e in self._app_paths]
+            self._app_paths = app_paths
+
+            aliases_changed = self._load_aliases()
+            if rescanned or registry_changed or aliases_changed or not self.entries:
+                self._rebuild()
+            if rescanned:
+                self._save()
+
+            self._dirty = False
+            self._last_refresh = time.monotonic()
+            self.stats["refreshes"] += 1
+            self.stats["rescanned"] += rescanned
+            self.stats["refresh_ms"] = round((time.perf_counter() - start) * 1000, 2)
+            return rescanned
+
+    def _load_aliases(self) -> bool:
+        mtime = self._mtime(settings.APP_ALIASES_PATH) or 0.0
+        if self._aliases and mtime == self._alias_mtime:
+            return False
+        aliases = {k.lower(): v for k, v in settings.APP_ALIASES.items()}
+        if mtime:
+            try:
+                with open(settings.APP_ALIASES_PATH, encoding="utf-8") as f:
+                    aliases.update({k.lower(): v for k, v in json.load(f).items()})
+            except (OSError, ValueError) as e:
+                log.warning(f"Ignoring app aliases file: {e}")
+        self._alias_mtime = mtime
+        changed = aliases != self._aliases
+        self._aliases = aliases
+        return changed
+
+    def add_alias(self, alias: str, command: str):
+        """Persist a user alias (e.g. "editor" → "code") in the alias file.
+
+        Raises ValueError unless `command` is a single indexed app or command name.
+        """
+        with self._lock:
+            self._ensure_fresh()
+            if self._resolve_alias(command, self._by_command) is None:
+                raise ValueError(f"'{command}' is not an installed application name (no arguments allowed)")
+            try:
+                with open(settings.APP_ALIASES_PATH, encoding="utf-8") as f:
+                    stored = json.load(f)
+            except (OSError, ValueError):
+                stored = {}
+            stored[alias.lower()] = command
+            os.makedirs(os.path.dirname(os.path.abspath(settings.APP_ALIASES_PATH)), exist_ok=True)
+            with open(settings.APP_ALIASES_PATH, "w", encoding="utf-8") as f:
+                json.dump(stored, f, indent=2)
+            self._dirty = True
+
+    # ── Index build ──────────────────────────────────
+    @staticmethod
+    def _resolve_alias(target: str, by_command: Dict[str, AppEntry]) -> Optional[List[str]]:
+        """Alias target → argv of the indexed app/command it names (one word, no arguments)."""
+        entry = by_command.get(target.strip().lower())
+        return list(entry.argv) if entry is not None else None
+
+    def _rebuild(self):
+        executables: Dict[str, AppEntry] = {}
+        # Earlier PATH directories win, like the shell; App Paths only fill gaps
+        for d in reversed(path_dirs()):
+            for e in self._path_entries.get(d, []):
+                executables[e.name.lower()] = e
+        for e in self._app_paths:
+            executables.setdefault(e.name.lower(), e)
+        executables = {name: e for name, e in executables.items() if not is_denied(e.argv)}
+        desktop = [entry for _, entry in self._desktop.values() if entry is not None and not is_denied(entry.argv)]
+        by_command = dict(executables)
+        for entry in desktop:
+            # Aliases prefer the desktop entry (its arguments, Terminal flag) over the bare binary
+            if entry.source == "desktop":
+                by_command[os.path.basename(entry.argv[0]).lower()] = entry
+            by_command.setdefault(entry.name.lower(), entry)
+        self._by_command = by_command
+
+        entries: List[AppEntry] = list(desktop)
+        # Executables that a desktop entry already covers would only add duplicates
+        covered = {os.path.basename(e.argv[0]).lower() for e in desktop if e.source == "desktop"}
+        entries.extend(e for name, e in executables.items() if name not in covered)
+        for alias, target in self._aliases.items():
+            argv = self._resolve_alias(target, by_command)
+            if argv:
+                entries.append(AppEntry(name=alias, argv=argv, source="alias", origin=target))
+
+        tokens: Dict[str, Set[int]] = {}
+        exact: Dict[str, List[int]] = {}
+        acronyms: Set[Tuple[str, int]] = set()
+        name_words, other_words = [], []
+        for i, entry in enumerate(entries):
+            fuzzy = entry.source in FUZZY_SOURCES
+            names = [entry.name, split_camel(entry.name)] if fuzzy else [entry.name]
+            if entry.source == "desktop":
+                names.append(os.path.basename(entry.argv[0]))
+            seen: List[str] = []
+            for name in names:
+                ws = words(name)
+                seen.extend(w for w in ws if w not in seen)
+                for key in ("".join(ws), " ".join(ws)):
+                    if key:
+                        exact.setdefault(key, []).append(i)
+                if fuzzy and len(ws) > 1:
+                    acronyms.add(("".join(w[0] for w in ws), i))
+            others = [w for text in (entry.generic, *entry.keywords) for w in words(text)]
+            if fuzzy:
+                # Bare executables stay out of the token map: exact name hits only
+                for w in seen + others:
+                    tokens.setdefault(w, set()).add(i)
+            name_words.append(seen)
+            other_words.append(others)
+
+        self.entries = entries
+        self._tokens = tokens
+        self._vocab = sorted(tokens)
+        self._exact = {k: list(dict.fromkeys(v)) for k, v in exact.items()}
+        self._acronyms = sorted(acronyms)
+        self._name_words = name_words
+        self._other_words = other_words
+        self._cache.clear()
+        log.info(f"App index: {len(entries)} applications, {len(tokens)} tokens")
+
+    # ── Lookup ───────────────────────────────────────
+    def _ensure_fresh(self):
+        # With inotify the watcher flags changes; otherwise fall back to periodic mtime scans
+        watching = self._watcher is not None and self._watcher.is_alive()
+        stale = not watching and time.monotonic() - self._last_refresh > settings.APP_INDEX_REFRESH_INTERVAL
+        if self._dirty or stale or not self.entries:
+            self.refresh()
+
+    def _prefixed(self, prefix: str) -> Iterable[str]:
+        i = bisect.bisect_left(self._vocab, prefix)
+        while i < len(self._vocab) and self._vocab[i].startswith(prefix):
+            yield self._vocab[i]
+            i += 1
+
+    def _score(self, i: int, query: List[str]) -> float:
+        entry, name_words, other_words = self.entries[i], self._name_words[i], self._other_words[i]
+        score = 0.0
+        for q in query:
+            if q in name_words:
+                score += 3.0
+            elif any(w.startswith(q) for w in name_words):
+                score += 2.0
+            elif q in other_words:
+                score += 1.0
+            elif any(w.startswith(q) for w in other_words):
+                score += 0.5
+        # Prefer concise names, launchers with a desktop entry, then aliases
+        score -= 0.05 * max(0, len(name_words) - len(query))
+        score += {"alias": 0.3, "desktop": 0.2, "shortcut": 0.2}.get(entry.source, 0.0)
+        return score
+
+    def _ranked(self, query: str) -> List[Tuple[float, int]]:
+        """(score, entry id) best first, memoised until the index changes."""
+        self._ensure_fresh()
+        self.stats["lookups"] += 1
+        key = " ".join(words(query))
+        ranked = self._cache.get(key)
+        if ranked is not None:
+            self._cache.move_to_end(key)
+            self.stats["cache_hits"] += 1
+            return ranked
+        ranked = self._cache[key] = self._rank(key)
+        while len(self._cache) > settings.APP_INDEX_QUERY_CACHE:
+            self._cache.popitem(last=False)
+        return ranked
+
+    def search(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
+        with self._lock:
+            start = time.perf_counter()
+            ranked = self._ranked(query)
+            self.stats["lookup_us"] = round((time.perf_counter() - start) * 1e6, 1)
+            return [{**self.entries[i].as_dict(), "score": round(s, 2)} for s, i in ranked[:limit]]
+
+    def resolve(self, query: str) -> Optional[AppEntry]:
+        """Best match for a spoken/typed app name, or None."""
+        with self._lock:
+            start = time.perf_counter()
+            ranked = self._ranked(query)
+            self.stats["lookup_us"] = round((time.perf_counter() - start) * 1e6, 1)
+            return self.entries[ranked[0][1]] if ranked else None
+
+    def _rank(self, key: str) -> List[Tuple[float, int]]:
+        query = [w for w in key.split() if w not in FILLER] or key.split()
+        if not query:
+            return []
+
+        # Whole-name hits: "vs code" → code, "vscode", "google chrome"
+        for form in (" ".join(query), "".join(query)):
+            hits = self._exact.get(form)
+            if hits:
+                return sorted(((self._score(i, query) + 10.0, i) for i in hits), reverse=True)
+
+        candidates: Dict[int, float] = {}
+        for n, q in enumerate(list(query)):
+            matched = list(self._prefixed(q))
+            if not matched and len(q) >= 4:
+                # Typo fallback; only reached when nothing starts with the token
+                matched = difflib.get_close_matches(q, self._vocab, n=3, cutoff=0.75)
+                if matched:
+                    query[n] = matched[0]
+            for token in matched[:50]:
+                for i in self._tokens[token]:
+                    candidates.setdefault(i, 0.0)
+            if len(q) > 1:
+                # Initials of a multi-word name ("vs" → Visual Studio Code)
+                k = bisect.bisect_left(self._acronyms, (q, -1))
+                while k < len(self._acronyms) and self._acronyms[k][0].startswith(q):
+                    candidates[self._acronyms[k][1]] = 2.0
+                    k += 1
+        scored = ((self._score(i, query) + bonus, i) for i, bonus in candidates.items())
+        return sorted((item for item in scored if item[0] > 0.5), reverse=True)
+
+    # ── Launching ────────────────────────────────────
+    def launch(self, entry: AppEntry, args: List[str] = None) -> Optional[int]:
+        """Start the app detached from JARVIS; argv goes straight to exec (no shell).
+
+        Start Menu shortcuts go through os.startfile (no pid is returned).
+        """
+        if entry.source == "shortcut":
+            os.startfile(entry.argv[0])
+            log.info(f"Launched {entry.name} via {entry.argv[0]}")
+            return None
+        argv = list(entry.argv) + list(args or [])
+        if entry.terminal:
+            terminal = self.resolve("terminal")
+            if terminal is not None and terminal is not entry:
+                argv = terminal.argv + ["-e", *argv]
+        kwargs: Dict[str, Any] = dict(
+            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, close_fds=True,
+        )
+        if os.name == "posix":
+            kwargs["start_new_session"] = True
+        else:
+            kwargs["creationflags"] = getattr(subprocess, "DETACHED_PROCESS", 0)
+        proc = subprocess.Popen(argv, **kwargs)
+        log.info(f"Launched {entry.name} (pid {proc.pid}): {argv}")
+        return proc.pid
+
+    # ── Watcher ──────────────────────────────────────
+    def start_watcher(self):
+        """Mark the index dirty on source changes (inotify); otherwise mtime scans on lookup suffice."""
+        if not HAS_INOTIFY or (self._watcher and self._watcher.is_alive()):
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(target=self._watch, name="app-index-watch", daemon=True)
+        self._watcher.start()
+
+    def _watch(self):
+        flags = inotify_simple.flags
+        mask = flags.CREATE | flags.DELETE | flags.MODIFY | flags.MOVED_TO | flags.MOVED_FROM | flags.ATTRIB
+        inotify = inotify_simple.INotify()
+        try:
+            for d in [*desktop_dirs(), *path_dirs(), os.path.dirname(os.path.abspath(settings.APP_ALIASES_PATH))]:
+                try:
+                    inotify.add_watch(d, mask)
+                except OSError:
+                    pass
+            while not self._stop.is_set():
+                if inotify.read(timeout=1000):
+                    self._dirty = True
+        finally:
+            inotify.close()
+
+    def stop(self):
+        self._stop.set()
+
+    def metrics(self) -> Dict[str, Any]:
+        counts: Dict[str, int] = {}
+        for e in self.entries:
+            counts[e.source] = counts.get(e.source, 0) + 1
+        return {
+            "applications": len(self.entries),
+            "by_source": counts,
+            "tokens": len(self._vocab),
+            "inotify": HAS_INOTIFY and self._watcher is not None and self._watcher.is_alive(),
+            **self.stats,
+        }
+
+
+app_index = AppIndex()
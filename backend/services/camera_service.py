@@ -0,0 +1,269 @@
+"""
+Camera Service — One shared capture thread and a frame ring buffer
+───────────────────────────────────────────────────────────────────
+The camera is opened once (warm-up frames discarded once) and read on a
+background thread for as long as anyone is using it. The newest
+CAMERA_BUFFER_FRAMES frames live in a preallocated ring buffer, so every
+consumer (snapshots, hand tracking, streams) gets the latest frame
+immediately instead of opening the device itself.
+
+The device is released after CAMERA_IDLE_TIMEOUT seconds with no
+subscribers and no reads, and reopened on the next request. The idle
+decision is taken under the same lock that starts the thread, so a request
+arriving during shutdown starts a fresh thread (which waits for the old
+one to release the device) instead of waiting on a dying one.
+
+CAMERA_SOURCE may be a video file path instead of a device index; files
+are paced at their native FPS and loop at the end, which makes the whole
+vision pipeline testable without a webcam.
+"""
+
+import importlib.util
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Optional, Tuple, Union
+
+import numpy as np
+
+from app.config import settings
+from utils.logger import log
+
+# Lazy-import cv2
+cv2 = None
+if importlib.util.find_spec("cv2"):
+    import cv2
+
+Frame = Tuple[int, float, np.ndarray]   # (sequence number, capture time, BGR image)
+
+
+class CameraUnavailable(Exception):
+    pass
+
+
+def parse_source(source: Union[str, int, None]) -> Union[str, int]:
+    """CAMERA_SOURCE → device index or file path ("" → CAMERA_INDEX)."""
+    if source is None or source == "":
+        return settings.CAMERA_INDEX
+    if isinstance(source, int) or str(source).isdigit():
+        return int(source)
+    return str(source)
+
+
+class CameraService:
+    def __init__(self, source: Union[str, int, None] = None, buffer_frames: int = None):
+        self.source = parse_source(source if source is not None else settings.CAMERA_SOURCE)
+        # At least 2: the writer fills the slot after the newest one
+        self.buffer_frames = max(2, buffer_frames or settings.CAMERA_BUFFER_FRAMES)
+        self.is_file = isinstance(self.source, str)
+
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._retiring: Optional[threading.Thread] = None   # Idle thread still releasing the device
+        self._stop = threading.Event()
+        self._subscribers = 0
+        self._last_access = 0.0
+        self._error: Optional[str] = None
+
+        # Ring buffer, allocated once the frame shape is known
+        self._ring: Optional[np.ndarray] = None
+        self._seqs = np.zeros(self.buffer_frames, dtype=np.int64)
+        self._times = np.zeros(self.buffer_frames, dtype=np.float64)
+        self._seq = 0        # Last published sequence number (0 = none yet)
+        self._base_seq = 0   # Last sequence number before the current open
+
+        self.stats = {"opens": 0, "open_ms": 0.0, "frames": 0, "read_failures": 0, "fps": 0.0}
+
+    # ── Subscriptions ────────────────────────────────
+    def subscribe(self):
+        """Keep the camera open until the matching unsubscribe()."""
+        with self._cond:
+            self._subscribers += 1
+            self._last_access = time.monotonic()
+        self._ensure_running()
+
+    def unsubscribe(self):
+        with self._cond:
+            self._subscribers = max(0, self._subscribers - 1)
+            self._last_access = time.monotonic()
+
+    @contextmanager
+    def subscription(self):
+        self.subscribe()
+        try:
+            yield self
+        finally:
+            self.unsubscribe()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _ensure_running(self):
+        with self._cond:
+            self._last_access = time.monotonic()   # Also stops a pending idle shutdown
+            if self.running:
+                return
+            if cv2 is None:
+                raise CameraUnavailable("OpenCV (cv2) not installed.")
+            self._error = None
+            self._base_seq = self._seq   # Frames from a previous open are stale
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, args=(self._retiring,), name="camera-capture", daemon=True
+            )
+            self._thread.start()
+
+    # ── Capture thread ───────────────────────────────
+    def _open(self):
+        start = time.perf_counter()
+        cap = cv2.VideoCapture(self.source)
+        if not cap.isOpened():
+            raise CameraUnavailable(f"Could not open camera source {self.source!r}")
+        if not self.is_file:
+            cap.set(cv2.CAP_PROP_FRAME_WIDTH, settings.CAMERA_WIDTH)
+            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, settings.CAMERA_HEIGHT)
+            cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)   # Newest frame, not a driver backlog
+            for _ in range(settings.CAMERA_WARMUP_FRAMES):
+                cap.read()
+        self.stats["opens"] += 1
+        self.stats["open_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        log.info(f"Camera opened ({self.source!r}) in {self.stats['open_ms']} ms")
+        return cap
+
+    def _retire_if_idle(self) -> bool:
+        """Give up the thread slot when idle; decided under _cond so _ensure_running can't miss it."""
+        with self._cond:
+            if self._subscribers or time.monotonic() - self._last_access <= settings.CAMERA_IDLE_TIMEOUT:
+                return False
+            if self._thread is threading.current_thread():
+                self._retiring, self._thread = self._thread, None
+            return True
+
+    def _exit(self):
+        with self._cond:
+            if self._thread is threading.current_thread():
+                self._thread = None
+            self._cond.notify_all()   # Wake waiters so they restart or fail fast
+
+    def _run(self, previous: Optional[threading.Thread] = None):
+        if previous is not None:
+            previous.join()   # An idle predecessor is still releasing the device
+        try:
+            cap = self._open()
+        except Exception as e:
+            with self._cond:
+                self._error = str(e)
+            log.error(f"Camera capture failed: {e}")
+            self._exit()
+            return
+
+        interval = 0.0
+        if self.is_file:
+            fps = cap.get(cv2.CAP_PROP_FPS) or 0
+            interval = 1.0 / fps if fps > 0 else 1.0 / 30
+        next_at = time.monotonic()
+        try:
+            while not self._stop.is_set() and not self._retire_if_idle():
+                slot = self._seq % self.buffer_frames
+                target = self._ring[slot] if self._ring is not None else None
+                ok, frame = cap.read(target) if target is not None else cap.read()
+                if not ok:
+                    if self.is_file and cap.set(cv2.CAP_PROP_POS_FRAMES, 0):
+                        continue   # Loop the test clip
+                    self.stats["read_failures"] += 1
+                    if self.stats["read_failures"] % 30 == 0:
+                        log.warning("Camera read failing repeatedly")
+                    time.sleep(0.05)
+                    continue
+                self._publish(slot, frame)
+                if interval:
+                    next_at += interval
+                    delay = next_at - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+                    else:
+                        next_at = time.monotonic()
+        finally:
+            cap.release()
+            log.info("Camera released (idle)" if not self._stop.is_set() else "Camera released")
+            self._exit()
+
+    def _publish(self, slot: int, frame: np.ndarray):
+        if self._ring is None or self._ring.shape[1:] != frame.shape:
+            self._ring = np.empty((self.buffer_frames, *frame.shape), dtype=frame.dtype)
+        if frame is not self._ring[slot] and not np.shares_memory(frame, self._ring[slot]):
+            np.copyto(self._ring[slot], frame)
+        now = time.time()
+        with self._cond:
+            previous = float(self._times[(self._seq - 1) % self.buffer_frames]) if self._seq else 0.0
+            self._seq += 1
+            self._seqs[slot] = self._seq
+            self._times[slot] = now
+            self._cond.notify_all()
+        if previous:
+            instant = 1.0 / max(now - previous, 1e-3)
+            self.stats["fps"] = round(0.9 * self.stats["fps"] + 0.1 * instant, 1)
+        self.stats["frames"] += 1
+
+    # ── Consumers ────────────────────────────────────
+    def wait_frame(self, after: int = 0, timeout: float = None, copy: bool = True) -> Frame:
+        """Newest frame with sequence number > `after`, blocking up to `timeout`.
+
+        Opens the camera if needed. With copy=False the image is a view into
+        the ring buffer, valid until CAMERA_BUFFER_FRAMES newer frames arrive.
+        """
+        timeout = settings.CAMERA_OPEN_TIMEOUT if timeout is None else timeout
+        self._ensure_running()
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            after = max(after, self._base_seq)
+            while self._seq <= after:
+                if self._error:
+                    raise CameraUnavailable(self._error)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self.running:
+                    raise CameraUnavailable(self._error or "Timed out waiting for a camera frame")
+                self._cond.wait(remaining)
+            seq = self._seq
+            slot = (seq - 1) % self.buffer_frames
+            captured = float(self._times[slot])
+            image = self._ring[slot]
+            if copy:
+                image = image.copy()
+        return seq, captured, image
+
+    def latest(self, timeout: float = None, copy: bool = True) -> Frame:
+        """The most recent frame (waits only for the very first one)."""
+        return self.wait_frame(0, timeout, copy)
+
+    def recent(self, count: int = None) -> list:
+        """Up to `count` buffered frames, oldest first (copies)."""
+        count = min(count or self.buffer_frames, self.buffer_frames)
+        with self._cond:
+            frames = []
+            for seq in range(max(1, self._seq - count + 1), self._seq + 1):
+                slot = (seq - 1) % self.buffer_frames
+                if self._seqs[slot] == seq:
+                    frames.append((seq, float(self._times[slot]), self._ring[slot].copy()))
+        return frames
+
+    def stop(self):
+        self._stop.set()
+        for thread in (self._thread, self._retiring):
+            if thread is not None:
+                thread.join(timeout=2)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "source": self.source if self.is_file else f"device:{self.source}",
+            "running": self.running,
+            "subscribers": self._subscribers,
+            "buffer_frames": self.buffer_frames,
+            "shape": list(self._ring.shape[1:]) if self._ring is not None else None,
+            "last_seq": self._seq,
+            **self.stats,
+        }
+
+
+camera_service = CameraService()
@@ -1,28 +1,229 @@
 """
-Database Service — MongoDB async client
-────────────────────────────────────────
+Database Service — Document storage behind one small async API
+───────────────────────────────────────────────────────────────
+Stores collections of JSON-like documents (interaction logs and
+conversation sessions) on one of two backends, chosen by DB_BACKEND:
+
+  mongo   MongoDB via Motor (multi-node setups; needs a running mongod)
+  sqlite  Embedded SQLite file (single-user boxes; no server process)
+
+Both expose ensure_collection / insert_many / find / count, and every
+document carries a `ts` datetime used for TTL expiry: Mongo's TTL monitor
+on the mongo backend, a periodic DELETE on the sqlite one.
+
+SQLite runs in WAL mode with synchronous=NORMAL; statements are fixed,
+parameterised SQL (reused from the connection's statement cache) and each
+insert_many is a single transaction.
+
+Cache metadata is not kept here: the agent result cache is in memory only,
+and the media cache rebuilds its LRU index from the files on disk at
+startup, so neither has a metadata file to move onto this store.
 """
 
-from motor.motor_asyncio import AsyncIOMotorClient
+import asyncio
+import inspect
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 from app.config import settings
 from utils.logger import log
 
+IndexSpec = Sequence[Tuple[str, int]]
+
+
+async def _maybe_await(value):
+    """Motor returns coroutines, pymongo/mongomock return results directly."""
+    return await value if inspect.isawaitable(value) else value
+
+
+def _timestamp(value: Any) -> float:
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return float(value) if value is not None else time.time()
+
+
+class MongoStore:
+    def __init__(self, db=None):
+        self.client = None
+        if db is None:
+            from motor.motor_asyncio import AsyncIOMotorClient
+            self.client = AsyncIOMotorClient(
+                settings.MONGODB_URL, serverSelectionTimeoutMS=settings.MONGODB_TIMEOUT_MS
+            )
+            db = self.client[settings.DATABASE_NAME]
+        self.db = db
+
+    async def ensure_collection(self, name: str, ttl: Optional[int] = None, indexes: Sequence[IndexSpec] = ()):
+        collection = self.db[name]
+        if ttl:
+            await _maybe_await(collection.create_index("ts", expireAfterSeconds=ttl))
+        for keys in indexes:
+            await _maybe_await(collection.create_index(list(keys)))
+
+    async def insert_many(self, name: str, docs: List[Dict[str, Any]]):
+        if docs:   # pymongo rejects an empty batch
+            await _maybe_await(self.db[name].insert_many(docs, ordered=False))
+
+    async def find(self, name: str, filters: Dict[str, Any] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """Newest first; `filters` are field equality matches."""
+        cursor = self.db[name].find(filters or {}, {"_id": 0}).sort("ts", -1).limit(limit)
+        if hasattr(cursor, "to_list"):
+            return await cursor.to_list(length=limit)
+        return list(cursor)
+
+    async def count(self, name: str) -> int:
+        return await _maybe_await(self.db[name].count_documents({}))
+
+    def metrics(self) -> Dict[str, Any]:
+        return {"backend": "mongo"}
+
+    async def close(self):
+        if self.client is not None:
+            self.client.close()
+
+
+class SqliteStore:
+    def __init__(self, path: str = None):
+        self.path = path or settings.SQLITE_DB_PATH
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, cached_statements=256)
+        self._conn.executescript(
+            "PRAGMA journal_mode=WAL;"
+            "PRAGMA synchronous=NORMAL;"
+            "PRAGMA busy_timeout=5000;"
+        )
+        self._ttl: Dict[str, int] = {}
+        self._last_purge = time.monotonic()
+        self.stats = {"inserted": 0, "transactions": 0, "purged": 0}
+
+    @staticmethod
+    def _table(name: str) -> str:
+        if not re.fullmatch(r"[A-Za-z_]\w*", name):
+            raise ValueError(f"Invalid collection name: {name!r}")
+        return f'"{name}"'
+
+    @staticmethod
+    def _column(field: str) -> str:
+        """`ts` is a real column; everything else lives in the JSON document."""
+        if field == "ts":
+            return "ts"
+        if not re.fullmatch(r"[A-Za-z_][\w.]*", field):
+            raise ValueError(f"Invalid field name: {field!r}")
+        return f"json_extract(doc, '$.{field}')"
+
+    def _ensure(self, name: str, ttl: Optional[int], indexes: Sequence[IndexSpec]):
+        table = self._table(name)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} (id INTEGER PRIMARY KEY, ts REAL NOT NULL, doc TEXT NOT NULL)"
+            )
+            self._conn.execute(f'CREATE INDEX IF NOT EXISTS "{name}_ts" ON {table} (ts)')
+            for keys in indexes:
+                columns = ", ".join(f"{self._column(f)} {'DESC' if d < 0 else 'ASC'}" for f, d in keys)
+                label = "_".join(re.sub(r"\W", "_", f) for f, _ in keys)
+                self._conn.execute(f'CREATE INDEX IF NOT EXISTS "{name}_{label}" ON {table} ({columns})')
+        if ttl:
+            self._ttl[name] = ttl
+
+    def _insert(self, name: str, docs: List[Dict[str, Any]]):
+        rows = [(_timestamp(d.get("ts")), json.dumps(d, default=str)) for d in docs]
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(f"INSERT INTO {self._table(name)} (ts, doc) VALUES (?, ?)", rows)
+            self.stats["inserted"] += len(rows)
+            self.stats["transactions"] += 1
+        if time.monotonic() - self._last_purge >= settings.SQLITE_PURGE_INTERVAL:
+            self._purge()
+
+    def _purge(self) -> int:
+        """Delete documents past their collection's TTL."""
+        self._last_purge = time.monotonic()
+        removed = 0
+        with self._lock, self._conn:
+            for name, ttl in self._ttl.items():
+                cursor = self._conn.execute(f"DELETE FROM {self._table(name)} WHERE ts < ?", (time.time() - ttl,))
+                removed += cursor.rowcount
+        self.stats["purged"] += removed
+        return removed
+
+    def _find(self, name: str, filters: Dict[str, Any], limit: int) -> List[Dict[str, Any]]:
+        clauses, params = [], []
+        for field, value in (filters or {}).items():
+            clauses.append(f"{self._column(field)} = ?")
+            params.append(_timestamp(value) if field == "ts" else value)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT doc FROM {self._table(name)} {where} ORDER BY ts DESC LIMIT ?", [*params, limit]
+            ).fetchall()
+        return [json.loads(doc) for (doc,) in rows]
+
+    def _count(self, name: str) -> int:
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self._table(name)}").fetchone()[0]
+
+    async def ensure_collection(self, name: str, ttl: Optional[int] = None, indexes: Sequence[IndexSpec] = ()):
+        await asyncio.to_thread(self._ensure, name, ttl, indexes)
+
+    async def insert_many(self, name: str, docs: List[Dict[str, Any]]):
+        if docs:
+            await asyncio.to_thread(self._insert, name, docs)
+
+    async def find(self, name: str, filters: Dict[str, Any] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """Newest first; `filters` are field equality matches."""
+        return await asyncio.to_thread(self._find, name, filters, limit)
+
+    async def count(self, name: str) -> int:
+        return await asyncio.to_thread(self._count, name)
+
+    def disk_bytes(self) -> int:
+        return sum(os.path.getsize(p) for p in (self.path, self.path + "-wal") if os.path.exists(p))
+
+    def metrics(self) -> Dict[str, Any]:
+        return {"backend": "sqlite", "path": self.path, "disk_bytes": self.disk_bytes(), **self.stats}
+
+    async def close(self):
+        with self._lock:
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._conn.close()
+
+
+def make_store(name: str = None):
+    name = name or settings.DB_BACKEND
+    if name == "sqlite":
+        return SqliteStore()
+    if name != "mongo":
+        log.warning(f"Unknown DB_BACKEND '{name}', using mongo")
+    return MongoStore()
+
 
 class DatabaseService:
-    client: AsyncIOMotorClient = None
-    db = None
+    store = None
+    db = None   # Raw Motor database (mongo backend only)
 
     async def connect_to_database(self):
-        log.info("Connecting to MongoDB...")
-        self.client = AsyncIOMotorClient(settings.MONGODB_URL)
-        self.db = self.client[settings.DATABASE_NAME]
-        log.info("Connected to MongoDB!")
+        log.info(f"Connecting to database ({settings.DB_BACKEND})...")
+        self.store = make_store()
+        self.db = getattr(self.store, "db", None)
+        log.info("Database ready!")
 
     async def close_database_connection(self):
-        log.info("Closing MongoDB connection...")
-        self.client.close()
-        log.info("MongoDB connection closed!")
+        if self.store is None:
+            return
+        log.info("Closing database connection...")
+        await self.store.close()
+        self.store = self.db = None
+        log.info("Database connection closed!")
+
+    def metrics(self) -> Dict[str, Any]:
+        return self.store.metrics() if self.store is not None else {"backend": settings.DB_BACKEND, "connected": False}
 
 
 db_service = DatabaseService()
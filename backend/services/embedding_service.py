@@ -0,0 +1,116 @@
+"""
+Embedding Service — Shared MiniLM encoder with dynamic micro-batching
+──────────────────────────────────────────────────────────────────────
+Concurrent `embed()` calls made within EMBED_BATCH_WINDOW are coalesced into
+one `SentenceTransformer.encode` pass, run in a worker thread so the event
+loop never blocks on the model. Throughput scales with batch size rather
+than request count.
+
+Thread callers (ingestion jobs, to_thread work) use `encode()` directly.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import settings
+from utils.logger import log
+
+
+class EmbeddingService:
+    def __init__(self, model_name: str = None):
+        self.model_name = model_name or settings.EMBED_MODEL
+        self._model = None
+        self._model_lock = threading.Lock()   # One forward pass at a time
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self.stats = {"requests": 0, "batches": 0, "texts": 0, "max_batch": 0, "encode_ms": 0.0}
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    from sentence_transformers import SentenceTransformer
+                    log.info(f"Loading Embedding Model ({self.model_name})...")
+                    self._model = SentenceTransformer(self.model_name)
+        return self._model
+
+    @property
+    def dimension(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
+
+    # ── Synchronous (thread) API ─────────────────────
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Normalized float32 embeddings, shape (len(texts), dim)."""
+        if not texts:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        model = self.model
+        start = time.perf_counter()
+        with self._model_lock:
+            vectors = model.encode(
+                texts, batch_size=settings.EMBED_MAX_BATCH, normalize_embeddings=True,
+                convert_to_numpy=True, show_progress_bar=False,
+            )
+        self.stats["batches"] += 1
+        self.stats["texts"] += len(texts)
+        self.stats["max_batch"] = max(self.stats["max_batch"], len(texts))
+        self.stats["encode_ms"] += (time.perf_counter() - start) * 1000
+        return np.asarray(vectors, dtype=np.float32)
+
+    # ── Async (coalescing) API ───────────────────────
+    async def embed(self, text: str) -> np.ndarray:
+        return (await self.embed_many([text]))[0]
+
+    async def embed_many(self, texts: List[str]) -> np.ndarray:
+        """Embed texts, sharing a forward pass with other concurrent callers."""
+        if not texts:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        loop = asyncio.get_running_loop()
+        futures = []
+        for text in texts:
+            future = loop.create_future()
+            self._pending.append((text, future))
+            futures.append(future)
+        self.stats["requests"] += 1
+
+        if len(self._pending) >= settings.EMBED_MAX_BATCH:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(settings.EMBED_BATCH_WINDOW, self._flush)
+        return np.stack(await asyncio.gather(*futures))
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            asyncio.get_running_loop().create_task(self._run_batch(batch))
+
+    async def _run_batch(self, batch: List[Tuple[str, asyncio.Future]]):
+        try:
+            vectors = await asyncio.to_thread(self.encode, [text for text, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), vector in zip(batch, vectors):
+            if not future.done():
+                future.set_result(vector)
+
+    def metrics(self) -> Dict[str, float]:
+        batches = self.stats["batches"]
+        return {
+            **self.stats,
+            "encode_ms": round(self.stats["encode_ms"], 1),
+            "avg_batch": round(self.stats["texts"] / batches, 2) if batches else 0,
+            "loaded": self._model is not None,
+        }
+
+
+embedding_service = EmbeddingService()
@@ -0,0 +1,142 @@
+"""
+Frame Encoder — In-memory JPEG encoding and snapshot storage
+─────────────────────────────────────────────────────────────
+Camera frames are JPEG-encoded in memory (no disk round trip):
+
+  • resizes write into reusable per-size buffers instead of allocating
+  • the last few encodings are cached by (frame seq, quality, width), so
+    any number of MJPEG viewers with the same parameters share one encode
+
+SnapshotStore keeps recent captures by id (bounded by count and age) so
+each capture_frame result has its own URL and concurrent captures never
+overwrite each other.
+
+The snapshot route is guarded, and an <img> can't send the API token, so the
+absolute URL handed to dashboards carries a per-capture signature instead
+(snapshot_url); the route accepts either the signature or normal access.
+"""
+
+import hashlib
+import hmac
+import secrets
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from app.config import settings
+from services.camera_service import CameraService, camera_service, cv2
+
+# Captures only live in memory, so a per-process key is enough
+_SECRET = secrets.token_bytes(32)
+
+
+class FrameEncoder:
+    def __init__(self, cache_entries: int = 8):
+        self._lock = threading.Lock()
+        self._buffers: Dict[Tuple[int, int], np.ndarray] = {}
+        self._cache: "OrderedDict[Tuple[int, int, int], bytes]" = OrderedDict()
+        self._cache_entries = cache_entries
+        self.stats = {"encoded": 0, "shared": 0, "encode_ms": 0.0}
+
+    def _resize(self, frame: np.ndarray, width: int) -> np.ndarray:
+        h, w = frame.shape[:2]
+        if not width or width >= w:
+            return frame
+        size = (width, max(1, round(h * width / w)))
+        buf = self._buffers.get(size)
+        if buf is None:
+            buf = self._buffers[size] = np.empty((size[1], size[0], *frame.shape[2:]), dtype=frame.dtype)
+        return cv2.resize(frame, size, dst=buf, interpolation=cv2.INTER_AREA)
+
+    def encode(self, frame: np.ndarray, quality: int = None, width: int = None, seq: int = None) -> bytes:
+        """JPEG bytes for a BGR frame; pass the camera seq to share work across viewers."""
+        quality = int(quality or settings.JPEG_QUALITY)
+        width = int(width or 0)
+        key = (seq, quality, width) if seq is not None else None
+        with self._lock:
+            if key is not None and key in self._cache:
+                self.stats["shared"] += 1
+                return self._cache[key]
+            start = time.perf_counter()
+            ok, buf = cv2.imencode(".jpg", self._resize(frame, width), [cv2.IMWRITE_JPEG_QUALITY, quality])
+            if not ok:
+                raise ValueError("JPEG encoding failed")
+            data = buf.tobytes()
+            self.stats["encoded"] += 1
+            self.stats["encode_ms"] = round((time.perf_counter() - start) * 1000, 2)
+            if key is not None:
+                self._cache[key] = data
+                while len(self._cache) > self._cache_entries:
+                    self._cache.popitem(last=False)
+        return data
+
+    def metrics(self) -> Dict[str, Any]:
+        return {**self.stats, "resize_buffers": len(self._buffers)}
+
+
+class SnapshotStore:
+    def __init__(self, max_entries: int = None, ttl: float = None):
+        self.max_entries = max_entries or settings.SNAPSHOT_MAX_ENTRIES
+        self.ttl = ttl or settings.SNAPSHOT_TTL
+        self._lock = threading.Lock()
+        self._items: "OrderedDict[str, Tuple[float, bytes, Dict[str, Any]]]" = OrderedDict()
+
+    def put(self, data: bytes, meta: Dict[str, Any]) -> str:
+        capture_id = uuid.uuid4().hex[:12]
+        with self._lock:
+            self._items[capture_id] = (time.monotonic(), data, meta)
+            self._evict()
+        return capture_id
+
+    def get(self, capture_id: str) -> Optional[Tuple[bytes, Dict[str, Any]]]:
+        with self._lock:
+            self._evict()
+            item = self._items.get(capture_id)
+        return (item[1], item[2]) if item else None
+
+    def _evict(self):
+        cutoff = time.monotonic() - self.ttl
+        while self._items and (len(self._items) > self.max_entries or next(iter(self._items.values()))[0] < cutoff):
+            self._items.popitem(last=False)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"snapshots": len(self._items), "bytes": sum(len(d) for _, d, _ in self._items.values())}
+
+
+frame_encoder = FrameEncoder()
+snapshot_store = SnapshotStore()
+
+
+def capture_snapshot(camera: CameraService = None, quality: int = None, width: int = None) -> Dict[str, Any]:
+    """Encode the newest frame and store it under a new capture id (blocking)."""
+    seq, captured, frame = (camera or camera_service).latest(copy=False)
+    data = frame_encoder.encode(frame, quality, width, seq)
+    height, full_width = frame.shape[:2]
+    if width and width < full_width:
+        height, full_width = round(height * width / full_width), width
+    meta = {"seq": seq, "captured_at": round(captured, 3), "width": full_width, "height": height, "bytes": len(data)}
+    capture_id = snapshot_store.put(data, meta)
+    return {
+        "capture_id": capture_id,
+        "url": f"/api/vision/snapshot/{capture_id}",
+        "image_url": snapshot_url(capture_id),
+        **meta,
+    }
+
+
+def sign_capture(capture_id: str) -> str:
+    return hmac.new(_SECRET, capture_id.encode("utf-8"), hashlib.sha256).hexdigest()[:32]
+
+
+def verify_capture(capture_id: str, signature: str) -> bool:
+    return bool(signature) and hmac.compare_digest(sign_capture(capture_id), signature)
+
+
+def snapshot_url(capture_id: str) -> str:
+    """Absolute, signed URL of a capture that an <img> on the dashboard origin can load."""
+    return f"{settings.MEDIA_PUBLIC_BASE}/api/vision/snapshot/{capture_id}?sig={sign_capture(capture_id)}"
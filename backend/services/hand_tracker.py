@@ -0,0 +1,219 @@
+"""
+Hand Tracker — Continuous MediaPipe hand tracking for gesture control
+──────────────────────────────────────────────────────────────────────
+Runs MediaPipe Hands in video mode (landmarks are tracked between frames
+instead of re-detected) on frames from the shared CameraService,
+downscaled to HAND_TRACK_WIDTH, on a worker thread.
+
+Pacing: the tracker always takes the newest camera frame, so frames that
+arrive while one is being processed are skipped rather than queued. The
+effective rate is HAND_TRACK_FPS, lowered towards HAND_TRACK_MIN_FPS while
+system CPU is above HAND_TRACK_CPU_CEILING (Whisper/TTS share the box) and
+raised back when it drops.
+
+Updates go to /ws/hands subscribers as compact JSON (normalised x/y per
+landmark, rounded); the tracker runs only while someone is subscribed.
+Starting the thread and deciding to exit both happen under one lock, so a
+page reload (unsubscribe + subscribe) either keeps the running tracker or
+starts a new one, never neither.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Set
+
+import numpy as np
+import psutil
+
+from app.config import settings
+from services.camera_service import CameraService, CameraUnavailable, camera_service, cv2
+from utils.logger import log
+
+try:
+    from mediapipe.python.solutions import hands as mp_hands
+    HAS_MEDIAPIPE = True
+except ImportError:
+    HAS_MEDIAPIPE = False
+
+
+def downscale(frame: np.ndarray, width: int) -> np.ndarray:
+    h, w = frame.shape[:2]
+    if w <= width:
+        return frame
+    return cv2.resize(frame, (width, round(h * width / w)), interpolation=cv2.INTER_AREA)
+
+
+def compact_hands(results) -> List[Dict[str, Any]]:
+    """MediaPipe results → [{label, score, points: [[x, y], ...21]}]."""
+    hands = []
+    for landmarks, handedness in zip(results.multi_hand_landmarks or [], results.multi_handedness or []):
+        label = handedness.classification[0]
+        hands.append({
+            "label": label.label,
+            "score": round(label.score, 2),
+            "points": [[round(p.x, 3), round(p.y, 3)] for p in landmarks.landmark],
+        })
+    return hands
+
+
+class HandTracker:
+    def __init__(self, camera: CameraService = None):
+        self.camera = camera or camera_service
+        self._listeners: Set[Any] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sending: Optional[asyncio.Future] = None
+
+        self.target_fps = settings.HAND_TRACK_FPS
+        self.latest: Optional[Dict[str, Any]] = None
+        self._latencies = deque(maxlen=200)
+        self._processed = deque(maxlen=200)   # Completion times, for achieved FPS
+        self.stats = {"frames": 0, "skipped": 0, "updates": 0, "dropped_updates": 0, "throttled": 0}
+
+    @property
+    def available(self) -> bool:
+        return HAS_MEDIAPIPE and cv2 is not None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    # ── Subscribers ──────────────────────────────────
+    async def add_listener(self, websocket):
+        with self._lock:
+            self._listeners.add(websocket)
+            self._stop.clear()   # Keeps a tracker that hasn't left its loop yet alive
+            if self._thread is None and self.available:
+                self._loop = asyncio.get_running_loop()
+                self._thread = threading.Thread(target=self._run, name="hand-tracker", daemon=True)
+                self._thread.start()
+
+    def remove_listener(self, websocket):
+        with self._lock:
+            self._listeners.discard(websocket)
+            if not self._listeners:
+                self._stop.set()
+
+    def _should_exit(self) -> bool:
+        """Checked by the tracking thread; gives up the thread slot when stopping."""
+        with self._lock:
+            if not self._stop.is_set():
+                return False
+            self._release_slot()
+            return True
+
+    def _release_slot(self):
+        if self._thread is threading.current_thread():
+            self._thread = None
+
+    async def _broadcast(self, message: str):
+        for ws in list(self._listeners):
+            try:
+                await ws.send_text(message)
+            except Exception:
+                self.remove_listener(ws)
+
+    def _emit(self, update: Dict[str, Any]):
+        """Hand an update to the event loop; drop it if the previous send is still in flight."""
+        if self._loop is None or not self._listeners:
+            return
+        if self._sending is not None and not self._sending.done():
+            self.stats["dropped_updates"] += 1
+            return
+        self._sending = asyncio.run_coroutine_threadsafe(self._broadcast(json.dumps(update)), self._loop)
+        self.stats["updates"] += 1
+
+    # ── Tracking loop ────────────────────────────────
+    def _adapt(self):
+        """Lower the target FPS under CPU pressure, recover when it eases."""
+        cpu = psutil.cpu_percent(interval=None)
+        if cpu > settings.HAND_TRACK_CPU_CEILING:
+            self.target_fps = max(settings.HAND_TRACK_MIN_FPS, self.target_fps * 0.8)
+            self.stats["throttled"] += 1
+        elif cpu < settings.HAND_TRACK_CPU_CEILING - 15:
+            self.target_fps = min(settings.HAND_TRACK_FPS, self.target_fps * 1.1)
+
+    def _run(self):
+        log.info("Hand tracking started")
+        hands, subscribed = None, False
+        last_seq, had_hands, last_adapt = 0, False, 0.0
+        try:
+            hands = mp_hands.Hands(
+                static_image_mode=False,
+                max_num_hands=settings.HAND_TRACK_MAX_HANDS,
+                model_complexity=settings.HAND_TRACK_MODEL_COMPLEXITY,
+                min_detection_confidence=0.5,
+                min_tracking_confidence=0.5,
+            )
+            self.camera.subscribe()
+            subscribed = True
+            while not self._should_exit():
+                started = time.monotonic()
+                try:
+                    seq, captured, frame = self.camera.wait_frame(last_seq, timeout=1.0, copy=False)
+                except CameraUnavailable as e:
+                    log.warning(f"Hand tracking paused: {e}")
+                    self._stop.wait(1.0)
+                    continue
+                if last_seq:
+                    self.stats["skipped"] += max(0, seq - last_seq - 1)
+                last_seq = seq
+                t0 = time.monotonic()
+
+                small = downscale(frame, settings.HAND_TRACK_WIDTH)
+                rgb = cv2.cvtColor(small, cv2.COLOR_BGR2RGB)
+                results = hands.process(rgb)
+                detected = compact_hands(results)
+
+                done = time.monotonic()
+                self._latencies.append(done - t0)
+                self._processed.append(done)
+                self.stats["frames"] += 1
+
+                update = {
+                    "type": "hand_landmarks", "seq": seq, "ts": round(captured, 3),
+                    "latency_ms": round((time.time() - captured) * 1000, 1), "hands": detected,
+                }
+                self.latest = update
+                if detected or had_hands:   # Silence while no hands, one empty update when they leave
+                    self._emit(update)
+                had_hands = bool(detected)
+
+                if done - last_adapt >= 1.0:
+                    self._adapt()
+                    last_adapt = done
+                self._stop.wait(max(0.0, 1.0 / self.target_fps - (time.monotonic() - started)))
+        finally:
+            with self._lock:
+                self._release_slot()   # Also after a crash, so the next listener restarts it
+            if hands is not None:
+                hands.close()
+            if subscribed:
+                self.camera.unsubscribe()
+            log.info("Hand tracking stopped")
+
+    def stop(self):
+        self._stop.set()
+
+    def metrics(self) -> Dict[str, Any]:
+        latencies = list(self._latencies)
+        processed = list(self._processed)
+        fps = (len(processed) - 1) / (processed[-1] - processed[0]) if len(processed) > 1 and processed[-1] > processed[0] else 0.0
+        return {
+            "available": self.available,
+            "running": self.running,
+            "listeners": len(self._listeners),
+            "target_fps": round(self.target_fps, 1),
+            "achieved_fps": round(fps, 1),
+            "latency_p50_ms": round(float(np.percentile(latencies, 50)) * 1000, 1) if latencies else 0.0,
+            "latency_p95_ms": round(float(np.percentile(latencies, 95)) * 1000, 1) if latencies else 0.0,
+            **self.stats,
+        }
+
+
+hand_tracker = HandTracker()
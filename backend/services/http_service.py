@@ -0,0 +1,252 @@
+"""
+HTTP Service — Shared async HTTP client pool
+─────────────────────────────────────────────
+One application-wide httpx.AsyncClient for every network-bound agent:
+
+  • Connection pooling + keep-alive (no TLS handshake per lookup)
+  • HTTP/2 when the `h2` package is installed
+  • Cached DNS resolution for new connections
+  • Per-host concurrency limits and timeouts, capped by the request deadline
+
+Created on app startup and closed on shutdown; agents receive it via
+constructor injection (defaulting to the `http_service` singleton).
+DuckDuckGo's SDK is not httpx-based, so a single shared DDGS session is
+kept here as well.
+"""
+
+import asyncio
+import importlib.util
+import socket
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.config import settings
+from utils.deadline import current_deadline
+from utils.logger import log
+
+HAS_HTTP2 = importlib.util.find_spec("h2") is not None
+
+try:
+    import httpcore
+    HAS_HTTPCORE_BACKEND = hasattr(httpcore, "AsyncNetworkBackend")
+except ImportError:
+    HAS_HTTPCORE_BACKEND = False
+
+
+class _DNSCache:
+    """Tiny TTL cache in front of getaddrinfo."""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entries: Dict[Tuple[str, int], Tuple[float, str]] = {}
+
+    async def resolve(self, host: str, port: int) -> str:
+        key = (host, port)
+        cached = self._entries.get(key)
+        if cached and time.monotonic() - cached[0] < self.ttl:
+            return cached[1]
+        loop = asyncio.get_running_loop()
+        infos = await loop.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        address = infos[0][4][0]
+        self._entries[key] = (time.monotonic(), address)
+        return address
+
+
+if HAS_HTTPCORE_BACKEND:
+    class _CachedDNSBackend(httpcore.AsyncNetworkBackend):
+        """Resolve through the DNS cache, then delegate to the default backend.
+        TLS still uses the original hostname for SNI/verification."""
+
+        def __init__(self, dns: _DNSCache):
+            self._dns = dns
+            self._backend = httpcore.AnyIOBackend()
+
+        async def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+            try:
+                host = await self._dns.resolve(host, port)
+            except OSError:
+                pass  # Let the real backend surface the resolution error
+            return await self._backend.connect_tcp(
+                host, port, timeout=timeout, local_address=local_address, socket_options=socket_options
+            )
+
+        async def connect_unix_socket(self, path, timeout=None, socket_options=None):
+            return await self._backend.connect_unix_socket(path, timeout=timeout, socket_options=socket_options)
+
+        async def sleep(self, seconds):
+            await self._backend.sleep(seconds)
+
+
+class HttpService:
+    def __init__(self):
+        self.client: Optional[httpx.AsyncClient] = None
+        self.dns = _DNSCache(settings.HTTP_DNS_TTL)
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+        self._ddgs = None
+        self.stats = {"requests": 0, "errors": 0, "timeouts": 0}
+
+    # ── Lifecycle ────────────────────────────────────
+    async def start(self):
+        if self.client is not None:
+            return
+        transport = httpx.AsyncHTTPTransport(
+            http2=HAS_HTTP2,
+            retries=1,
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+            ),
+        )
+        self._install_dns_cache(transport)
+        self.client = httpx.AsyncClient(
+            transport=transport,
+            timeout=httpx.Timeout(settings.HTTP_TIMEOUT, connect=settings.HTTP_CONNECT_TIMEOUT),
+            headers={"User-Agent": settings.HTTP_USER_AGENT},
+            follow_redirects=True,
+        )
+        log.info(f"HTTP client pool ready (http2={'on' if HAS_HTTP2 else 'off'}).")
+
+    async def close(self):
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+            log.info("HTTP client pool closed.")
+        self._ddgs = None
+
+    def _install_dns_cache(self, transport: httpx.AsyncHTTPTransport):
+        """Swap the pool's network backend for the DNS-caching one (best effort)."""
+        pool = getattr(transport, "_pool", None)
+        if not HAS_HTTPCORE_BACKEND or pool is None or not hasattr(pool, "_network_backend"):
+            log.debug("DNS cache not installed (unsupported httpcore version).")
+            return
+        pool._network_backend = _CachedDNSBackend(self.dns)
+
+    def ddgs(self):
+        """Shared DuckDuckGo session (sync SDK — call it via asyncio.to_thread)."""
+        if self._ddgs is None:
+            from ddgs import DDGS
+            self._ddgs = DDGS(timeout=max(1, int(settings.SOURCE_TIMEOUT)))
+        return self._ddgs
+
+    # ── Per-host Limits ──────────────────────────────
+    @asynccontextmanager
+    async def limit(self, host: str):
+        """Bound concurrent requests to one host (also used for non-httpx SDKs)."""
+        sem = self._host_limits.get(host)
+        if sem is None:
+            sem = asyncio.Semaphore(settings.HTTP_HOST_LIMITS.get(host, settings.HTTP_PER_HOST_LIMIT))
+            self._host_limits[host] = sem
+        async with sem:
+            yield
+
+    def timeout_for(self, host: str, timeout: float = None) -> Optional[float]:
+        """Per-host timeout, capped by the current request deadline."""
+        base = timeout or settings.HTTP_HOST_TIMEOUTS.get(host, settings.HTTP_TIMEOUT)
+        return current_deadline().timeout(base)
+
+    # ── Requests ─────────────────────────────────────
+    async def request(self, method: str, url: str, timeout: float = None, **kwargs: Any) -> httpx.Response:
+        if self.client is None:
+            await self.start()
+        host = urlsplit(url).hostname or ""
+        request_timeout = self.timeout_for(host, timeout)
+        self.stats["requests"] += 1
+        try:
+            async with self.limit(host):
+                return await self.client.request(method, url, timeout=request_timeout, **kwargs)
+        except httpx.TimeoutException:
+            self.stats["timeouts"] += 1
+            raise
+        except httpx.HTTPError:
+            self.stats["errors"] += 1
+            raise
+
+    @asynccontextmanager
+    async def stream(self, method: str, url: str, timeout: float = None, **kwargs: Any):
+        """Streaming request through the pool (same limits/timeouts as request())."""
+        if self.client is None:
+            await self.start()
+        host = urlsplit(url).hostname or ""
+        self.stats["requests"] += 1
+        async with self.limit(host):
+            async with self.client.stream(method, url, timeout=self.timeout_for(host, timeout), **kwargs) as resp:
+                yield resp
+
+    async def open(
+        self, method: str, url: str, timeout: float = None,
+        check: Callable[[str], Awaitable[None]] = None, **kwargs: Any,
+    ) -> httpx.Response:
+        """
+        Start a streaming request, following redirects by hand so `check(url)`
+        vets every hop (not just the first). The caller must `await resp.aclose()`.
+        No per-host limit is held, so long-lived streams don't starve the host.
+        """
+        if self.client is None:
+            await self.start()
+        for _ in range(settings.HTTP_MAX_REDIRECTS + 1):
+            if check is not None:
+                await check(url)
+            host = urlsplit(url).hostname or ""
+            self.stats["requests"] += 1
+            request = self.client.build_request(method, url, timeout=self.timeout_for(host, timeout), **kwargs)
+            try:
+                resp = await self.client.send(request, stream=True, follow_redirects=False)
+            except httpx.TimeoutException:
+                self.stats["timeouts"] += 1
+                raise
+            except httpx.HTTPError:
+                self.stats["errors"] += 1
+                raise
+            if not resp.has_redirect_location:
+                return resp
+            url = str(resp.url.join(resp.headers["location"]))
+            await resp.aclose()
+        raise httpx.TooManyRedirects("Too many redirects", request=request)
+
+    async def get_capped(
+        self, url: str, max_bytes: int, check: Callable[[str], Awaitable[None]] = None, **kwargs: Any
+    ) -> Tuple[httpx.Response, bytes, bool]:
+        """
+        GET at most `max_bytes` of the body. Returns (response, body, truncated);
+        the connection is released as soon as the cap is hit. With `check`,
+        every redirect hop is validated before it is requested.
+        """
+        body = bytearray()
+        truncated = False
+        async with self.limit(urlsplit(url).hostname or ""):
+            resp = await self.open("GET", url, check=check, **kwargs)
+            try:
+                resp.raise_for_status()
+                async for chunk in resp.aiter_bytes():
+                    body.extend(chunk)
+                    if len(body) > max_bytes:
+                        truncated = True
+                        del body[max_bytes:]
+                        break
+            finally:
+                await resp.aclose()
+        return resp, bytes(body), truncated
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def get_json(self, url: str, **kwargs: Any) -> Any:
+        resp = await self.get(url, **kwargs)
+        resp.raise_for_status()
+        return resp.json()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "http2": HAS_HTTP2,
+            "dns_cached_hosts": len(self.dns._entries),
+            "open": self.client is not None,
+        }
+
+
+http_service = HttpService()
@@ -0,0 +1,181 @@
+"""
+Interaction Log — Write-behind logging of every command
+────────────────────────────────────────────────────────────────
+Requests only append to an in-memory queue; a background task flushes it
+to db_service's store (MongoDB or SQLite) with `insert_many` once LOG_BATCH_SIZE documents are waiting or every
+LOG_FLUSH_INTERVAL seconds, whichever comes first.
+
+Backpressure never reaches the request path:
+  • above LOG_SAMPLE_ABOVE × LOG_QUEUE_MAX queued, only LOG_SAMPLE_RATE of
+    new interactions are kept (errors are not sampled)
+  • at LOG_QUEUE_MAX, new documents are dropped
+  • a failed flush drops its batch and backs off (Mongo down ≠ app down)
+
+Collections (each with a TTL index on `ts`, see LOG_COLLECTIONS):
+  interactions   command, routing JSON, execution results, stage timings
+  errors         handler failures
+
+Pass a MongoStore over a mongomock database to test without a server.
+"""
+
+import asyncio
+import random
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from app.config import settings
+from services.db_service import db_service
+from utils.logger import log
+
+# Secondary indexes per collection (the TTL index on `ts` is added for all)
+INDEXES: Dict[str, List[List[Tuple[str, int]]]] = {
+    "interactions": [[("client_id", 1), ("ts", -1)], [("agents", 1), ("ts", -1)]],
+    "errors": [[("client_id", 1), ("ts", -1)]],
+}
+
+
+def compact(value: Any, depth: int = 0) -> Any:
+    """Bound a result payload before logging (long strings, long lists, deep nesting)."""
+    if isinstance(value, str):
+        limit = settings.LOG_MAX_FIELD_CHARS
+        return value if len(value) <= limit else value[:limit] + "…"
+    if depth >= 6:
+        return str(value)[: settings.LOG_MAX_FIELD_CHARS]
+    if isinstance(value, dict):
+        return {str(k): compact(v, depth + 1) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [compact(v, depth + 1) for v in value[: settings.LOG_MAX_LIST_ITEMS]]
+    if value is None or isinstance(value, (bool, int, float, datetime)):
+        return value
+    return str(value)
+
+
+class InteractionLog:
+    def __init__(self, store=None):
+        self._store = store
+        self.queue: Deque[Tuple[str, Dict[str, Any]]] = deque()
+        self.running = False
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._indexed = False
+        self.stats = {
+            "queued": 0, "written": 0, "sampled_out": 0, "dropped": 0,
+            "failed": 0, "batches": 0, "last_flush_ms": 0.0,
+        }
+
+    @property
+    def store(self):
+        return self._store if self._store is not None else db_service.store
+
+    # ── Producer side (request path) ─────────────────
+    def record(self, collection: str, doc: Dict[str, Any], sample: bool = True) -> bool:
+        """Queue a document; never blocks. False when shed by backpressure."""
+        if not self.running:
+            return False
+        depth = len(self.queue)
+        if depth >= settings.LOG_QUEUE_MAX:
+            self.stats["dropped"] += 1
+            return False
+        if sample and depth >= settings.LOG_SAMPLE_ABOVE * settings.LOG_QUEUE_MAX and random.random() >= settings.LOG_SAMPLE_RATE:
+            self.stats["sampled_out"] += 1
+            return False
+        doc = compact(doc)
+        doc["ts"] = datetime.now(timezone.utc)   # TTL indexes need a BSON date
+        self.queue.append((collection, doc))
+        self.stats["queued"] += 1
+        if len(self.queue) >= settings.LOG_BATCH_SIZE and self._wakeup is not None:
+            self._wakeup.set()
+        return True
+
+    def interaction(self, **fields):
+        self.record("interactions", fields)
+
+    def error(self, **fields):
+        # Rare and worth keeping: only the hard queue cap applies
+        self.record("errors", fields, sample=False)
+
+    # ── Consumer side (background) ───────────────────
+    async def start(self):
+        if self.running or not settings.LOG_ENABLED or self.store is None:
+            return
+        self.running = True
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._flush_loop())
+        log.info("Interaction log started")
+
+    async def _flush_loop(self):
+        failures = 0
+        while self.running:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=settings.LOG_FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if await self.flush():
+                failures = 0
+            else:
+                failures += 1
+                await asyncio.sleep(min(settings.LOG_FLUSH_INTERVAL * 2 ** failures, 60))
+
+    async def ensure_indexes(self):
+        """Secondary indexes plus a TTL index on `ts` for every log collection."""
+        for name, ttl in settings.LOG_COLLECTIONS.items():
+            await self.store.ensure_collection(name, ttl, INDEXES.get(name, []))
+        self._indexed = True
+
+    async def flush(self) -> bool:
+        """Write everything queued, one insert_many per collection and batch."""
+        if not self.queue:
+            return True
+        start = time.perf_counter()
+        ok = True
+        try:
+            if not self._indexed:
+                await self.ensure_indexes()
+        except Exception as e:
+            log.warning(f"Interaction log index setup failed: {e}")
+            ok = False
+
+        while self.queue and ok:
+            batches: Dict[str, List[Dict[str, Any]]] = {}
+            for _ in range(min(len(self.queue), settings.LOG_BATCH_SIZE)):
+                collection, doc = self.queue.popleft()
+                batches.setdefault(collection, []).append(doc)
+            for collection, docs in batches.items():
+                try:
+                    await self.store.insert_many(collection, docs)
+                    self.stats["written"] += len(docs)
+                    self.stats["batches"] += 1
+                except Exception as e:
+                    log.warning(f"Interaction log flush to '{collection}' failed, dropping {len(docs)}: {e}")
+                    self.stats["failed"] += len(docs)
+                    ok = False
+
+        if not ok and self.queue:
+            # Don't let a dead database pin memory; shed the backlog
+            self.stats["failed"] += len(self.queue)
+            self.queue.clear()
+        self.stats["last_flush_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        return ok
+
+    async def stop(self):
+        """Stop the flusher and write what is still queued (bounded by LOG_FLUSH_INTERVAL)."""
+        if not self.running:
+            return
+        self.running = False
+        self._wakeup.set()
+        try:
+            # Let an in-flight batch finish, then drain the rest
+            await asyncio.wait_for(asyncio.shield(self._task), timeout=settings.LOG_FLUSH_INTERVAL)
+            await asyncio.wait_for(self.flush(), timeout=settings.LOG_FLUSH_INTERVAL)
+        except Exception as e:
+            log.warning(f"Interaction log final flush incomplete: {e}")
+        self._task.cancel()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {"running": self.running, "queue": len(self.queue), **self.stats}
+
+
+interaction_log = InteractionLog()
@@ -0,0 +1,588 @@
+"""
+Local Index — Offline full-text + vector search over user documents
+────────────────────────────────────────────────────────────────────
+Lets SearchAgent answer without internet from document folders and offline
+dumps (Markdown/text, PDFs, Wikipedia XML or ZIM, JSONL extracts).
+
+Layout (LOCAL_INDEX_DIR):
+  index.sqlite3        documents, passages, lexicon, segments, ingest checkpoints
+  postings_<n>.bin     (passage id, tf) pairs per term, memory-mapped at query time
+  lengths_<n>.npy      passage lengths (BM25), memory-mapped
+  vectors_<n>.npy      normalized MiniLM embeddings (float16), memory-mapped
+
+Ingestion is append-only: each batch becomes a segment written in one
+transaction together with its checkpoint, so an interrupted bulk load
+resumes where it stopped. Changed files tombstone their old passages.
+
+CLI:
+  python -m services.local_index ingest <path> [<path> ...]
+  python -m services.local_index search "<query>"
+"""
+
+import bz2
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+import xml.etree.ElementTree as ET
+from collections import Counter
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import settings
+from services.embedding_service import embedding_service
+from utils.logger import log
+from utils.ranking import reciprocal_rank_fusion
+
+try:
+    from pypdf import PdfReader
+    HAS_PYPDF = True
+except ImportError:
+    HAS_PYPDF = False
+
+try:
+    from libzim.reader import Archive
+    HAS_LIBZIM = True
+except ImportError:
+    HAS_LIBZIM = False
+
+POSTING_DTYPE = np.dtype([("pid", "<u4"), ("tf", "<u2")])
+VECTOR_BLOCK = 65536
+
+TEXT_EXTENSIONS = {".md", ".markdown", ".txt", ".rst"}
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were will with".split()
+)
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in STOPWORDS and len(t) < 40]
+
+
+def chunk_text(text: str, words: int = None) -> List[str]:
+    """Split a document into ~`words`-word passages on paragraph boundaries."""
+    words = words or settings.LOCAL_INDEX_PASSAGE_WORDS
+    passages, buf = [], []
+    for para in re.split(r"\n\s*\n", text):
+        tokens = para.split()
+        if not tokens:
+            continue
+        buf.extend(tokens)
+        while len(buf) >= words:
+            passages.append(" ".join(buf[:words]))
+            buf = buf[words:]
+    if buf:
+        passages.append(" ".join(buf))
+    return passages
+
+
+# ── Wikitext cleanup (good enough for retrieval, not for display) ──
+_WIKI_PATTERNS = [
+    (re.compile(r"<ref[^>]*/>|<ref[^>]*>.*?</ref>", re.S), ""),
+    (re.compile(r"<!--.*?-->", re.S), ""),
+    (re.compile(r"\[\[(?:File|Image|Category):[^\]]*\]\]", re.I), ""),
+    (re.compile(r"\[\[(?:[^\]|]*\|)?([^\]]*)\]\]"), r"\1"),
+    (re.compile(r"\[https?://\S+ ([^\]]*)\]"), r"\1"),
+    (re.compile(r"'{2,}"), ""),
+    (re.compile(r"^=+\s*(.*?)\s*=+$", re.M), r"\n\1\n"),
+    (re.compile(r"<[^>]+>"), ""),
+]
+_TEMPLATE_RE = re.compile(r"\{\{[^{}]*\}\}|\{\|[^{}]*?\|\}", re.S)
+
+
+def clean_wikitext(text: str) -> str:
+    for _ in range(5):   # Templates nest; peel a few layers
+        text, n = _TEMPLATE_RE.subn("", text)
+        if not n:
+            break
+    for pattern, repl in _WIKI_PATTERNS:
+        text = pattern.sub(repl, text)
+    return text
+
+
+# ── Document sources ─────────────────────────────────
+# Each yields (source key, title, text, progress fraction)
+Document = Tuple[str, str, str, float]
+
+
+def _read_text_file(path: str) -> str:
+    if path.lower().endswith(".pdf"):
+        reader = PdfReader(path)
+        return "\n\n".join(page.extract_text() or "" for page in reader.pages)
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        return f.read()
+
+
+def _strip_markdown(text: str) -> str:
+    text = re.sub(r"```.*?```", " ", text, flags=re.S)
+    text = re.sub(r"!\[[^\]]*\]\([^)]*\)", " ", text)
+    text = re.sub(r"\[([^\]]*)\]\([^)]*\)", r"\1", text)
+    return re.sub(r"^[#>*\-\s]+", "", text, flags=re.M)
+
+
+def iter_wikipedia_xml(path: str) -> Iterator[Document]:
+    size = os.path.getsize(path) or 1
+    with open(path, "rb") as raw:
+        f = bz2.open(raw) if path.endswith(".bz2") else raw
+        title, ns, redirect = None, "0", False
+        root = None
+        for event, elem in ET.iterparse(f, events=("start", "end")):
+            if root is None:
+                root = elem
+            if event == "start":
+                continue
+            tag = elem.tag.rsplit("}", 1)[-1]
+            if tag == "title":
+                title = elem.text
+            elif tag == "ns":
+                ns = elem.text
+            elif tag == "redirect":
+                redirect = True
+            elif tag == "page":
+                text = elem.findtext(".//{*}text") or ""
+                if ns == "0" and not redirect and title and text:
+                    yield f"{path}#{title}", title, clean_wikitext(text), raw.tell() / size
+                # Cleared pages would otherwise stay attached to <mediawiki>
+                elem.clear()
+                root.clear()
+                title, ns, redirect = None, "0", False
+
+
+def iter_jsonl(path: str) -> Iterator[Document]:
+    """WikiExtractor-style JSON lines: {"title", "text", ["url"|"id"]}."""
+    size = os.path.getsize(path) or 1
+    with open(path, "rb") as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+            except ValueError:
+                continue
+            if row.get("text"):
+                key = row.get("url") or f"{path}#{row.get('id') or row.get('title')}"
+                yield key, row.get("title", ""), row["text"], f.tell() / size
+
+
+def iter_zim(path: str) -> Iterator[Document]:
+    from services.page_reader import ReadableTextParser
+    archive = Archive(path)
+    total = archive.entry_count or 1
+    for i in range(archive.entry_count):
+        entry = archive._get_entry_by_id(i)
+        if entry.is_redirect:
+            continue
+        item = entry.get_item()
+        if not item.mimetype.startswith("text/html"):
+            continue
+        parser = ReadableTextParser()
+        parser.feed(bytes(item.content).decode("utf-8", errors="ignore"))
+        yield f"{path}#{entry.path}", entry.title, "\n\n".join(parser.text_blocks()), (i + 1) / total
+
+
+def iter_folder(root: str) -> Iterator[Tuple[str, str, float]]:
+    """(path, title, progress) of indexable files under a folder."""
+    files = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+        for name in filenames:
+            ext = os.path.splitext(name)[1].lower()
+            if ext in TEXT_EXTENSIONS or (ext == ".pdf" and HAS_PYPDF):
+                files.append(os.path.join(dirpath, name))
+    files.sort()
+    for i, path in enumerate(files):
+        yield path, os.path.splitext(os.path.basename(path))[0], (i + 1) / (len(files) or 1)
+
+
+class _Segment:
+    def __init__(self, root: str, seg_id: int, first_pid: int, count: int, has_vectors: bool):
+        self.id = seg_id
+        self.first_pid = first_pid
+        self.count = count
+        postings_path = os.path.join(root, f"postings_{seg_id}.bin")
+        # np.memmap refuses empty files
+        self.postings = np.memmap(postings_path, dtype=POSTING_DTYPE, mode="r") \
+            if os.path.getsize(postings_path) else np.zeros(0, POSTING_DTYPE)
+        self.lengths = np.load(os.path.join(root, f"lengths_{seg_id}.npy"), mmap_mode="r")
+        vec_path = os.path.join(root, f"vectors_{seg_id}.npy")
+        self.vectors = np.load(vec_path, mmap_mode="r") if has_vectors and os.path.exists(vec_path) else None
+
+
+class LocalIndex:
+    def __init__(self, root: str = None):
+        self.root = root or settings.LOCAL_INDEX_DIR
+        self._lock = threading.Lock()         # SQLite + segment list
+        self._ingest_lock = threading.Lock()  # One bulk load at a time
+        self._conn: Optional[sqlite3.Connection] = None
+        self._segments: List[_Segment] = []
+        self._deleted: set = set()
+        self._total_len = 0
+        self.progress: Dict[str, Any] = {"running": False}
+        self.stats = {"queries": 0, "lexical_ms": 0.0, "vector_ms": 0.0}
+
+    # ── Storage ──────────────────────────────────────
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(self.root, exist_ok=True)
+            self._conn = sqlite3.connect(os.path.join(self.root, "index.sqlite3"), check_same_thread=False)
+            self._conn.executescript(
+                "PRAGMA journal_mode=WAL;"
+                "CREATE TABLE IF NOT EXISTS docs (id INTEGER PRIMARY KEY, source TEXT UNIQUE, title TEXT, mtime REAL);"
+                "CREATE TABLE IF NOT EXISTS passages (id INTEGER PRIMARY KEY, doc_id INTEGER, text TEXT, deleted INTEGER DEFAULT 0);"
+                "CREATE TABLE IF NOT EXISTS terms (term TEXT, segment INTEGER, offset INTEGER, count INTEGER);"
+                "CREATE INDEX IF NOT EXISTS terms_term ON terms (term);"
+                "CREATE TABLE IF NOT EXISTS segments (id INTEGER PRIMARY KEY, first_pid INTEGER, count INTEGER, vectors INTEGER);"
+                "CREATE TABLE IF NOT EXISTS checkpoints (root TEXT PRIMARY KEY, position INTEGER, updated REAL);"
+            )
+            self._load_segments()
+        return self._conn
+
+    def _load_segments(self):
+        rows = self._conn.execute("SELECT id, first_pid, count, vectors FROM segments ORDER BY id").fetchall()
+        self._segments = [_Segment(self.root, *row) for row in rows]
+        self._total_len = int(sum(int(s.lengths.sum()) for s in self._segments))
+        self._deleted = {r[0] for r in self._conn.execute("SELECT id FROM passages WHERE deleted = 1")}
+        if self._segments:
+            log.info(f"Local index opened: {self.passage_count} passages in {len(self._segments)} segments")
+
+    @property
+    def passage_count(self) -> int:
+        return sum(s.count for s in self._segments)
+
+    @property
+    def is_empty(self) -> bool:
+        with self._lock:
+            self._db()
+            return not self._segments
+
+    def _encode(self, texts: List[str]) -> Optional[np.ndarray]:
+        if not settings.LOCAL_INDEX_EMBEDDINGS:
+            return None
+        try:
+            return embedding_service.encode(texts)
+        except Exception as e:
+            log.warning(f"Local index embeddings unavailable, lexical only: {e}")
+            return None
+
+    # ── Ingestion ────────────────────────────────────
+    @staticmethod
+    def allowed(path: str, roots: List[str] = None) -> bool:
+        """Whether `path` (symlinks resolved) lies under one of LOCAL_INDEX_ROOTS."""
+        real = os.path.realpath(os.path.expanduser(path))
+        for root in settings.LOCAL_INDEX_ROOTS if roots is None else roots:
+            base = os.path.realpath(os.path.expanduser(root))
+            if real == base or real.startswith(base.rstrip(os.sep) + os.sep):
+                return True
+        return False
+
+    def ingest(self, path: str, on_progress: Callable[[Dict[str, Any]], None] = None) -> Dict[str, Any]:
+        """Index a folder or dump file, resuming from its last checkpoint."""
+        path = os.path.abspath(path)
+        if not self._ingest_lock.acquire(blocking=False):
+            raise RuntimeError("An ingestion is already running")
+        try:
+            with self._lock:
+                row = self._db().execute("SELECT position FROM checkpoints WHERE root = ?", (path,)).fetchone()
+            resume_from = row[0] if row else 0
+            self.progress = {"running": True, "path": path, "done": 0, "indexed": 0,
+                             "fraction": 0.0, "resumed_from": resume_from, "started": time.time()}
+            if os.path.isdir(path):
+                self._ingest_folder(path, on_progress)
+            else:
+                self._ingest_dump(path, resume_from, on_progress)
+            self.progress.update(fraction=1.0, running=False)
+            log.info(f"Local index: ingested {path} ({self.progress['indexed']} documents)")
+            return dict(self.progress)
+        finally:
+            self.progress["running"] = False
+            self._ingest_lock.release()
+
+    def _dump_reader(self, path: str) -> Iterator[Document]:
+        lower = path.lower()
+        if lower.endswith((".xml", ".xml.bz2")):
+            return iter_wikipedia_xml(path)
+        if lower.endswith((".jsonl", ".json")):
+            return iter_jsonl(path)
+        if lower.endswith(".zim"):
+            if not HAS_LIBZIM:
+                raise RuntimeError("libzim is not installed; ZIM files can't be indexed")
+            return iter_zim(path)
+        if lower.endswith(".pdf") and not HAS_PYPDF:
+            raise RuntimeError("pypdf is not installed; PDFs can't be indexed")
+        return iter([(path, os.path.basename(path), _read_text_file(path), 1.0)])
+
+    def _ingest_dump(self, path: str, resume_from: int, on_progress):
+        batch: List[Tuple[str, str, str, Optional[float]]] = []
+        position = 0
+        for key, title, text, fraction in self._dump_reader(path):
+            position += 1
+            if position <= resume_from:
+                continue   # Already committed in an earlier run
+            batch.append((key, title, text, None))
+            self.progress.update(done=position, fraction=round(fraction, 4))
+            if len(batch) >= settings.LOCAL_INDEX_BATCH_DOCS:
+                self._flush(batch, (path, position), on_progress)
+                batch = []
+        self._flush(batch, (path, position), on_progress)
+
+    def _ingest_folder(self, root: str, on_progress):
+        with self._lock:
+            known = dict(self._db().execute("SELECT source, mtime FROM docs"))
+        batch = []
+        for path, title, fraction in iter_folder(root):
+            self.progress.update(done=self.progress["done"] + 1, fraction=round(fraction, 4))
+            mtime = os.path.getmtime(path)
+            if known.get(path) == mtime:
+                continue   # Unchanged since the last run
+            try:
+                text = _read_text_file(path)
+            except Exception as e:
+                log.warning(f"Local index: skipping {path}: {e}")
+                continue
+            if path.lower().endswith((".md", ".markdown")):
+                text = _strip_markdown(text)
+            batch.append((path, title, text, mtime))
+            if len(batch) >= settings.LOCAL_INDEX_BATCH_DOCS:
+                self._flush(batch, None, on_progress)
+                batch = []
+        self._flush(batch, None, on_progress)
+
+    def _flush(self, batch: list, checkpoint: Optional[Tuple[str, int]], on_progress):
+        """Write one segment (postings, lengths, vectors) and commit it atomically."""
+        if not batch:
+            if checkpoint:
+                with self._lock:
+                    self._save_checkpoint(self._db(), checkpoint)
+            return
+        with self._lock:
+            db = self._db()
+            seg_id = (db.execute("SELECT MAX(id) FROM segments").fetchone()[0] or 0) + 1
+            first_pid = (db.execute("SELECT MAX(id) FROM passages").fetchone()[0] or 0) + 1
+
+        texts, doc_rows, passage_rows, lengths = [], [], [], []
+        postings: Dict[str, List[Tuple[int, int]]] = {}
+        pid = first_pid
+        for source, title, text, mtime in batch:
+            doc_rows.append((source, title, mtime))
+            for passage in chunk_text(text):
+                tokens = tokenize(f"{title} {passage}" if title else passage)
+                for term, tf in Counter(tokens).items():
+                    postings.setdefault(term, []).append((pid, min(tf, 65535)))
+                passage_rows.append((pid, source, passage))
+                texts.append(passage)
+                lengths.append(len(tokens))
+                pid += 1
+
+        # Postings: one contiguous run per term, sorted by pid
+        term_rows, offset = [], 0
+        flat = np.zeros(sum(len(p) for p in postings.values()), dtype=POSTING_DTYPE)
+        for term in sorted(postings):
+            entries = postings[term]
+            flat[offset:offset + len(entries)] = entries
+            term_rows.append((term, seg_id, offset, len(entries)))
+            offset += len(entries)
+        flat.tofile(os.path.join(self.root, f"postings_{seg_id}.bin"))
+        np.save(os.path.join(self.root, f"lengths_{seg_id}.npy"), np.asarray(lengths, dtype=np.uint16))
+        vectors = self._encode(texts) if texts else None
+        if vectors is not None:
+            np.save(os.path.join(self.root, f"vectors_{seg_id}.npy"), vectors.astype(np.float16))
+
+        with self._lock:
+            db = self._db()
+            with db:
+                # Re-ingested documents: tombstone their old passages
+                stale = []
+                for source, _, _ in doc_rows:
+                    stale.extend(r[0] for r in db.execute(
+                        "SELECT p.id FROM passages p JOIN docs d ON p.doc_id = d.id WHERE d.source = ? AND p.deleted = 0",
+                        (source,),
+                    ))
+                db.executemany("UPDATE passages SET deleted = 1 WHERE id = ?", [(p,) for p in stale])
+                db.executemany(
+                    "INSERT INTO docs (source, title, mtime) VALUES (?, ?, ?) "
+                    "ON CONFLICT(source) DO UPDATE SET title = excluded.title, mtime = excluded.mtime",
+                    doc_rows,
+                )
+                doc_ids = dict(db.execute(
+                    f"SELECT source, id FROM docs WHERE source IN ({','.join('?' * len(doc_rows))})",
+                    [s for s, _, _ in doc_rows],
+                ))
+                db.executemany(
+                    "INSERT INTO passages (id, doc_id, text) VALUES (?, ?, ?)",
+                    [(p, doc_ids[s], t) for p, s, t in passage_rows],
+                )
+                db.executemany("INSERT INTO terms (term, segment, offset, count) VALUES (?, ?, ?, ?)", term_rows)
+                db.execute(
+                    "INSERT INTO segments (id, first_pid, count, vectors) VALUES (?, ?, ?, ?)",
+                    (seg_id, first_pid, len(passage_rows), int(vectors is not None)),
+                )
+                if checkpoint:
+                    self._save_checkpoint(db, checkpoint)
+            self._segments.append(_Segment(self.root, seg_id, first_pid, len(passage_rows), vectors is not None))
+            self._total_len += int(sum(lengths))
+            self._deleted.update(stale)
+
+        self.progress["indexed"] += len(batch)
+        elapsed = time.time() - self.progress["started"]
+        self.progress["docs_per_sec"] = round(self.progress["indexed"] / elapsed, 1) if elapsed else None
+        log.info(f"Local index: segment {seg_id} ({len(passage_rows)} passages), {self.progress['fraction']:.1%} done")
+        if on_progress:
+            on_progress(dict(self.progress))
+
+    @staticmethod
+    def _save_checkpoint(db: sqlite3.Connection, checkpoint: Tuple[str, int]):
+        db.execute(
+            "INSERT OR REPLACE INTO checkpoints (root, position, updated) VALUES (?, ?, ?)",
+            (*checkpoint, time.time()),
+        )
+
+    # ── Queries ──────────────────────────────────────
+    def _lexical(self, terms: List[str], limit: int) -> List[Tuple[int, float]]:
+        n = self.passage_count
+        avgdl = (self._total_len / n) if n else 1.0
+        with self._lock:
+            rows = self._db().execute(
+                f"SELECT term, segment, offset, count FROM terms WHERE term IN ({','.join('?' * len(terms))})", terms
+            ).fetchall()
+        df = Counter()
+        for term, _, _, count in rows:
+            df[term] += count
+        segments = {s.id: s for s in self._segments}
+        k1, b = 1.2, 0.75
+        pids, scores = [], []
+        for term, seg_id, offset, count in rows:
+            seg = segments.get(seg_id)
+            if seg is None:
+                continue
+            run = seg.postings[offset:offset + count]
+            tf = run["tf"].astype(np.float32)
+            dl = seg.lengths[run["pid"] - seg.first_pid].astype(np.float32)
+            idf = math.log(1 + (n - df[term] + 0.5) / (df[term] + 0.5))
+            pids.append(run["pid"])
+            scores.append(idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * dl / avgdl)))
+        if not pids:
+            return []
+        unique, inverse = np.unique(np.concatenate(pids), return_inverse=True)
+        totals = np.bincount(inverse, weights=np.concatenate(scores))
+        order = np.argsort(-totals)
+        return [(int(unique[i]), float(totals[i])) for i in order if int(unique[i]) not in self._deleted][:limit]
+
+    def _vector(self, query_vec: np.ndarray, limit: int) -> List[Tuple[int, float]]:
+        hits = []
+        for seg in self._segments:
+            if seg.vectors is None or not seg.count:
+                continue
+            # float16 on disk, scored in float32 blocks (numpy has no fast fp16 matmul)
+            sims = np.concatenate([
+                np.asarray(seg.vectors[i:i + VECTOR_BLOCK], dtype=np.float32) @ query_vec
+                for i in range(0, seg.count, VECTOR_BLOCK)
+            ])
+            top = np.argpartition(-sims, min(limit, len(sims) - 1))[:limit]
+            hits.extend((seg.first_pid + int(i), float(sims[i])) for i in top)
+        hits = [h for h in hits if h[0] not in self._deleted]
+        return sorted(hits, key=lambda h: h[1], reverse=True)[:limit]
+
+    def search(self, query: str, k: int = 5) -> List[Dict[str, Any]]:
+        """Hybrid BM25 + vector search; results fused by reciprocal rank."""
+        with self._lock:
+            self._db()
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not self._segments or not terms:
+            return []
+        self.stats["queries"] += 1
+        pool = k * 4
+
+        t0 = time.perf_counter()
+        lexical = self._lexical(terms, pool)
+        self.stats["lexical_ms"] = round((time.perf_counter() - t0) * 1000, 2)
+
+        vector = []
+        if any(s.vectors is not None for s in self._segments):
+            t0 = time.perf_counter()
+            query_vec = self._encode([query])
+            if query_vec is not None:
+                vector = self._vector(query_vec[0], pool)
+            self.stats["vector_ms"] = round((time.perf_counter() - t0) * 1000, 2)
+
+        fused = reciprocal_rank_fusion(
+            ([pid for pid, _ in lexical], [pid for pid, _ in vector]), settings.LOCAL_INDEX_RRF_K
+        )
+        lexical_scores, vector_scores = dict(lexical), dict(vector)
+        # A passage must share at least one query term or be a close semantic match
+        top = [
+            pid for pid in sorted(fused, key=fused.get, reverse=True)
+            if pid in lexical_scores or vector_scores.get(pid, 0) >= settings.LOCAL_INDEX_MIN_SIMILARITY
+        ][:k]
+        if not top:
+            return []
+
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT p.id, p.text, d.source, d.title FROM passages p JOIN docs d ON p.doc_id = d.id "
+                f"WHERE p.id IN ({','.join('?' * len(top))})", top,
+            ).fetchall()
+        by_id = {r[0]: r for r in rows}
+        hits = []
+        for pid in top:
+            if pid not in by_id:
+                continue
+            _, text, source, title = by_id[pid]
+            matched = set(terms) & set(tokenize(f"{title} {text}"))
+            hits.append({
+                "title": title, "snippet": text, "url": source,
+                "score": round(fused[pid], 5),
+                "coverage": round(len(matched) / len(terms), 3),   # Share of query terms present
+                "similarity": round(vector_scores[pid], 3) if pid in vector_scores else None,
+            })
+        return hits
+
+    @staticmethod
+    def is_confident(hit: Dict[str, Any]) -> bool:
+        """Whether a hit is good enough to answer without going to the web."""
+        return hit["coverage"] >= settings.LOCAL_INDEX_MIN_COVERAGE or (
+            (hit["similarity"] or 0) >= settings.LOCAL_INDEX_CONFIDENT_SIMILARITY
+        )
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            db = self._db()
+            docs = db.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+        return {
+            **self.stats,
+            "documents": docs,
+            "passages": self.passage_count - len(self._deleted),
+            "segments": len(self._segments),
+            "ingest": dict(self.progress),
+        }
+
+    def close(self):
+        with self._lock:
+            self._segments = []
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+local_index = LocalIndex()
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 3 or sys.argv[1] not in ("ingest", "search"):
+        print(__doc__)
+        sys.exit(1)
+    if sys.argv[1] == "ingest":
+        for target in sys.argv[2:]:
+            local_index.ingest(target, on_progress=lambda p: print(
+                f"\r{p['path']}: {p['fraction']:.1%} ({p['indexed']} docs, {p.get('docs_per_sec')}/s)", end=""
+            ))
+            print()
+    else:
+        for hit in local_index.search(" ".join(sys.argv[2:])):
+            print(f"[{hit['score']}] {hit['title']} — {hit['url']}\n    {hit['snippet'][:200]}")
@@ -0,0 +1,329 @@
+"""
+Media Cache — Local proxy storage for third-party images and videos
+────────────────────────────────────────────────────────────────────
+Each remote asset is downloaded once (single-flight) into a size-bounded
+disk LRU, and resized WebP/JPEG variants are generated on demand for the
+viewer's width. Agents rewrite result URLs to /api/media so every
+dashboard shares the same cached copy. Videos are streamed through
+(Range requests passed on) instead of being cached first.
+
+Every hop of a fetch, redirects included, must resolve to a public address.
+"""
+
+import asyncio
+import hashlib
+import io
+import ipaddress
+import os
+import time
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+from urllib.parse import quote, urlsplit
+
+import httpx
+
+from app.config import settings
+from services.http_service import http_service
+from utils.logger import log
+
+try:
+    from PIL import Image
+    HAS_PIL = True
+except ImportError:
+    HAS_PIL = False
+
+# Widths are snapped to these buckets so the number of variants stays bounded
+WIDTH_BUCKETS = (160, 320, 640, 960, 1280, 1920)
+
+MEDIA_TYPES = {"webp": "image/webp", "jpeg": "image/jpeg"}
+
+# Only raster images, video and audio are proxied: anything that a browser
+# could render as a document (HTML, SVG, XML…) would run on the API origin
+SAFE_MEDIA_PREFIXES = ("image/", "video/", "audio/")
+UNSAFE_MEDIA_TYPES = {"image/svg+xml"}
+
+
+class MediaError(Exception):
+    """Raised when an asset can't be proxied (bad URL, too large, upstream error)."""
+
+    def __init__(self, message: str, status_code: int = 502):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def snap_width(width: Optional[int]) -> Optional[int]:
+    if not width:
+        return None
+    for bucket in WIDTH_BUCKETS:
+        if width <= bucket:
+            return bucket
+    return WIDTH_BUCKETS[-1]
+
+
+def proxy_url(url: str, width: int = None) -> str:
+    """Public /api/media URL for a remote asset."""
+    if not url or not settings.MEDIA_PROXY_ENABLED:
+        return url
+    proxied = f"{settings.MEDIA_PUBLIC_BASE}/api/media?url={quote(url, safe='')}"
+    if width:
+        proxied += f"&w={snap_width(width)}"
+    return proxied
+
+
+def proxy_media(result: Dict) -> Dict:
+    """Point image/video URLs in an agent result at the local proxy (originals kept)."""
+    if not settings.MEDIA_PROXY_ENABLED or result.get("status") != "success":
+        return result
+    for item in [result, *result.get("all_images", []), *result.get("all_videos", [])]:
+        if item.get("image_url"):
+            item["original_url"] = item["image_url"]
+            item["image_url"] = proxy_url(item["image_url"], settings.MEDIA_IMAGE_WIDTH)
+        if item.get("thumbnail"):
+            item["thumbnail"] = proxy_url(item["thumbnail"], settings.MEDIA_THUMB_WIDTH)
+        if item.get("video_url"):
+            item["original_video_url"] = item["video_url"]
+            item["video_url"] = proxy_url(item["video_url"]) + "&fmt=original"
+    return result
+
+
+class MediaCache:
+    def __init__(self, root: str = None, max_bytes: int = None):
+        self.root = root or settings.MEDIA_CACHE_DIR
+        self.max_bytes = max_bytes or settings.MEDIA_CACHE_MAX_BYTES
+        self._index: Dict[str, Tuple[int, float]] = {}   # filename → (size, last access)
+        self._bytes = 0
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._content_types: Dict[str, str] = {}   # Originals carry no extension
+        self.oversized = set()                       # URLs known to exceed MEDIA_MAX_ASSET_BYTES
+        self._loaded = False
+        self.stats = {"hits": 0, "fetches": 0, "variants": 0, "evictions": 0, "errors": 0, "streams": 0}
+
+    # ── Disk LRU ─────────────────────────────────────
+    def _load(self):
+        if self._loaded:
+            return
+        os.makedirs(self.root, exist_ok=True)
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if os.path.isfile(path) and not name.endswith(".part"):
+                st = os.stat(path)
+                self._index[name] = (st.st_size, st.st_mtime)
+                self._bytes += st.st_size
+        self._loaded = True
+        log.info(f"Media cache ready: {len(self._index)} files, {self._bytes / 1e6:.1f} MB")
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.root, name)
+
+    def _touch(self, name: str):
+        size, _ = self._index[name]
+        now = time.time()
+        self._index[name] = (size, now)
+        try:
+            os.utime(self._path(name), (now, now))
+        except OSError:
+            pass
+
+    def _lookup(self, name: str) -> Optional[str]:
+        self._load()
+        if name in self._index and os.path.exists(self._path(name)):
+            self._touch(name)
+            return self._path(name)
+        self._index.pop(name, None)
+        return None
+
+    def _store(self, name: str, data: bytes) -> str:
+        self._load()
+        path = self._path(name)
+        tmp = path + ".part"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        old = self._index.get(name)
+        if old:
+            self._bytes -= old[0]
+        self._index[name] = (len(data), time.time())
+        self._bytes += len(data)
+        self._evict()
+        return path
+
+    def _evict(self):
+        if self._bytes <= self.max_bytes:
+            return
+        for name, (size, _) in sorted(self._index.items(), key=lambda kv: kv[1][1]):
+            if self._bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(self._path(name))
+            except OSError:
+                pass
+            del self._index[name]
+            self._bytes -= size
+            self.stats["evictions"] += 1
+
+    def _lock(self, name: str) -> asyncio.Lock:
+        lock = self._locks.get(name)
+        if lock is None:
+            lock = self._locks[name] = asyncio.Lock()
+        return lock
+
+    # ── Fetching ─────────────────────────────────────
+    @staticmethod
+    def key(url: str) -> str:
+        return hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+    async def check_url(self, url: str):
+        """Reject non-http(s) URLs and hosts resolving to non-public addresses.
+
+        Resolution goes through the same DNS cache (same host/port key) the
+        connection pool uses, so the checked address is the one connected to.
+        """
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise MediaError("Only http(s) URLs can be proxied", 400)
+        try:
+            port = parts.port or (443 if parts.scheme == "https" else 80)
+            address = ipaddress.ip_address(await http_service.dns.resolve(parts.hostname, port))
+        except (OSError, ValueError):
+            raise MediaError("Could not resolve media host", 502)
+        if address.version == 6 and address.ipv4_mapped:
+            address = address.ipv4_mapped
+        if not address.is_global or address.is_multicast:
+            raise MediaError("Media host not allowed", 403)
+
+    async def original(self, url: str) -> Tuple[str, str]:
+        """Path and content type of the cached original, downloading it once."""
+        name = self.key(url)
+        async with self._lock(name):
+            path = self._lookup(name)
+            if path:
+                self.stats["hits"] += 1
+                return path, self._content_type(name)
+            if url in self.oversized:
+                raise MediaError("Asset too large to cache", 413)
+            self.stats["fetches"] += 1
+            try:
+                resp, data, truncated = await http_service.get_capped(
+                    url, settings.MEDIA_MAX_ASSET_BYTES, check=self.check_url, timeout=settings.MEDIA_FETCH_TIMEOUT
+                )
+            except MediaError:
+                self.stats["errors"] += 1
+                raise
+            except Exception as e:
+                self.stats["errors"] += 1
+                raise MediaError(f"Upstream fetch failed: {e}")
+            if truncated:
+                self.oversized.add(url)
+                raise MediaError("Asset too large to cache", 413)
+            content_type = resp.headers.get("content-type", "application/octet-stream").split(";")[0]
+            if not is_safe_type(content_type):
+                self.stats["errors"] += 1
+                raise MediaError(f"Unsupported media type: {content_type}", 415)
+            self._content_types[name] = content_type
+            return self._store(name, data), content_type
+
+    def cached_original(self, url: str) -> Optional[Tuple[str, str]]:
+        """Path and content type of the original if it is already on disk."""
+        name = self.key(url)
+        path = self._lookup(name)
+        return (path, self._content_type(name)) if path else None
+
+    async def open_stream(self, url: str, byte_range: str = None) -> httpx.Response:
+        """
+        Upstream response for an asset streamed through without caching
+        (videos: playback starts with the first bytes, seeking sends Range).
+        The caller must `await resp.aclose()`.
+        """
+        headers = {"Range": byte_range} if byte_range else {}
+        try:
+            resp = await http_service.open(
+                "GET", url, check=self.check_url, headers=headers, timeout=settings.MEDIA_FETCH_TIMEOUT
+            )
+        except MediaError:
+            self.stats["errors"] += 1
+            raise
+        except Exception as e:
+            self.stats["errors"] += 1
+            raise MediaError(f"Upstream fetch failed: {e}")
+        if resp.status_code >= 400 and resp.status_code != 416:
+            await resp.aclose()
+            self.stats["errors"] += 1
+            raise MediaError(f"Upstream returned {resp.status_code}")
+        content_type = resp.headers.get("content-type", "")
+        if resp.status_code != 416 and not is_safe_type(content_type):
+            await resp.aclose()
+            self.stats["errors"] += 1
+            raise MediaError(f"Unsupported media type: {content_type or 'unknown'}", 415)
+        self.stats["streams"] += 1
+        return resp
+
+    async def variant(self, url: str, width: int = None, fmt: str = "webp") -> Tuple[str, str]:
+        """Path and content type of a resized image variant (original if not an image)."""
+        path, content_type = await self.original(url)
+        width = snap_width(width)
+        if not HAS_PIL or not content_type.startswith("image/") or fmt not in MEDIA_TYPES:
+            return path, content_type
+
+        name = f"{self.key(url)}_{width or 'full'}.{fmt}"
+        try:
+            variant_path = await self.derived(name, lambda: asyncio.to_thread(self._resize, path, width, fmt))
+        except Exception as e:
+            log.warning(f"Media resize failed for {url}: {e}")
+            return path, content_type
+        return variant_path, MEDIA_TYPES[fmt]
+
+    async def derived(self, name: str, produce: Callable[[], Awaitable[bytes]]) -> str:
+        """Cached file derived from an asset (variant, preview…), produced once."""
+        async with self._lock(name):
+            cached = self._lookup(name)
+            if cached:
+                self.stats["hits"] += 1
+                return cached
+            data = await produce()
+            self.stats["variants"] += 1
+            return self._store(name, data)
+
+    @staticmethod
+    def _resize(path: str, width: Optional[int], fmt: str) -> bytes:
+        with Image.open(path) as img:
+            img = img.convert("RGB")
+            if width and img.width > width:
+                img.thumbnail((width, width * 4))
+            out = io.BytesIO()
+            if fmt == "webp":
+                img.save(out, "WEBP", quality=settings.MEDIA_QUALITY, method=4)
+            else:
+                img.save(out, "JPEG", quality=settings.MEDIA_QUALITY, optimize=True, progressive=True)
+            return out.getvalue()
+
+    def _content_type(self, name: str) -> str:
+        return self._content_types.get(name) or _sniff_type(self._path(name))
+
+    def metrics(self) -> Dict[str, float]:
+        self._load()
+        return {**self.stats, "files": len(self._index), "bytes": self._bytes, "max_bytes": self.max_bytes}
+
+
+def is_safe_type(content_type: str) -> bool:
+    """True for raster image, video and audio types the browser won't execute."""
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    return content_type.startswith(SAFE_MEDIA_PREFIXES) and content_type not in UNSAFE_MEDIA_TYPES
+
+
+def _sniff_type(path: str) -> str:
+    """Best-effort content type from magic bytes (used after a restart)."""
+    with open(path, "rb") as f:
+        head = f.read(12)
+    if head.startswith(b"\xff\xd8"):
+        return "image/jpeg"
+    if head.startswith(b"\x89PNG"):
+        return "image/png"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return "image/gif"
+    if head[4:8] == b"ftyp":
+        return "video/mp4"
+    return "application/octet-stream"
+
+
+media_cache = MediaCache()
@@ -0,0 +1,132 @@
+"""
+Memory Lexicon — BM25 inverted index over long-term memories
+─────────────────────────────────────────────────────────────
+Kept alongside the vector collection (updated on every add), so exact names,
+file paths and codes that embeddings blur ("config.py", "INV-2024-113") are
+still recalled. Backed by SQLite FTS5; query terms are matched as quoted
+phrases, so "config.py" must appear as config·py, not just either word.
+Stopwords are dropped from queries, so "what is the weather" can't match
+every memory containing "is".
+
+Filterable columns mirror the memory metadata: client_id, source, created.
+"""
+
+import os
+import re
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.config import settings
+from utils.logger import log
+
+
+STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from has have how i in is it its me my of on or "
+    "that the this to was we were what when where which who why will with you your".split()
+)
+
+
+def _fts_query(text: str) -> str:
+    """OR of quoted phrases, one per whitespace-separated query term (stopwords dropped)."""
+    terms = [
+        t.replace('"', '""') for t in text.split()
+        if re.search(r"\w", t) and t.lower().strip("?!.,'\"") not in STOPWORDS
+    ]
+    return " OR ".join(f'"{t}"' for t in terms)
+
+
+class MemoryLexicon:
+    def __init__(self, path: str = None):
+        self.path = path or settings.MEMORY_LEXICON_PATH
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.available = True
+
+    def _db(self) -> Optional[sqlite3.Connection]:
+        if self._conn is None and self.available:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            try:
+                conn.execute(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS memories USING fts5("
+                    " text, doc_id UNINDEXED, client_id UNINDEXED, source UNINDEXED, created UNINDEXED)"
+                )
+                conn.commit()
+            except sqlite3.OperationalError as e:
+                log.warning(f"SQLite FTS5 unavailable — lexical memory recall disabled: {e}")
+                conn.close()
+                self.available = False
+                return None
+            self._conn = conn
+        return self._conn
+
+    def add(self, rows: Iterable[Tuple[str, str, Dict[str, Any]]]):
+        """Index (doc_id, text, metadata) rows in one transaction."""
+        data = [
+            (text, doc_id, (meta or {}).get("client_id"), (meta or {}).get("source"), (meta or {}).get("created"))
+            for doc_id, text, meta in rows
+        ]
+        with self._lock:
+            db = self._db()
+            if db is None or not data:
+                return
+            with db:
+                db.executemany(
+                    "INSERT INTO memories (text, doc_id, client_id, source, created) VALUES (?, ?, ?, ?, ?)", data
+                )
+
+    def delete(self, doc_ids: List[str]):
+        with self._lock:
+            db = self._db()
+            if db is None or not doc_ids:
+                return
+            with db:
+                db.executemany("DELETE FROM memories WHERE doc_id = ?", [(d,) for d in doc_ids])
+
+    def search(self, query: str, n_results: int = 10, filters: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """Hits ({id, document, metadata, score}) best first; higher score is better."""
+        match = _fts_query(query or "")
+        with self._lock:
+            db = self._db()
+            if db is None or not match:
+                return []
+            clauses, params = ["memories MATCH ?"], [match]
+            filters = filters or {}
+            for column in ("client_id", "source"):
+                if filters.get(column) is not None:
+                    clauses.append(f"{column} = ?")
+                    params.append(filters[column])
+            if filters.get("since") is not None:
+                clauses.append("created >= ?")
+                params.append(filters["since"])
+            if filters.get("until") is not None:
+                clauses.append("created <= ?")
+                params.append(filters["until"])
+            rows = db.execute(
+                f"SELECT doc_id, text, client_id, source, created, bm25(memories) FROM memories "
+                f"WHERE {' AND '.join(clauses)} ORDER BY bm25(memories) LIMIT ?",
+                [*params, n_results],
+            ).fetchall()
+        # FTS5's bm25() is negative (lower = better); flip it for callers
+        return [
+            {
+                "id": doc_id, "document": text, "score": -score,
+                "metadata": {k: v for k, v in (("client_id", client), ("source", source), ("created", created)) if v is not None},
+            }
+            for doc_id, text, client, source, created, score in rows
+        ]
+
+    def count(self) -> int:
+        with self._lock:
+            db = self._db()
+            return db.execute("SELECT COUNT(*) FROM memories").fetchone()[0] if db else 0
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+memory_lexicon = MemoryLexicon()
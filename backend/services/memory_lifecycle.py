@@ -0,0 +1,156 @@
+"""
+Memory Lifecycle — Background compaction of long-term memory
+─────────────────────────────────────────────────────────────
+Runs every MEMORY_COMPACT_INTERVAL seconds:
+
+  1. Evict memories past their expires_at (per-memory TTL)
+  2. Stale, low-importance memories (not seen for MEMORY_STALE_AFTER,
+     importance < MEMORY_KEEP_IMPORTANCE) are summarised per client/source
+     into one memory when a summarizer is registered, else evicted; a
+     group whose summary fails is kept for the next run, and a lone memory
+     with nothing to fold into is kept unless explicitly unimportant
+  3. Reclaim tombstoned rows in backends that keep them (quantized index)
+  4. Record index size so growth can be tracked over time
+"""
+
+import asyncio
+import time
+from collections import defaultdict, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set
+
+from app.config import settings
+from services.vector_service import VectorService, vector_service
+from utils.logger import log
+
+Summarizer = Callable[[List[str]], Awaitable[str]]
+
+
+class MemoryCompactor:
+    def __init__(self, vectors: VectorService = None):
+        self.vectors = vectors or vector_service
+        self.running = False
+        self._summarizer: Optional[Summarizer] = None
+        self.history: Deque[Dict[str, Any]] = deque(maxlen=settings.MEMORY_SIZE_HISTORY)
+        self.stats = {"runs": 0, "expired": 0, "evicted": 0, "kept": 0, "summarised": 0, "reclaimed": 0, "last_run_ms": 0.0}
+
+    def set_summarizer(self, summarizer: Summarizer):
+        """Register the LLM call used to fold stale memories together."""
+        self._summarizer = summarizer
+
+    async def start(self):
+        self.running = True
+        log.info("Starting Memory Compactor...")
+        while self.running:
+            try:
+                await self.compact()
+            except Exception as e:
+                log.error(f"Error in MemoryCompactor: {e}")
+            await asyncio.sleep(settings.MEMORY_COMPACT_INTERVAL)
+
+    def stop(self):
+        self.running = False
+
+    async def compact(self) -> Dict[str, Any]:
+        start = time.perf_counter()
+        backend = self.vectors.backend
+        now = time.time()
+
+        # 1. Expired
+        expired = await asyncio.to_thread(backend.get, {"$and": [
+            {"expires_at": {"$gt": 0}},   # 0 = made permanent by a merge
+            {"expires_at": {"$lte": now}},
+        ]})
+        await asyncio.to_thread(self.vectors.delete, expired["ids"])
+        self.stats["expired"] += len(expired["ids"])
+
+        # 2. Stale + unimportant
+        stale = await asyncio.to_thread(backend.get, {"$and": [
+            {"last_seen": {"$lt": now - settings.MEMORY_STALE_AFTER}},
+            {"importance": {"$lt": settings.MEMORY_KEEP_IMPORTANCE}},
+        ]}, settings.MEMORY_COMPACT_BATCH)
+        evict: List[str] = []
+        if stale["ids"]:
+            kept = await self._summarise(stale) if self._summarizer else set()
+            evict = [doc_id for i, doc_id in enumerate(stale["ids"]) if i not in kept]
+            await asyncio.to_thread(self.vectors.delete, evict)
+            self.stats["evicted"] += len(evict)
+            self.stats["kept"] += len(kept)
+
+        # 3. Tombstones
+        if hasattr(backend, "compact"):
+            metrics = backend.metrics()
+            if metrics.get("tombstones", 0) > settings.MEMORY_TOMBSTONE_RATIO * max(1, metrics.get("vectors", 0)):
+                self.stats["reclaimed"] += await asyncio.to_thread(backend.compact)
+
+        # 4. Size over time
+        self.history.append({"time": round(now), **await asyncio.to_thread(self.vectors.metrics)})
+        self.stats["runs"] += 1
+        self.stats["last_run_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        if expired["ids"] or stale["ids"]:
+            log.info(
+                f"Memory compaction: {len(expired['ids'])} expired, {len(evict)}/{len(stale['ids'])} stale evicted, "
+                f"{self.history[-1].get('vectors')} remaining"
+            )
+        return dict(self.stats)
+
+    async def _summarise(self, stale: Dict[str, List[Any]]) -> Set[int]:
+        """Fold stale memories into one summary memory per (client, source) group.
+
+        Returns the indices to keep: chunks whose summary failed (e.g. the LLM
+        is down) are retried next run instead of being evicted unsummarised.
+        A memory alone in its group is folded with the client's other lone
+        memories; one with nothing to fold into is kept unless its importance
+        was explicitly set below the default.
+        """
+        keep: Set[int] = set()
+        groups: Dict[tuple, List[int]] = defaultdict(list)
+        for i, meta in enumerate(stale["metadatas"]):
+            meta = meta or {}
+            groups[(meta.get("client_id"), meta.get("source"))].append(i)
+
+        size = settings.MEMORY_SUMMARY_GROUP
+        loose: Dict[Any, List[int]] = defaultdict(list)
+        chunks = []
+        for (client_id, source), members in groups.items():
+            if len(members) < 2:
+                loose[client_id].extend(members)
+                continue
+            split = [members[i:i + size] for i in range(0, len(members), size)]
+            if len(split[-1]) < 2:
+                split[-2].extend(split.pop())   # Never leave one memory on its own
+            chunks.extend((client_id, source, chunk) for chunk in split)
+        for client_id, members in loose.items():
+            if len(members) > 1:
+                chunks.append((client_id, None, members))
+                continue
+            meta = stale["metadatas"][members[0]] or {}
+            if meta.get("importance", settings.MEMORY_DEFAULT_IMPORTANCE) >= settings.MEMORY_DEFAULT_IMPORTANCE:
+                keep.update(members)
+
+        summaries = []
+        for client_id, source, chunk in chunks:
+            try:
+                text = (await self._summarizer([stale["documents"][i] for i in chunk])).strip()
+            except Exception as e:
+                log.warning(f"Memory summary failed, keeping {len(chunk)} memories for the next run: {e}")
+                text = ""
+            if not text:
+                keep.update(chunk)
+                continue
+            meta = {"source": "memory_summary", "summarised": len(chunk),
+                    "importance": max((stale["metadatas"][i] or {}).get("importance", 0) for i in chunk)}
+            if client_id is not None:
+                meta["client_id"] = client_id
+            if source is not None:
+                meta["summarised_source"] = source
+            summaries.append((text, meta))
+        if summaries:
+            await self.vectors.add_memories(summaries)
+            self.stats["summarised"] += len(summaries)
+        return keep
+
+    def metrics(self) -> Dict[str, Any]:
+        return {**self.stats, "history": list(self.history)}
+
+
+memory_compactor = MemoryCompactor()
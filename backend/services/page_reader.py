@@ -0,0 +1,177 @@
+"""
+Page Reader — Concurrent page fetch + passage ranking for deep search
+──────────────────────────────────────────────────────────────────────
+Fetches the top search hits over the shared HTTP pool with per-page byte
+and time caps, extracts readable text with a streaming HTML parser (fed
+chunk by chunk as the body arrives), and ranks passages against the query
+with the shared MiniLM embedding service. Only the best few hundred tokens
+are handed to the briefing.
+"""
+
+import asyncio
+import re
+from html.parser import HTMLParser
+from typing import Any, Dict, List
+
+from app.config import settings
+from services.embedding_service import embedding_service
+from services.http_service import HttpService, http_service
+from services.session_service import estimate_tokens
+from utils.deadline import current_deadline
+from utils.logger import log
+
+# Content that is never part of the readable body
+SKIP_TAGS = {"script", "style", "noscript", "svg", "nav", "header", "footer", "aside", "form", "button", "iframe"}
+BLOCK_TAGS = {
+    "p", "div", "section", "article", "main", "li", "ul", "ol", "br", "tr", "td", "th",
+    "h1", "h2", "h3", "h4", "h5", "h6", "blockquote", "pre", "dd", "dt", "figcaption",
+}
+
+
+class ReadableTextParser(HTMLParser):
+    """Streaming HTML → text blocks; boilerplate containers are skipped."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.blocks: List[str] = []
+        self._current: List[str] = []
+        self._skip_depth = 0
+
+    def _flush(self):
+        text = " ".join("".join(self._current).split())
+        if text:
+            self.blocks.append(text)
+        self._current = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in BLOCK_TAGS:
+            self._flush()
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag in BLOCK_TAGS:
+            self._flush()
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in BLOCK_TAGS:
+            self._flush()
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self._current.append(data)
+
+    def text_blocks(self) -> List[str]:
+        self._flush()
+        return self.blocks
+
+
+def split_passages(blocks: List[str], words: int = None) -> List[str]:
+    """Merge short blocks and split long ones into ~`words`-word passages."""
+    words = words or settings.SEARCH_DEEP_PASSAGE_WORDS
+    passages, buf = [], []
+    for block in blocks:
+        tokens = block.split()
+        if len(tokens) < 4 and not buf:
+            continue   # Menu items, captions, stray labels
+        buf.extend(tokens)
+        while len(buf) >= words:
+            passages.append(" ".join(buf[:words]))
+            buf = buf[words:]
+    if len(buf) >= 8:
+        passages.append(" ".join(buf))
+    return passages
+
+
+class PageReader:
+    def __init__(self, http: HttpService = None):
+        self.http = http or http_service
+        self.stats = {"pages": 0, "failed": 0, "truncated": 0, "bytes": 0}
+
+    # ── Fetching ─────────────────────────────────────
+    async def read(self, url: str, parser: ReadableTextParser) -> List[str]:
+        """Feed one page into `parser` as it arrives, stopping at the byte cap."""
+        received = 0
+        async with self.http.stream("GET", url, timeout=settings.SEARCH_DEEP_PAGE_TIMEOUT) as resp:
+            resp.raise_for_status()
+            content_type = resp.headers.get("content-type", "")
+            if "html" not in content_type and not content_type.startswith("text/"):
+                return []
+            async for chunk in resp.aiter_text():
+                parser.feed(chunk)
+                received += len(chunk)
+                if received >= settings.SEARCH_DEEP_MAX_BYTES:
+                    self.stats["truncated"] += 1
+                    break
+        self.stats["bytes"] += received
+        return parser.text_blocks()
+
+    async def _read_capped(self, url: str) -> List[str]:
+        deadline = current_deadline()
+        parser = ReadableTextParser()
+        try:
+            blocks = await asyncio.wait_for(
+                self.read(url, parser), deadline.timeout(settings.SEARCH_DEEP_PAGE_TIMEOUT)
+            )
+            self.stats["pages"] += 1
+            return blocks
+        except asyncio.TimeoutError:
+            # Keep whatever was parsed before the cap
+            deadline.cut("PageReader.page")
+            self.stats["truncated"] += 1
+            return parser.text_blocks()
+        except Exception as e:
+            log.debug(f"Deep search fetch failed for {url}: {e}")
+        self.stats["failed"] += 1
+        return []
+
+    # ── Ranking ──────────────────────────────────────
+    async def rank(self, query: str, passages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Passages sorted by cosine similarity to the query (lexical overlap fallback)."""
+        if not passages:
+            return []
+        try:
+            vectors = await embedding_service.embed_many([query] + [p["text"] for p in passages])
+            scores = vectors[1:] @ vectors[0]
+        except Exception as e:
+            log.warning(f"Embedding ranking unavailable, using term overlap: {e}")
+            terms = set(re.findall(r"\w+", query.lower()))
+            scores = [
+                len(terms & set(re.findall(r"\w+", p["text"].lower()))) / (len(terms) or 1)
+                for p in passages
+            ]
+        for passage, score in zip(passages, scores):
+            passage["score"] = round(float(score), 4)
+        return sorted(passages, key=lambda p: p["score"], reverse=True)
+
+    async def best_passages(self, query: str, hits: List[Dict[str, str]], max_tokens: int = None) -> List[Dict[str, Any]]:
+        """Fetch `hits` concurrently and return the top passages within `max_tokens`."""
+        max_tokens = max_tokens or settings.SEARCH_DEEP_TOKENS
+        hits = [h for h in hits if h.get("url")][: settings.SEARCH_DEEP_PAGES]
+        pages = await asyncio.gather(*(self._read_capped(h["url"]) for h in hits))
+
+        passages = [
+            {"url": hit["url"], "title": hit.get("title", ""), "text": text}
+            for hit, blocks in zip(hits, pages)
+            for text in split_passages(blocks)
+        ]
+        ranked = await self.rank(query, passages)
+
+        chosen, used = [], 0
+        for passage in ranked:
+            cost = estimate_tokens(passage["text"])
+            if used + cost > max_tokens:
+                continue
+            chosen.append(passage)
+            used += cost
+            if max_tokens - used < 20:
+                break
+        return chosen
+
+    def metrics(self) -> Dict[str, int]:
+        return dict(self.stats)
+
+
+page_reader = PageReader()
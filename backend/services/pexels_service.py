@@ -0,0 +1,193 @@
+"""
+Pexels Service — Shared, quota-aware Pexels API client
+───────────────────────────────────────────────────────
+One client for ImageAgent and VideoAgent:
+
+  • Token bucket sized to the plan's hourly limit (PEXELS_RATE_PER_HOUR)
+  • Quota tracking from X-Ratelimit-* response headers
+  • Persistent response cache (SQLite), so repeats cost no quota
+  • Fast-fail (PexelsUnavailable) when the budget is exhausted, so callers
+    can skip straight to alternate sources instead of waiting on a 429
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from app.config import settings
+from services.http_service import HttpService, http_service
+from utils.logger import log
+
+
+class PexelsUnavailable(Exception):
+    """Pexels can't be called right now (no key, quota exhausted, upstream error)."""
+
+
+class TokenBucket:
+    def __init__(self, rate_per_sec: float, capacity: float):
+        self.rate = rate_per_sec
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def peek(self) -> float:
+        self._refill()
+        return self.tokens
+
+    def take(self) -> bool:
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+class _ResponseStore:
+    """SQLite-backed response cache keyed on endpoint + params."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS pexels_cache (key TEXT PRIMARY KEY, body TEXT, stored REAL)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def get(self, key: str, ttl: float) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db().execute("SELECT body, stored FROM pexels_cache WHERE key = ?", (key,)).fetchone()
+        if row is None or time.time() - row[1] > ttl:
+            return None
+        return json.loads(row[0])
+
+    def put(self, key: str, body: Dict[str, Any]):
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "INSERT OR REPLACE INTO pexels_cache (key, body, stored) VALUES (?, ?, ?)",
+                (key, json.dumps(body), time.time()),
+            )
+            db.commit()
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class PexelsService:
+    PHOTO_SEARCH_URL = "https://api.pexels.com/v1/search"
+    VIDEO_SEARCH_URL = "https://api.pexels.com/videos/search"
+
+    def __init__(self, http: HttpService = None, api_key: str = None):
+        self.http = http or http_service
+        self.api_key = api_key if api_key is not None else settings.PEXELS_API_KEY
+        self.bucket = TokenBucket(settings.PEXELS_RATE_PER_HOUR / 3600.0, settings.PEXELS_BURST)
+        self.store = _ResponseStore(settings.PEXELS_CACHE_PATH)
+        # Quota as last reported by Pexels
+        self.quota_limit: Optional[int] = None
+        self.quota_remaining: Optional[int] = None
+        self.quota_reset: Optional[float] = None   # Unix timestamp
+        self.blocked_until = 0.0                   # Set on 429
+        self.stats = {"calls": 0, "cache_hits": 0, "fast_fails": 0, "errors": 0}
+        if self.api_key:
+            log.info("Pexels service initialized (shared by Image/Video agents).")
+
+    # ── Budget ───────────────────────────────────────
+    @property
+    def available(self) -> bool:
+        """Cheap check for callers deciding whether to try Pexels at all."""
+        if not self.api_key:
+            return False
+        now = time.time()
+        if now < self.blocked_until:
+            return False
+        if self.quota_remaining is not None and self.quota_remaining <= settings.PEXELS_QUOTA_RESERVE:
+            if self.quota_reset is None or now < self.quota_reset:
+                return False
+        return self.bucket.peek() >= 1
+
+    def _update_quota(self, headers):
+        try:
+            if "X-Ratelimit-Limit" in headers:
+                self.quota_limit = int(headers["X-Ratelimit-Limit"])
+            if "X-Ratelimit-Remaining" in headers:
+                self.quota_remaining = int(headers["X-Ratelimit-Remaining"])
+            if "X-Ratelimit-Reset" in headers:
+                self.quota_reset = float(headers["X-Ratelimit-Reset"])
+        except (TypeError, ValueError):
+            pass
+
+    # ── Requests ─────────────────────────────────────
+    async def _get(self, url: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        key = f"{url}?{json.dumps(params, sort_keys=True)}"
+        cached = self.store.get(key, settings.PEXELS_CACHE_TTL)
+        if cached is not None:
+            self.stats["cache_hits"] += 1
+            return cached
+
+        if not self.api_key:
+            self.stats["fast_fails"] += 1
+            raise PexelsUnavailable("Pexels API key not configured")
+        if not self.available or not self.bucket.take():
+            self.stats["fast_fails"] += 1
+            raise PexelsUnavailable("Pexels budget exhausted")
+
+        self.stats["calls"] += 1
+        try:
+            resp = await self.http.get(url, params=params, headers={"Authorization": self.api_key})
+        except Exception as e:
+            self.stats["errors"] += 1
+            raise PexelsUnavailable(f"Pexels request failed: {e}")
+        self._update_quota(resp.headers)
+
+        if resp.status_code == 429:
+            # Back off until the reported reset (or an hour if unknown)
+            self.blocked_until = self.quota_reset or (time.time() + 3600)
+            self.stats["errors"] += 1
+            raise PexelsUnavailable("Pexels rate limit reached")
+        if resp.status_code >= 400:
+            self.stats["errors"] += 1
+            raise PexelsUnavailable(f"Pexels returned HTTP {resp.status_code}")
+
+        body = resp.json()
+        self.store.put(key, body)
+        return body
+
+    async def search_photos(self, query: str, per_page: int = 5, page: int = 1) -> Dict[str, Any]:
+        return await self._get(self.PHOTO_SEARCH_URL, {"query": query, "page": page, "per_page": per_page})
+
+    async def search_videos(self, query: str, per_page: int = 5, page: int = 1) -> Dict[str, Any]:
+        return await self._get(self.VIDEO_SEARCH_URL, {"query": query, "page": page, "per_page": per_page})
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "available": self.available,
+            "tokens": round(self.bucket.peek(), 2),
+            "quota_limit": self.quota_limit,
+            "quota_remaining": self.quota_remaining,
+            "quota_reset": self.quota_reset,
+        }
+
+    def close(self):
+        self.store.close()
+
+
+pexels_service = PexelsService()
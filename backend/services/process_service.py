@@ -0,0 +1,308 @@
+"""
+Process Service — Async subprocesses with streaming output and a process table
+───────────────────────────────────────────────────────────────────────────────
+Commands run via asyncio subprocesses (never blocking the event loop):
+
+  • stdout/stderr are read concurrently in chunks and split into lines; each
+    line goes to the current output sink (the requesting WebSocket client)
+  • each stream keeps at most PROC_MAX_OUTPUT_BYTES; the rest is drained
+    and counted but dropped, and the result is marked truncated
+  • on timeout or cancel: SIGTERM to the process group, then SIGKILL after
+    PROC_KILL_GRACE seconds
+
+Loops that can't spawn subprocesses (asyncio raises NotImplementedError,
+e.g. a SelectorEventLoop on Windows) fall back to subprocess.Popen with
+pipe-reader threads feeding the same StreamReaders, so supervision, caps
+and kills behave identically.
+
+Running and recently finished processes are listed in the process table
+(/api/processes) and can be cancelled by id.
+"""
+
+import asyncio
+import os
+import signal
+import subprocess
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Sequence, Union
+
+from app.config import settings
+from utils.logger import log
+
+# (process_id, stream, line) → sent to whoever asked for the command
+OutputSink = Callable[[str, str, str], Awaitable[None]]
+
+_output_sink: ContextVar[Optional[OutputSink]] = ContextVar("output_sink", default=None)
+
+
+def current_output_sink() -> Optional[OutputSink]:
+    return _output_sink.get()
+
+
+@contextmanager
+def use_output_sink(sink: Optional[OutputSink]):
+    """Route output of processes started in this context to `sink`."""
+    token = _output_sink.set(sink)
+    try:
+        yield
+    finally:
+        _output_sink.reset(token)
+
+
+@dataclass
+class ManagedProcess:
+    id: str
+    command: str
+    pid: Optional[int] = None
+    started: float = field(default_factory=time.time)
+    ended: Optional[float] = None
+    status: str = "running"          # running | exited | timeout | cancelled | failed
+    returncode: Optional[int] = None
+    output: Dict[str, bytearray] = field(default_factory=lambda: {"stdout": bytearray(), "stderr": bytearray()})
+    total_bytes: Dict[str, int] = field(default_factory=lambda: {"stdout": 0, "stderr": 0})
+    proc: Any = None
+    task: Optional[asyncio.Task] = None
+
+    @property
+    def truncated(self) -> bool:
+        return any(self.total_bytes[s] > len(self.output[s]) for s in self.output)
+
+    def text(self, stream: str) -> str:
+        data = self.output[stream].decode("utf-8", errors="replace")
+        if self.total_bytes[stream] > len(self.output[stream]):
+            data += f"\n… [{self.total_bytes[stream] - len(self.output[stream])} more bytes truncated]"
+        return data
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "command": self.command,
+            "pid": self.pid,
+            "status": self.status,
+            "returncode": self.returncode,
+            "started": round(self.started, 3),
+            "runtime_s": round((self.ended or time.time()) - self.started, 2),
+            "stdout_bytes": self.total_bytes["stdout"],
+            "stderr_bytes": self.total_bytes["stderr"],
+            "truncated": self.truncated,
+        }
+
+
+class _ThreadedProcess:
+    """subprocess.Popen behind the subset of asyncio.subprocess.Process used here."""
+
+    def __init__(self, popen: subprocess.Popen, loop: asyncio.AbstractEventLoop):
+        self._popen = popen
+        self.pid = popen.pid
+        self.stdout = asyncio.StreamReader()
+        self.stderr = asyncio.StreamReader()
+        for pipe, reader in ((popen.stdout, self.stdout), (popen.stderr, self.stderr)):
+            threading.Thread(target=self._feed, args=(pipe, reader, loop), name=f"proc-{self.pid}", daemon=True).start()
+
+    @staticmethod
+    def _feed(pipe, reader: asyncio.StreamReader, loop: asyncio.AbstractEventLoop):
+        try:
+            while True:
+                chunk = pipe.read1(settings.PROC_READ_CHUNK)
+                if not chunk:
+                    break
+                loop.call_soon_threadsafe(reader.feed_data, chunk)
+        except (OSError, ValueError):
+            pass   # Pipe closed under us (process killed)
+        finally:
+            pipe.close()
+            try:
+                loop.call_soon_threadsafe(reader.feed_eof)
+            except RuntimeError:
+                pass   # Loop already closed at shutdown
+
+    @property
+    def returncode(self) -> Optional[int]:
+        return self._popen.poll()
+
+    async def wait(self) -> int:
+        return await asyncio.to_thread(self._popen.wait)
+
+    def terminate(self):
+        self._popen.terminate()
+
+    def kill(self):
+        self._popen.kill()
+
+
+class ProcessService:
+    def __init__(self):
+        self.running: Dict[str, ManagedProcess] = {}
+        self.finished: Deque[ManagedProcess] = deque(maxlen=settings.PROC_HISTORY)
+        self.threaded = False   # Set once the loop turned out not to support subprocesses
+
+    # ── Starting ─────────────────────────────────────
+    async def start(
+        self, command: Union[str, Sequence[str]], timeout: float = None, sink: OutputSink = None
+    ) -> ManagedProcess:
+        """Start a command (str → shell, sequence → exec) and supervise it in the background."""
+        shown = command if isinstance(command, str) else " ".join(command)
+        mp = ManagedProcess(id=uuid.uuid4().hex[:8], command=shown)
+        posix = os.name == "posix"
+        kwargs = dict(stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        if posix:
+            kwargs["start_new_session"] = True   # Own process group, so kills reach children too
+        mp.proc = await self._spawn(command, kwargs)
+        mp.pid = mp.proc.pid
+        self.running[mp.id] = mp
+        sink = sink or current_output_sink()
+        mp.task = asyncio.create_task(self._supervise(mp, timeout or settings.PROC_TIMEOUT, sink))
+        log.info(f"[process {mp.id}] pid={mp.pid}: {shown[:80]}")
+        return mp
+
+    async def _spawn(self, command: Union[str, Sequence[str]], kwargs: Dict[str, Any]):
+        if not self.threaded:
+            try:
+                if isinstance(command, str):
+                    return await asyncio.create_subprocess_shell(command, **kwargs)
+                return await asyncio.create_subprocess_exec(*command, **kwargs)
+            except NotImplementedError:
+                self.threaded = True
+                log.warning("Event loop can't spawn subprocesses; using threaded Popen fallback")
+        loop = asyncio.get_running_loop()
+        popen = await asyncio.to_thread(subprocess.Popen, command, shell=isinstance(command, str), **kwargs)
+        return _ThreadedProcess(popen, loop)
+
+    async def run(
+        self, command: Union[str, Sequence[str]], timeout: float = None, sink: OutputSink = None,
+        wait: float = None,
+    ) -> ManagedProcess:
+        """Start a command and wait for it to finish (or be killed).
+
+        With `wait`, return after that many seconds even if it is still
+        running (status "running"); it carries on under its own timeout.
+        """
+        mp = await self.start(command, timeout, sink)
+        try:
+            await asyncio.wait_for(asyncio.shield(mp.task), wait)
+        except asyncio.TimeoutError:
+            pass
+        return mp
+
+    # ── Supervision ──────────────────────────────────
+    async def _pump(self, mp: ManagedProcess, stream: str, reader: asyncio.StreamReader, sink: Optional[OutputSink]):
+        cap = settings.PROC_MAX_OUTPUT_BYTES
+        pending = b""
+        while True:
+            chunk = await reader.read(settings.PROC_READ_CHUNK)
+            if not chunk:
+                break
+            mp.total_bytes[stream] += len(chunk)
+            keep = chunk[: max(0, cap - len(mp.output[stream]))]
+            if not keep:
+                continue   # Past the cap: keep draining so the pipe never blocks
+            mp.output[stream] += keep
+            if sink is None:
+                continue
+            pending += keep
+            *lines, pending = pending.split(b"\n")
+            for line in lines:
+                await self._emit(sink, mp, stream, line)
+        if pending and sink is not None:
+            await self._emit(sink, mp, stream, pending)
+
+    @staticmethod
+    async def _emit(sink: OutputSink, mp: ManagedProcess, stream: str, line: bytes):
+        try:
+            await sink(mp.id, stream, line.decode("utf-8", errors="replace").rstrip("\r"))
+        except Exception as e:
+            log.debug(f"[process {mp.id}] output sink failed: {e}")
+
+    async def _supervise(self, mp: ManagedProcess, timeout: float, sink: Optional[OutputSink]):
+        pumps = asyncio.gather(
+            self._pump(mp, "stdout", mp.proc.stdout, sink),
+            self._pump(mp, "stderr", mp.proc.stderr, sink),
+        )
+
+        async def finish() -> int:
+            # The timeout covers both: a child can close its pipes and keep running
+            await asyncio.shield(pumps)
+            return await mp.proc.wait()
+
+        try:
+            mp.returncode = await asyncio.wait_for(finish(), timeout=timeout)
+            if mp.status == "running":
+                mp.status = "exited"
+        except asyncio.TimeoutError:
+            mp.status = "timeout"
+            await self._terminate(mp)
+        except asyncio.CancelledError:
+            if mp.status == "running":
+                mp.status = "cancelled"
+            await self._terminate(mp)
+        except Exception as e:
+            mp.status = "failed"
+            log.error(f"[process {mp.id}] supervision failed: {e}")
+            await self._terminate(mp)
+        finally:
+            pumps.cancel()
+            mp.ended = time.time()
+            self.running.pop(mp.id, None)
+            self.finished.append(mp)
+            log.info(f"[process {mp.id}] {mp.status} (rc={mp.returncode}) after {mp.ended - mp.started:.1f}s")
+
+    async def _terminate(self, mp: ManagedProcess):
+        """SIGTERM, then SIGKILL after PROC_KILL_GRACE (whole process group on POSIX)."""
+        proc = mp.proc
+        if proc.returncode is not None:
+            mp.returncode = proc.returncode
+            return
+        for sig, grace in ((signal.SIGTERM, settings.PROC_KILL_GRACE), (getattr(signal, "SIGKILL", None), 5.0)):
+            try:
+                if os.name == "posix":
+                    os.killpg(proc.pid, sig)
+                elif sig == signal.SIGTERM:
+                    proc.terminate()
+                else:
+                    proc.kill()
+            except ProcessLookupError:
+                break
+            try:
+                mp.returncode = await asyncio.wait_for(proc.wait(), timeout=grace)
+                return
+            except asyncio.TimeoutError:
+                log.warning(f"[process {mp.id}] did not exit after signal {sig}, escalating")
+        mp.returncode = proc.returncode
+
+    # ── Process table ────────────────────────────────
+    def get(self, process_id: str) -> Optional[ManagedProcess]:
+        return self.running.get(process_id) or next((p for p in self.finished if p.id == process_id), None)
+
+    def list(self) -> List[Dict[str, Any]]:
+        return [p.as_dict() for p in self.running.values()] + [p.as_dict() for p in reversed(self.finished)]
+
+    async def cancel(self, process_id: str) -> bool:
+        mp = self.running.get(process_id)
+        if mp is None:
+            return False
+        mp.status = "cancelled"
+        mp.task.cancel()
+        try:
+            await mp.task
+        except asyncio.CancelledError:
+            pass
+        return True
+
+    async def shutdown(self):
+        for process_id in list(self.running):
+            await self.cancel(process_id)
+
+    def metrics(self) -> Dict[str, Any]:
+        statuses: Dict[str, int] = {}
+        for p in self.finished:
+            statuses[p.status] = statuses.get(p.status, 0) + 1
+        return {"running": len(self.running), "recent": statuses, "threaded": self.threaded}
+
+
+process_service = ProcessService()
@@ -0,0 +1,448 @@
+"""
+Quantized Index — In-process int8 vector store (alternative to ChromaDB)
+─────────────────────────────────────────────────────────────────────────
+For memory-sized collections (tens of thousands of entries) this avoids
+Chroma's startup cost and RSS:
+
+  vectors.i8      int8 matrix (capacity × dim), memory-mapped
+  scales.f4       per-row dequantization scale, memory-mapped
+  meta.sqlite3    id, document, metadata JSON, tombstone — the side table
+  ivf.npz         optional IVF centroids + row assignments
+
+Vectors are quantized symmetrically per row (v ≈ q · scale); queries stay
+float32, so scores are (q_rows @ query) · scale — one vectorised pass per
+block. Exact search scans every row; IVF probes the closest clusters once
+the collection is large enough to benefit. Clustering runs on a background
+thread; queries use exact search (or the previous clusters) meanwhile.
+
+Results use Chroma's query() shape so VectorService callers don't change.
+
+Rebuild from the existing Chroma store:
+  python -m services.quantized_index rebuild [<chroma path>]
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.config import settings
+from utils.logger import log
+
+BLOCK_ROWS = 65536
+
+_OPERATORS = {"$eq": "=", "$ne": "!=", "$gt": ">", "$gte": ">=", "$lt": "<", "$lte": "<="}
+_LIST_OPERATORS = {"$in": "IN", "$nin": "NOT IN"}
+
+
+def where_sql(where: Dict[str, Any]):
+    """Translate a Chroma-style `where` (field ops incl. $in/$nin, $and/$or) into SQL over the metadata JSON.
+
+    Raises ValueError for operators Chroma doesn't define either.
+    """
+    if "$and" in where or "$or" in where:
+        joiner = " AND " if "$and" in where else " OR "
+        parts = [where_sql(w) for w in where.get("$and") or where.get("$or")]
+        return "(" + joiner.join(p[0] for p in parts) + ")", [v for p in parts for v in p[1]]
+    clauses, params = [], []
+    for field, condition in where.items():
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+        for op, value in condition.items():
+            if op in _OPERATORS:
+                clauses.append(f"json_extract(metadata, ?) {_OPERATORS[op]} ?")
+                params.extend([f"$.{field}", value])
+            elif op in _LIST_OPERATORS:
+                if not isinstance(value, (list, tuple)):
+                    raise ValueError(f"{op} on '{field}' needs a list, got {type(value).__name__}")
+                if not value:
+                    clauses.append("0" if op == "$in" else "1")
+                    continue
+                clauses.append(f"json_extract(metadata, ?) {_LIST_OPERATORS[op]} ({','.join('?' * len(value))})")
+                params.extend([f"$.{field}", *value])
+            else:
+                raise ValueError(f"Unsupported where operator '{op}' on '{field}'")
+    return "(" + " AND ".join(clauses) + ")", params
+
+
+def quantize(vectors: np.ndarray):
+    """(int8 rows, float32 scales) with v ≈ q * scale."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    q = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return q, scales.astype(np.float32)
+
+
+def kmeans(data: np.ndarray, k: int, iters: int = 10, seed: int = 0) -> np.ndarray:
+    """Plain Lloyd's k-means on normalized vectors (spherical: cosine assignment)."""
+    rng = np.random.default_rng(seed)
+    centroids = data[rng.choice(len(data), size=k, replace=False)].copy()
+    for _ in range(iters):
+        assign = np.argmax(data @ centroids.T, axis=1)
+        for c in range(k):
+            members = data[assign == c]
+            if len(members):
+                centroid = members.mean(axis=0)
+                centroids[c] = centroid / (np.linalg.norm(centroid) or 1.0)
+    return centroids
+
+
+class QuantizedIndex:
+    def __init__(self, root: str = None, dim: int = None):
+        self.root = root or settings.QUANT_INDEX_DIR
+        self.dim = dim
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._vectors: Optional[np.memmap] = None
+        self._scales: Optional[np.memmap] = None
+        self._rows = 0                       # Rows written (including tombstoned)
+        self._deleted = np.zeros(0, dtype=bool)
+        self._centroids: Optional[np.ndarray] = None
+        self._assign: Optional[np.ndarray] = None
+        self._trained_rows = 0
+        self._generation = 0                 # Bumped when row numbers change (compact)
+        self._trainer: Optional[threading.Thread] = None
+
+    # ── Storage ──────────────────────────────────────
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(self.root, exist_ok=True)
+            self._conn = sqlite3.connect(os.path.join(self.root, "meta.sqlite3"), check_same_thread=False)
+            self._conn.executescript(
+                "PRAGMA journal_mode=WAL;"
+                "CREATE TABLE IF NOT EXISTS rows (row INTEGER PRIMARY KEY, id TEXT UNIQUE, document TEXT,"
+                " metadata TEXT, deleted INTEGER DEFAULT 0);"
+                "CREATE TABLE IF NOT EXISTS info (key TEXT PRIMARY KEY, value TEXT);"
+            )
+            self._open()
+        return self._conn
+
+    def _open(self):
+        info = dict(self._conn.execute("SELECT key, value FROM info"))
+        if "dim" in info:
+            self.dim = int(info["dim"])
+        self._rows = (self._conn.execute("SELECT MAX(row) FROM rows").fetchone()[0] or -1) + 1
+        self._deleted = np.zeros(self._rows, dtype=bool)
+        for (row,) in self._conn.execute("SELECT row FROM rows WHERE deleted = 1"):
+            self._deleted[row] = True
+        if self.dim and self._rows:
+            self._map(self._capacity_on_disk())
+        ivf_path = os.path.join(self.root, "ivf.npz")
+        if os.path.exists(ivf_path):
+            ivf = np.load(ivf_path)
+            self._centroids, self._assign = ivf["centroids"], ivf["assign"]
+            self._trained_rows = len(self._assign)
+        log.info(f"Quantized index opened: {self.count()} vectors (dim={self.dim})")
+
+    def _capacity_on_disk(self) -> int:
+        path = os.path.join(self.root, "vectors.i8")
+        return os.path.getsize(path) // self.dim if os.path.exists(path) else 0
+
+    def _map(self, capacity: int):
+        """(Re)map the matrix files at `capacity` rows, growing them if needed."""
+        for name, width in (("vectors.i8", self.dim), ("scales.f4", 4)):
+            path = os.path.join(self.root, name)
+            with open(path, "ab") as f:
+                f.truncate(max(os.path.getsize(path), capacity * width))
+        self._vectors = np.memmap(os.path.join(self.root, "vectors.i8"), dtype=np.int8, mode="r+",
+                                  shape=(capacity, self.dim))
+        self._scales = np.memmap(os.path.join(self.root, "scales.f4"), dtype=np.float32, mode="r+",
+                                 shape=(capacity,))
+
+    def _ensure_capacity(self, rows: int):
+        capacity = 0 if self._vectors is None else self._vectors.shape[0]
+        if rows > capacity:
+            if self._vectors is not None:
+                self._vectors.flush()
+                self._scales.flush()
+            self._map(max(rows, capacity * 2, 1024))
+
+    # ── Writes ───────────────────────────────────────
+    def add(self, ids: List[str], embeddings, documents: List[str], metadatas: List[Optional[Dict]] = None):
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        metadatas = metadatas or [None] * len(ids)
+        with self._lock:
+            db = self._db()
+            if self.dim is None:
+                self.dim = embeddings.shape[1]
+                db.execute("INSERT OR REPLACE INTO info (key, value) VALUES ('dim', ?)", (str(self.dim),))
+            # Re-adding an id replaces it
+            self.delete(ids)
+            start = self._rows
+            self._ensure_capacity(start + len(ids))
+            q, scales = quantize(embeddings)
+            self._vectors[start:start + len(ids)] = q
+            self._scales[start:start + len(ids)] = scales
+            self._vectors.flush()
+            self._scales.flush()
+            with db:
+                db.executemany(
+                    "INSERT OR REPLACE INTO rows (row, id, document, metadata) VALUES (?, ?, ?, ?)",
+                    [(start + i, id_, doc, json.dumps(meta) if meta else None)
+                     for i, (id_, doc, meta) in enumerate(zip(ids, documents, metadatas))],
+                )
+            self._rows = start + len(ids)
+            self._deleted = np.concatenate([self._deleted, np.zeros(len(ids), dtype=bool)])
+
+    def delete(self, ids: List[str]):
+        with self._lock:
+            db = self._db()
+            rows = [r[0] for r in db.execute(
+                f"SELECT row FROM rows WHERE deleted = 0 AND id IN ({','.join('?' * len(ids))})", list(ids)
+            )] if ids else []
+            if not rows:
+                return
+            with db:
+                # Free the id for re-use; the matrix row stays as a tombstone
+                db.executemany("UPDATE rows SET deleted = 1, id = NULL WHERE row = ?", [(r,) for r in rows])
+            self._deleted[rows] = True
+
+    def update(self, ids: List[str], metadatas: List[Optional[Dict]]):
+        """Replace metadata for existing ids (vectors and documents unchanged)."""
+        with self._lock:
+            db = self._db()
+            with db:
+                db.executemany(
+                    "UPDATE rows SET metadata = ? WHERE id = ? AND deleted = 0",
+                    [(json.dumps(meta) if meta else None, id_) for id_, meta in zip(ids, metadatas)],
+                )
+
+    def get(self, where: Dict[str, Any] = None, limit: int = None) -> Dict[str, List[Any]]:
+        """Chroma-compatible get(): live rows matching a metadata filter."""
+        sql, params = where_sql(where) if where else ("1", [])
+        with self._lock:
+            rows = self._db().execute(
+                f"SELECT id, document, metadata FROM rows WHERE deleted = 0 AND {sql} ORDER BY row LIMIT ?",
+                [*params, limit or -1],
+            ).fetchall()
+        return {
+            "ids": [r[0] for r in rows],
+            "documents": [r[1] for r in rows],
+            "metadatas": [json.loads(r[2]) if r[2] else None for r in rows],
+        }
+
+    def compact(self) -> int:
+        """Rewrite the matrix without tombstoned rows; returns rows reclaimed."""
+        with self._lock:
+            db = self._db()
+            live = np.flatnonzero(~self._deleted[:self._rows])
+            reclaimed = self._rows - len(live)
+            if not reclaimed:
+                return 0
+            vectors = np.array(self._vectors[live]) if len(live) else np.zeros((0, self.dim), np.int8)
+            scales = np.array(self._scales[live]) if len(live) else np.zeros(0, np.float32)
+            kept = db.execute("SELECT id, document, metadata FROM rows WHERE deleted = 0 ORDER BY row").fetchall()
+            self._vectors = self._scales = None
+            for name, data in (("vectors.i8", vectors), ("scales.f4", scales)):
+                tmp = os.path.join(self.root, name + ".tmp")
+                data.tofile(tmp)
+                os.replace(tmp, os.path.join(self.root, name))
+            with db:
+                db.execute("DELETE FROM rows")
+                db.executemany(
+                    "INSERT INTO rows (row, id, document, metadata) VALUES (?, ?, ?, ?)",
+                    [(i, *row) for i, row in enumerate(kept)],
+                )
+            self._rows = len(live)
+            self._deleted = np.zeros(self._rows, dtype=bool)
+            if self._rows:
+                self._map(self._rows)
+            # Row numbers changed: IVF assignments are retrained on next use
+            self._generation += 1
+            self._centroids = self._assign = None
+            self._trained_rows = 0
+            ivf_path = os.path.join(self.root, "ivf.npz")
+            if os.path.exists(ivf_path):
+                os.remove(ivf_path)
+            log.info(f"Quantized index compacted: {reclaimed} tombstones reclaimed, {self._rows} rows kept")
+            return reclaimed
+
+    def count(self) -> int:
+        with self._lock:
+            self._db()
+            return int(self._rows - self._deleted.sum())
+
+    # ── IVF ──────────────────────────────────────────
+    def train(self, nlist: int = None):
+        """Cluster current vectors for IVF search (cheap enough to redo as it grows).
+
+        Only the snapshot is taken under the lock; k-means runs without it,
+        so queries and writes continue while it trains.
+        """
+        with self._lock:
+            self._db()
+            n = self._rows
+            if n == 0:
+                return
+            generation = self._generation
+            data = self._dequantized(0, n)
+            live = ~self._deleted[:n]
+        nlist = nlist or max(1, int(np.sqrt(n)))
+        centroids = kmeans(data[live] if live.sum() >= nlist else data, nlist)
+        assign = np.concatenate([
+            np.argmax(data[i:i + BLOCK_ROWS] @ centroids.T, axis=1) for i in range(0, n, BLOCK_ROWS)
+        ]).astype(np.int32)
+        with self._lock:
+            if generation != self._generation:
+                return   # Compacted meanwhile: these row numbers are stale
+            np.savez(os.path.join(self.root, "ivf.npz"), centroids=centroids, assign=assign)
+            self._centroids, self._assign, self._trained_rows = centroids, assign, n
+        log.info(f"Quantized index: trained IVF with {nlist} lists over {n} rows")
+
+    def _train_in_background(self):
+        if self._trainer is not None and self._trainer.is_alive():
+            return
+        self._trainer = threading.Thread(target=self._train_safely, name="ivf-train", daemon=True)
+        self._trainer.start()
+
+    def _train_safely(self):
+        try:
+            self.train()
+        except Exception as e:
+            log.error(f"Quantized index: IVF training failed: {e}")
+
+    def _dequantized(self, start: int, stop: int) -> np.ndarray:
+        return np.asarray(self._vectors[start:stop], dtype=np.float32) * self._scales[start:stop, None]
+
+    def _use_ivf(self) -> bool:
+        mode = settings.QUANT_SEARCH
+        if mode == "exact":
+            return False
+        if self._rows < settings.QUANT_IVF_MIN_ROWS and mode != "ivf":
+            return False
+        if self._centroids is None or self._rows > 2 * self._trained_rows:
+            # Never train inside a query; use exact search or the old clusters until it's done
+            self._train_in_background()
+        return self._centroids is not None
+
+    # ── Search ───────────────────────────────────────
+    def _scores_exact(self, query: np.ndarray) -> np.ndarray:
+        return np.concatenate([
+            (np.asarray(self._vectors[i:min(self._rows, i + BLOCK_ROWS)], dtype=np.float32) @ query)
+            * self._scales[i:min(self._rows, i + BLOCK_ROWS)]
+            for i in range(0, self._rows, BLOCK_ROWS)
+        ])
+
+    def _candidates_ivf(self, query: np.ndarray) -> np.ndarray:
+        probes = np.argsort(-(self._centroids @ query))[: settings.QUANT_IVF_NPROBE]
+        rows = np.flatnonzero(np.isin(self._assign, probes))
+        # Rows added since training haven't been assigned yet: always scan them
+        return np.concatenate([rows, np.arange(self._trained_rows, self._rows)])
+
+    def search(self, query: np.ndarray, k: int, allowed: np.ndarray = None):
+        """Top-k (rows, scores) for one normalized float query vector."""
+        query = np.asarray(query, dtype=np.float32)
+        if self._use_ivf():
+            rows = self._candidates_ivf(query)
+            scores = (np.asarray(self._vectors[rows], dtype=np.float32) @ query) * self._scales[rows]
+        else:
+            rows = np.arange(self._rows)
+            scores = self._scores_exact(query)
+        mask = ~self._deleted[rows]
+        if allowed is not None:
+            mask &= allowed[rows]
+        rows, scores = rows[mask], scores[mask]
+        if len(rows) > k:
+            top = np.argpartition(-scores, k)[:k]
+            rows, scores = rows[top], scores[top]
+        order = np.argsort(-scores)
+        return rows[order], scores[order]
+
+    def _allowed(self, where: Dict[str, Any]) -> np.ndarray:
+        """Row mask for a metadata pre-filter (applied before top-k)."""
+        sql, params = where_sql(where)
+        mask = np.zeros(self._rows, dtype=bool)
+        rows = [r[0] for r in self._conn.execute(f"SELECT row FROM rows WHERE deleted = 0 AND {sql}", params)]
+        mask[rows] = True
+        return mask
+
+    def query(self, query_embeddings, n_results: int = 3, where: Dict[str, Any] = None) -> Dict[str, List[List[Any]]]:
+        """Chroma-compatible query: ids/documents/metadatas/distances per query."""
+        out = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        with self._lock:
+            db = self._db()
+            allowed = self._allowed(where) if where and self._rows else None
+            for vector in np.asarray(query_embeddings, dtype=np.float32):
+                rows, scores = self.search(vector, n_results, allowed) if self._rows else (np.zeros(0, int), np.zeros(0))
+                found = {r[0]: r for r in db.execute(
+                    f"SELECT row, id, document, metadata FROM rows WHERE row IN ({','.join('?' * len(rows))})",
+                    [int(r) for r in rows],
+                )} if len(rows) else {}
+                hits = [(found[int(r)], float(s)) for r, s in zip(rows, scores) if int(r) in found]
+                out["ids"].append([h[0][1] for h in hits])
+                out["documents"].append([h[0][2] for h in hits])
+                out["metadatas"].append([json.loads(h[0][3]) if h[0][3] else None for h in hits])
+                out["distances"].append([round(1.0 - s, 6) for _, s in hits])   # Cosine distance
+        return out
+
+    def iter_documents(self, page: int = 1000):
+        """(ids, documents, metadatas) pages of live rows."""
+        last = -1
+        while True:
+            with self._lock:
+                rows = self._db().execute(
+                    "SELECT row, id, document, metadata FROM rows WHERE deleted = 0 AND row > ? ORDER BY row LIMIT ?",
+                    (last, page),
+                ).fetchall()
+            if not rows:
+                return
+            last = rows[-1][0]
+            yield [r[1] for r in rows], [r[2] for r in rows], [json.loads(r[3]) if r[3] else None for r in rows]
+
+    # ── Migration ────────────────────────────────────
+    def rebuild_from_chroma(self, chroma_path: str = None, collection: str = "jarvis_memory", page: int = 1000) -> int:
+        """Copy every vector out of a Chroma collection (existing rows are replaced by id)."""
+        import chromadb
+        source = chromadb.PersistentClient(path=str(chroma_path or settings.CHROMA_DB_PATH)) \
+            .get_or_create_collection(name=collection)
+        copied, offset = 0, 0
+        while True:
+            batch = source.get(include=["embeddings", "documents", "metadatas"], limit=page, offset=offset)
+            if not batch["ids"]:
+                break
+            self.add(batch["ids"], batch["embeddings"], batch["documents"], batch["metadatas"])
+            copied += len(batch["ids"])
+            offset += page
+        log.info(f"Quantized index: rebuilt {copied} vectors from Chroma")
+        return copied
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            self._db()
+            disk = sum(
+                os.path.getsize(os.path.join(self.root, f))
+                for f in os.listdir(self.root) if os.path.isfile(os.path.join(self.root, f))
+            )
+            return {
+                "vectors": self.count(),
+                "tombstones": int(self._deleted.sum()),
+                "dim": self.dim,
+                "ivf_lists": 0 if self._centroids is None else len(self._centroids),
+                "disk_bytes": disk,
+            }
+
+    def close(self):
+        with self._lock:
+            if self._vectors is not None:
+                self._vectors.flush()
+                self._scales.flush()
+            self._vectors = self._scales = None
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2 or sys.argv[1] != "rebuild":
+        print(__doc__)
+        sys.exit(1)
+    index = QuantizedIndex()
+    index.rebuild_from_chroma(sys.argv[2] if len(sys.argv) > 2 else None)
+    print(index.metrics())
+    index.close()
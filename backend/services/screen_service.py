@@ -0,0 +1,347 @@
+"""
+Screen Service — Screen capture with tile-level change detection
+────────────────────────────────────────────────────────────────
+Grabs the screen (mss; works on X11 and Xvfb through $DISPLAY, falling back
+to Pillow's ImageGrab) and splits each frame into SCREEN_TILE_SIZE tiles.
+
+Per frame:
+  1. One vectorised diff against the previous frame (green channel,
+     subsampled by SCREEN_DIFF_STRIDE) gives a mean change per tile;
+     tiles above SCREEN_DIFF_THRESHOLD are dirty
+  2. Dirty tiles are merged into rectangles (at most SCREEN_REGION_TILES
+     tiles per side by default; OCR uses full-width bands of
+     SCREEN_OCR_BAND_TILES rows, padded by SCREEN_OCR_MARGIN, so lines
+     and words aren't cut at region edges)
+  3. Registered analyzers (OCR by default) run only on those rectangles;
+     each result is remembered on the tiles it covered and reused until
+     one of them changes. A step can be given a time budget: regions it
+     doesn't reach stay pending and are analysed by the next step
+
+A static screen therefore costs one grab and one diff per frame, with no
+analysis at all. The watcher loop (SCREEN_WATCH_ENABLED) keeps the
+analysis current in the background; VisionAgent can also step it on demand.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from app.config import settings
+from utils.logger import log
+
+try:
+    import mss
+    HAS_MSS = True
+except ImportError:
+    HAS_MSS = False
+
+try:
+    from PIL import ImageGrab
+    HAS_IMAGEGRAB = True
+except ImportError:
+    HAS_IMAGEGRAB = False
+
+try:
+    import pytesseract
+    HAS_TESSERACT = True
+except ImportError:
+    HAS_TESSERACT = False
+
+Rect = Tuple[int, int, int, int]                 # x, y, w, h in pixels
+Analyzer = Callable[[np.ndarray, Rect], Any]     # (BGR crop, rect) → result
+
+
+class ScreenUnavailable(Exception):
+    pass
+
+
+class ScreenCapture:
+    def __init__(self, monitor: int = None):
+        self.monitor = settings.SCREEN_MONITOR if monitor is None else monitor
+        self._local = threading.local()   # mss handles are per thread
+
+    @property
+    def available(self) -> bool:
+        return HAS_MSS or HAS_IMAGEGRAB
+
+    def grab(self) -> np.ndarray:
+        """Current screen as a BGR uint8 array."""
+        if HAS_MSS:
+            sct = getattr(self._local, "sct", None)
+            if sct is None:
+                sct = self._local.sct = mss.mss()
+            shot = sct.grab(sct.monitors[min(self.monitor, len(sct.monitors) - 1)])
+            return np.asarray(shot)[:, :, :3]   # BGRA → BGR view
+        if HAS_IMAGEGRAB:
+            return np.asarray(ImageGrab.grab().convert("RGB"))[:, :, ::-1]
+        raise ScreenUnavailable("No screen capture backend (install mss)")
+
+
+def _sample_positions(size: int, tile: int, stride: int) -> np.ndarray:
+    """Every `stride`-th pixel, plus the last one if the edge tile would get no sample."""
+    positions = np.arange(0, size, stride)
+    if (size - 1) // tile != positions[-1] // tile:
+        positions = np.append(positions, size - 1)
+    return positions
+
+
+def tile_changes(previous: np.ndarray, current: np.ndarray, tile: int, stride: int) -> np.ndarray:
+    """Mean absolute change per tile (rows × cols), on the subsampled green channel.
+
+    The grid is always ceil(height / tile) × ceil(width / tile) pixel tiles;
+    each subsampled pixel is binned by its real coordinate, so strides that
+    don't divide the tile size still line up with dirty_rects, and a narrow
+    edge tile the stride would skip is sampled at its last pixel.
+    """
+    stride = max(1, min(stride, tile))
+    rows, cols = -(-previous.shape[0] // tile), -(-previous.shape[1] // tile)
+    if tile % stride == 0:
+        # Every tile starts on a sampled pixel: strided views and a reshape
+        a = previous[::stride, ::stride, 1].astype(np.int16)
+        b = current[::stride, ::stride, 1].astype(np.int16)
+        diff = np.abs(b - a, dtype=np.int16)
+        row_tiles = np.arange(diff.shape[0]) * stride // tile
+        col_tiles = np.arange(diff.shape[1]) * stride // tile
+        step = tile // stride
+        padded = np.zeros((rows * step, cols * step), dtype=np.int32)
+        padded[: diff.shape[0], : diff.shape[1]] = diff
+        sums = padded.reshape(rows, step, cols, step).sum(axis=(1, 3))
+    else:
+        ys = _sample_positions(previous.shape[0], tile, stride)
+        xs = _sample_positions(previous.shape[1], tile, stride)
+        a = previous[ys[:, None], xs, 1].astype(np.int16)
+        b = current[ys[:, None], xs, 1].astype(np.int16)
+        diff = np.abs(b - a, dtype=np.int16)
+        row_tiles, col_tiles = ys // tile, xs // tile
+        cells = (row_tiles[:, None] * cols + col_tiles[None, :]).ravel()
+        sums = np.bincount(cells, weights=diff.ravel(), minlength=rows * cols).reshape(rows, cols)
+    counts = np.outer(np.bincount(row_tiles, minlength=rows), np.bincount(col_tiles, minlength=cols))
+    return sums / np.maximum(counts, 1)
+
+
+def dirty_rects(
+    mask: np.ndarray, tile: int, shape: Tuple[int, int], block: Union[int, Tuple[int, int]] = 4
+) -> List[Tuple[Rect, List[Tuple[int, int]]]]:
+    """Merge dirty tiles into rectangles: runs per row, stacked while the span matches.
+
+    Rectangles never cross aligned `block`×`block` tile blocks (or
+    rows×cols for a tuple; 0 = no limit on that axis), so one small change
+    never invalidates (and re-analyses) a screen-sized region.
+    Returns (pixel rect, covered tiles) pairs, clipped to the frame.
+    """
+    block_rows, block_cols = block if isinstance(block, tuple) else (block, block)
+    block_rows = block_rows if block_rows > 0 else mask.shape[0] + 1
+    block_cols = block_cols if block_cols > 0 else mask.shape[1] + 1
+    open_rects: Dict[Tuple[int, int], List[int]] = {}   # (c0, c1) → [r0, r1]
+    merged: List[Tuple[int, int, int, int]] = []         # r0, r1, c0, c1 (inclusive)
+    for r in range(mask.shape[0]):
+        runs, c = [], 0
+        while c < mask.shape[1]:
+            if mask[r, c]:
+                start = c
+                while c + 1 < mask.shape[1] and mask[r, c + 1] and (c + 1) % block_cols:
+                    c += 1
+                runs.append((start, c))
+            c += 1
+        for span in list(open_rects):
+            if span not in runs or r % block_rows == 0:
+                r0, r1 = open_rects.pop(span)
+                merged.append((r0, r1, *span))
+        for span in runs:
+            if span in open_rects:   # Still open: same span, same block row
+                open_rects[span][1] = r
+            else:
+                open_rects[span] = [r, r]
+    merged.extend((r0, r1, *span) for span, (r0, r1) in open_rects.items())
+
+    height, width = shape
+    result = []
+    for r0, r1, c0, c1 in merged:
+        x, y = c0 * tile, r0 * tile
+        rect = (x, y, min((c1 + 1) * tile, width) - x, min((r1 + 1) * tile, height) - y)
+        result.append((rect, [(r, c) for r in range(r0, r1 + 1) for c in range(c0, c1 + 1)]))
+    return result
+
+
+def ocr_analyzer(crop: np.ndarray, rect: Rect) -> str:
+    return pytesseract.image_to_string(crop[:, :, ::-1]).strip()
+
+
+class ScreenWatcher:
+    def __init__(self, capture: ScreenCapture = None):
+        self.capture = capture or ScreenCapture()
+        self.tile = settings.SCREEN_TILE_SIZE
+        self.analyzers: Dict[str, Analyzer] = {}
+        self._regions: Dict[str, Tuple[Any, int]] = {}   # Analyzer → (dirty_rects block, margin px)
+        if settings.SCREEN_OCR_ENABLED and HAS_TESSERACT:
+            self.analyzers["ocr"] = ocr_analyzer
+            self._regions["ocr"] = ((settings.SCREEN_OCR_BAND_TILES, 0), settings.SCREEN_OCR_MARGIN)
+
+        self._lock = threading.Lock()
+        self._previous: Optional[np.ndarray] = None
+        self.frame: Optional[np.ndarray] = None
+        # Per analyzer: tile grid of result ids (-1 = not analysed) and id → (rect, result)
+        self._tile_ids: Dict[str, np.ndarray] = {}
+        self._results: Dict[str, Dict[int, Tuple[Rect, Any]]] = {}
+        self._next_id = 0
+
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.stats = {
+            "frames": 0, "static_frames": 0, "dirty_tiles": 0, "analyses": 0, "reused_tiles": 0, "deferred": 0,
+            "grab_ms": 0.0, "diff_ms": 0.0, "analysis_ms": 0.0, "dirty_ratio": 0.0,
+        }
+
+    def register(
+        self, name: str, analyzer: Analyzer, block: Union[int, Tuple[int, int]] = None, margin: int = 0
+    ):
+        """Add a region analyzer (e.g. a hand/object model); it sees only changed regions.
+
+        `block` caps region size in tiles as for dirty_rects (None → SCREEN_REGION_TILES);
+        `margin` pads each crop with surrounding pixels.
+        """
+        with self._lock:
+            self.analyzers[name] = analyzer
+            self._regions[name] = (settings.SCREEN_REGION_TILES if block is None else block, margin)
+            self._tile_ids.pop(name, None)
+            self._results.pop(name, None)
+
+    # ── Pipeline ─────────────────────────────────────
+    def step(self, budget: float = None) -> Dict[str, Any]:
+        """Grab, diff and analyse changed regions once. Returns what changed.
+
+        With `budget` (seconds), analysis stops once it is spent; the regions
+        left over are reported as `pending` and picked up by the next step.
+        """
+        until = time.monotonic() + budget if budget is not None else None
+        with self._lock:
+            start = time.perf_counter()
+            frame = self.capture.grab()
+            grabbed = time.perf_counter()
+
+            if self._previous is None or self._previous.shape != frame.shape:
+                rows, cols = -(-frame.shape[0] // self.tile), -(-frame.shape[1] // self.tile)
+                dirty = np.ones((rows, cols), dtype=bool)
+                self._tile_ids = {}
+                self._results = {}
+            else:
+                dirty = tile_changes(self._previous, frame, self.tile, settings.SCREEN_DIFF_STRIDE) \
+                    > settings.SCREEN_DIFF_THRESHOLD
+            diffed = time.perf_counter()
+
+            analyses, pending = self._analyse(frame, dirty, until) if dirty.any() or self._pending() else (0, 0)
+            self._previous = np.array(frame, copy=True)   # mss buffers are reused
+            self.frame = self._previous
+            done = time.perf_counter()
+
+            changed = int(dirty.sum())
+            self.stats["frames"] += 1
+            self.stats["static_frames"] += int(changed == 0)
+            self.stats["dirty_tiles"] += changed
+            self.stats["analyses"] += analyses
+            self.stats["grab_ms"] = round((grabbed - start) * 1000, 2)
+            self.stats["diff_ms"] = round((diffed - grabbed) * 1000, 2)
+            self.stats["analysis_ms"] = round((done - diffed) * 1000, 2)
+            self.stats["dirty_ratio"] = round(0.8 * self.stats["dirty_ratio"] + 0.2 * changed / dirty.size, 4)
+            self.stats["deferred"] += pending
+            return {"dirty_tiles": changed, "tiles": int(dirty.size), "analyses": analyses, "pending": pending}
+
+    def _pending(self) -> bool:
+        """Tiles an analyzer hasn't covered yet (e.g. deferred by a budget)."""
+        return any((self._tile_ids.get(name) is None) or (self._tile_ids[name] < 0).any() for name in self.analyzers)
+
+    def _analyse(self, frame: np.ndarray, dirty: np.ndarray, until: float = None) -> Tuple[int, int]:
+        runs = pending = 0
+        for name, analyzer in self.analyzers.items():
+            block, margin = self._regions.get(name, (settings.SCREEN_REGION_TILES, 0))
+            ids = self._tile_ids.get(name)
+            if ids is None or ids.shape != dirty.shape:
+                ids = self._tile_ids[name] = np.full(dirty.shape, -1, dtype=np.int64)
+                self._results[name] = {}
+            results = self._results[name]
+
+            # A changed tile invalidates every result it was part of; the
+            # unchanged tiles of those regions need analysing again too
+            stale = np.unique(ids[dirty])
+            stale = stale[stale >= 0]
+            todo = dirty | np.isin(ids, stale) | (ids < 0)
+            for result_id in stale.tolist():
+                results.pop(result_id, None)
+            ids[todo] = -1
+            self.stats["reused_tiles"] += int((~todo).sum())
+
+            height, width = frame.shape[:2]
+            for rect, tiles in dirty_rects(todo, self.tile, frame.shape[:2], block):
+                if until is not None and time.monotonic() >= until:
+                    pending += 1   # Out of budget: these tiles stay at -1 for the next step
+                    continue
+                x, y, w, h = rect
+                x0, y0 = max(0, x - margin), max(0, y - margin)
+                x1, y1 = min(width, x + w + margin), min(height, y + h + margin)
+                try:
+                    result = analyzer(frame[y0:y1, x0:x1], rect)
+                except Exception as e:
+                    log.warning(f"Screen analyzer '{name}' failed on {rect}: {e}")
+                    result = None   # Not retried until one of its tiles changes
+                result_id = self._next_id
+                self._next_id += 1
+                results[result_id] = (rect, result)
+                for r, c in tiles:
+                    ids[r, c] = result_id
+                runs += 1
+        return runs, pending
+
+    def results(self, name: str) -> List[Dict[str, Any]]:
+        """Current results of one analyzer, top-to-bottom, left-to-right."""
+        with self._lock:
+            items = list(self._results.get(name, {}).values())
+        items.sort(key=lambda item: (item[0][1], item[0][0]))
+        return [{"rect": list(rect), "result": result} for rect, result in items if result is not None]
+
+    def screen_text(self) -> str:
+        return "\n".join(r["result"] for r in self.results("ocr") if r["result"])
+
+    # ── Background watcher ───────────────────────────
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        if not self.capture.available:
+            log.warning("Screen watcher disabled: no capture backend (install mss)")
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="screen-watcher", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        log.info("Screen watcher started")
+        interval = 1.0 / settings.SCREEN_FPS
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                self.step()
+            except Exception as e:
+                log.error(f"Screen watcher error: {e}")
+                self._stop.wait(5)
+            self._stop.wait(max(0.0, interval - (time.monotonic() - started)))
+        log.info("Screen watcher stopped")
+
+    def stop(self):
+        self._stop.set()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "available": self.capture.available,
+            "running": self.running,
+            "analyzers": list(self.analyzers),
+            "tile": self.tile,
+            **self.stats,
+        }
+
+
+screen_watcher = ScreenWatcher()
@@ -0,0 +1,271 @@
+"""
+Session Service — Bounded per-client conversation context
+──────────────────────────────────────────────────────────
+Keeps a short ring buffer of recent turns for every client_id so the
+ChiefAgent can resolve follow-ups ("show me another one", "open it").
+
+Prompt size is hard-capped: recent turns must fit SESSION_TOKEN_BUDGET,
+anything that falls out of the window is folded into a rolling summary
+by a background task, off the request path.
+
+With SESSION_PERSIST, turns and summaries are also written (in the
+background) to db_service's store, collection `session_turns`, and a
+client's session is restored from it the first time it is seen after a
+restart or idle eviction. Restores are bounded by SESSION_RESTORE_TIMEOUT;
+a slow or missing store just means starting with an empty session.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set
+
+from app.config import settings
+from utils.logger import log
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 chars per token) — no tokenizer on the hot path."""
+    if not text:
+        return 0
+    return max(1, len(text) // 4)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Trim text to roughly max_tokens, keeping the head."""
+    max_chars = max_tokens * 4
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars].rsplit(" ", 1)[0] + "…"
+
+
+@dataclass
+class Turn:
+    user: str
+    assistant: str
+    actions: str = ""
+    timestamp: float = field(default_factory=time.time)
+
+    def render(self) -> str:
+        line = f"User: {self.user}\nJARVIS: {self.assistant}"
+        if self.actions:
+            line += f"\n[Actions: {self.actions}]"
+        return line
+
+    @property
+    def tokens(self) -> int:
+        return estimate_tokens(self.render())
+
+
+class ConversationSession:
+    """Ring buffer of recent turns plus a rolling summary of older ones."""
+
+    def __init__(self, client_id: str, max_turns: int, token_budget: int, summary_tokens: int):
+        self.client_id = client_id
+        self.max_turns = max_turns
+        self.token_budget = token_budget
+        self.summary_tokens = summary_tokens
+
+        self.turns: Deque[Turn] = deque()
+        self.summary: str = ""
+        self.pending: List[Turn] = []     # Evicted turns awaiting summarisation
+        self.pending_since: Optional[float] = None
+        self.summarising = False
+        self.last_active = time.time()
+        self.last_prompt_tokens = 0
+
+    def add_turn(self, turn: Turn):
+        self.turns.append(turn)
+        self.last_active = time.time()
+        self._evict()
+
+    def _evict(self):
+        """Move turns out of the window until both turn and token caps hold."""
+        total = sum(t.tokens for t in self.turns)
+        while self.turns and (len(self.turns) > self.max_turns or total > self.token_budget):
+            old = self.turns.popleft()
+            total -= old.tokens
+            self.pending.append(old)
+            if self.pending_since is None:
+                self.pending_since = time.time()
+
+    def render(self) -> str:
+        """Render the context block injected into the ChiefAgent prompt."""
+        parts = []
+        if self.summary:
+            parts.append(f"Earlier: {truncate_to_tokens(self.summary, self.summary_tokens)}")
+        parts.extend(t.render() for t in self.turns)
+        block = "\n".join(parts)
+        self.last_prompt_tokens = estimate_tokens(block)
+        return block
+
+    @property
+    def summary_lag(self) -> float:
+        """Seconds the oldest unsummarised turn has been waiting."""
+        if self.pending_since is None:
+            return 0.0
+        return time.time() - self.pending_since
+
+
+Summarizer = Callable[[str, List[Turn]], Awaitable[str]]
+
+
+class SessionService:
+    def __init__(self):
+        self.sessions: "OrderedDict[str, ConversationSession]" = OrderedDict()
+        self.summarizer: Optional[Summarizer] = None
+        self.summaries_completed = 0
+        self.summaries_failed = 0
+        self._last_summary_duration = 0.0
+        self.store = None
+        self._writes: Set[asyncio.Task] = set()
+        self.persist_stats = {"written": 0, "failed": 0, "restored": 0, "restore_misses": 0}
+
+    # ── Persistence ──────────────────────────────────
+    async def start(self, store):
+        """Persist sessions to `store` (db_service.store) from now on."""
+        if not settings.SESSION_PERSIST or store is None:
+            return
+        try:
+            await store.ensure_collection(
+                "session_turns", settings.SESSION_PERSIST_TTL, [[("client_id", 1), ("kind", 1), ("ts", -1)]]
+            )
+        except Exception as e:
+            log.warning(f"Session persistence disabled: {e}")
+            return
+        self.store = store
+
+    async def stop(self):
+        if self._writes:
+            await asyncio.wait(self._writes, timeout=settings.SESSION_RESTORE_TIMEOUT * 4)
+        self.store = None
+
+    def _persist(self, client_id: str, kind: str, **fields: Any):
+        if self.store is None:
+            return
+        doc = {"client_id": client_id, "kind": kind, **fields, "ts": datetime.now(timezone.utc)}
+        task = asyncio.create_task(self._write(doc))
+        self._writes.add(task)
+        task.add_done_callback(self._writes.discard)
+
+    async def _write(self, doc: Dict[str, Any]):
+        try:
+            await self.store.insert_many("session_turns", [doc])
+            self.persist_stats["written"] += 1
+        except Exception as e:
+            self.persist_stats["failed"] += 1
+            log.warning(f"Session write failed for {doc['client_id']}: {e}")
+
+    async def restore(self, client_id: str, timeout: float = None):
+        """Load a client's recent turns and summary unless its session is already live."""
+        if self.store is None or not client_id or client_id in self.sessions:
+            return
+        timeout = settings.SESSION_RESTORE_TIMEOUT if timeout is None else min(timeout, settings.SESSION_RESTORE_TIMEOUT)
+        try:
+            turns, summaries = await asyncio.wait_for(asyncio.gather(
+                self.store.find("session_turns", {"client_id": client_id, "kind": "turn"}, settings.SESSION_MAX_TURNS),
+                self.store.find("session_turns", {"client_id": client_id, "kind": "summary"}, 1),
+            ), timeout)
+        except Exception as e:
+            self.persist_stats["restore_misses"] += 1
+            log.debug(f"Session restore skipped for {client_id}: {e!r}")
+            return
+        if client_id in self.sessions or not (turns or summaries):
+            return   # Raced with a live request, or nothing stored
+        session = self.get(client_id)
+        if summaries:
+            session.summary = summaries[0].get("summary", "")
+        for doc in reversed(turns):   # find() is newest first
+            session.turns.append(Turn(
+                user=doc.get("user", ""), assistant=doc.get("assistant", ""),
+                actions=doc.get("actions", ""), timestamp=doc.get("timestamp") or time.time(),
+            ))
+        session._evict()
+        session.pending, session.pending_since = [], None   # Already covered by the stored summary
+        self.persist_stats["restored"] += 1
+
+    def set_summarizer(self, summarizer: Summarizer):
+        """Register the coroutine used to fold old turns into the summary."""
+        self.summarizer = summarizer
+
+    def get(self, client_id: str) -> ConversationSession:
+        session = self.sessions.get(client_id)
+        if session is None:
+            session = ConversationSession(
+                client_id,
+                max_turns=settings.SESSION_MAX_TURNS,
+                token_budget=settings.SESSION_TOKEN_BUDGET,
+                summary_tokens=settings.SESSION_SUMMARY_TOKENS,
+            )
+            self.sessions[client_id] = session
+            self._prune()
+        else:
+            self.sessions.move_to_end(client_id)
+        return session
+
+    def _prune(self):
+        """Drop idle sessions and cap the number of tracked clients (LRU)."""
+        now = time.time()
+        for cid in [c for c, s in self.sessions.items() if now - s.last_active > settings.SESSION_IDLE_TTL]:
+            del self.sessions[cid]
+        while len(self.sessions) > settings.SESSION_MAX_CLIENTS:
+            self.sessions.popitem(last=False)
+
+    def context_for(self, client_id: str) -> str:
+        if not client_id or client_id not in self.sessions:
+            return ""
+        return self.get(client_id).render()
+
+    def record_turn(self, client_id: str, user: str, assistant: str, actions: str = ""):
+        if not client_id:
+            return
+        session = self.get(client_id)
+        turn = Turn(user=user, assistant=assistant, actions=actions)
+        session.add_turn(turn)
+        self._persist(client_id, "turn", user=user, assistant=assistant, actions=actions, timestamp=turn.timestamp)
+        if session.pending and not session.summarising and self.summarizer:
+            session.summarising = True
+            asyncio.create_task(self._summarise(session))
+
+    async def _summarise(self, session: ConversationSession):
+        """Background job: fold pending turns into the rolling summary."""
+        start = time.perf_counter()
+        try:
+            while session.pending:
+                batch, session.pending = session.pending, []
+                summary = await self.summarizer(session.summary, batch)
+                session.summary = truncate_to_tokens(summary.strip(), session.summary_tokens)
+                self.summaries_completed += 1
+                self._persist(session.client_id, "summary", summary=session.summary)
+            session.pending_since = None
+        except Exception as e:
+            self.summaries_failed += 1
+            log.warning(f"Session summary failed for {session.client_id}: {e}")
+            # Keep the gist rather than growing pending forever
+            session.pending = []
+            session.pending_since = None
+        finally:
+            session.summarising = False
+            self._last_summary_duration = time.perf_counter() - start
+
+    def metrics(self) -> Dict[str, float]:
+        sessions = list(self.sessions.values())
+        prompt_sizes = [s.last_prompt_tokens for s in sessions]
+        return {
+            "active_sessions": len(sessions),
+            "prompt_tokens_max": max(prompt_sizes, default=0),
+            "prompt_tokens_avg": round(sum(prompt_sizes) / len(prompt_sizes), 1) if prompt_sizes else 0,
+            "token_budget": settings.SESSION_TOKEN_BUDGET + settings.SESSION_SUMMARY_TOKENS,
+            "pending_turns": sum(len(s.pending) for s in sessions),
+            "summary_lag_max_s": round(max((s.summary_lag for s in sessions), default=0.0), 3),
+            "last_summary_duration_s": round(self._last_summary_duration, 3),
+            "summaries_completed": self.summaries_completed,
+            "summaries_failed": self.summaries_failed,
+            "persisted": self.store is not None,
+            **self.persist_stats,
+        }
+
+
+session_service = SessionService()
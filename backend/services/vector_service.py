@@ -1,44 +1,279 @@
 """
-Vector Service — ChromaDB + Sentence Transformers
-──────────────────────────────────────────────────
+Vector Service — Long-term memory over pluggable vector backends
+─────────────────────────────────────────────────────────────────
 Long-term memory storage using vector embeddings.
+
+Backends (VECTOR_BACKEND):
+  chroma     ChromaDB PersistentClient with HNSW (default)
+  quantized  In-process int8 memory-mapped matrix (services.quantized_index);
+             lighter startup/RSS for memory-sized collections
+
+Embeddings come from the shared, micro-batching EmbeddingService; the
+async bulk APIs (`add_memories`, `search_many`) write to / query the
+backend in a single call. Every add is mirrored into the BM25 MemoryLexicon
+for hybrid recall.
+
+Filters (client_id, source, since, until) are applied inside the backend
+query, before top-k, using Chroma's `where` syntax.
+
+Lifecycle metadata on every memory: created, last_seen, importance and an
+optional expires_at (from a per-memory `ttl`; 0 = never). Inserts whose top-1
+neighbour is at least MEMORY_DEDUP_SIMILARITY similar (same client) are
+merged into it instead of stored again; services.memory_lifecycle evicts
+and summarises stale entries in the background.
 """
 
+import asyncio
+import threading
+import time
 import uuid
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
-import chromadb
-from chromadb.config import Settings as ChromaSettings
-from sentence_transformers import SentenceTransformer
+import numpy as np
 
 from app.config import settings
+from services.embedding_service import EmbeddingService, embedding_service
+from services.memory_lexicon import MemoryLexicon, memory_lexicon
 from utils.logger import log
 
 
+class ChromaBackend:
+    def __init__(self, path: str = None, collection: str = "jarvis_memory"):
+        import chromadb
+        self.client = chromadb.PersistentClient(path=str(path or settings.CHROMA_DB_PATH))
+        self.collection = self.client.get_or_create_collection(
+            name=collection, metadata={"hnsw:space": "cosine"}
+        )
+
+    def add(self, ids, embeddings, documents, metadatas=None):
+        self.collection.add(ids=ids, embeddings=embeddings, documents=documents, metadatas=metadatas)
+
+    def query(self, query_embeddings, n_results: int = 3, where: Dict[str, Any] = None):
+        return self.collection.query(query_embeddings=query_embeddings, n_results=n_results, where=where)
+
+    def delete(self, ids):
+        self.collection.delete(ids=ids)
+
+    def update(self, ids, metadatas):
+        self.collection.update(ids=ids, metadatas=metadatas)
+
+    def get(self, where: Dict[str, Any] = None, limit: int = None):
+        return self.collection.get(where=where, limit=limit, include=["documents", "metadatas"])
+
+    def iter_documents(self, page: int = 1000) -> Iterator[Tuple[List[str], List[str], List[Dict]]]:
+        offset = 0
+        while True:
+            batch = self.collection.get(include=["documents", "metadatas"], limit=page, offset=offset)
+            if not batch["ids"]:
+                return
+            yield batch["ids"], batch["documents"], batch["metadatas"]
+            offset += page
+
+    def count(self) -> int:
+        return self.collection.count()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {"vectors": self.count()}
+
+    def close(self):
+        pass
+
+
+def make_backend(name: str = None):
+    name = name or settings.VECTOR_BACKEND
+    if name == "quantized":
+        from services.quantized_index import QuantizedIndex
+        return QuantizedIndex()
+    if name != "chroma":
+        log.warning(f"Unknown VECTOR_BACKEND '{name}', using chroma")
+    return ChromaBackend()
+
+
+def where_clause(filters: Dict[str, Any] = None) -> Optional[Dict[str, Any]]:
+    """{client_id, source, since, until} → Chroma `where` (None when unfiltered)."""
+    filters = filters or {}
+    conditions = [{key: filters[key]} for key in ("client_id", "source") if filters.get(key) is not None]
+    if filters.get("since") is not None:
+        conditions.append({"created": {"$gte": filters["since"]}})
+    if filters.get("until") is not None:
+        conditions.append({"created": {"$lte": filters["until"]}})
+    if not conditions:
+        return None
+    return conditions[0] if len(conditions) == 1 else {"$and": conditions}
+
+
 class VectorService:
-    def __init__(self):
-        log.info("Initializing Vector Service (ChromaDB)...")
-        self.client = chromadb.PersistentClient(path=str(settings.CHROMA_DB_PATH))
+    def __init__(self, embedder: EmbeddingService = None, backend=None, lexicon: MemoryLexicon = None):
+        log.info(f"Initializing Vector Service ({settings.VECTOR_BACKEND})...")
+        self.backend = backend or make_backend()
+        self.embedder = embedder or embedding_service
+        self.lexicon = lexicon or memory_lexicon
+        self.stats = {"inserted": 0, "merged": 0}
+        if self.lexicon.available and self.lexicon.count() == 0 and self.backend.count() > 0:
+            threading.Thread(target=self._backfill_lexicon, daemon=True).start()
+        log.info("Vector Service Ready.")
 
-        log.info("Loading Embedding Model...")
-        self.embedding_fn = SentenceTransformer("all-MiniLM-L6-v2")
+    def _backfill_lexicon(self):
+        """Index memories that predate the lexicon (one-off, in the background)."""
+        total = 0
+        for ids, documents, metadatas in self.backend.iter_documents():
+            self.lexicon.add(zip(ids, documents, metadatas))
+            total += len(ids)
+        log.info(f"Memory lexicon backfilled with {total} memories")
 
-        self.collection = self.client.get_or_create_collection(
-            name="jarvis_memory", metadata={"hnsw:space": "cosine"}
+    @staticmethod
+    def _stamp(meta: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        meta = dict(meta or {})
+        now = time.time()
+        meta.setdefault("created", now)
+        meta.setdefault("last_seen", meta["created"])
+        meta.setdefault("importance", settings.MEMORY_DEFAULT_IMPORTANCE)
+        ttl = meta.pop("ttl", None) or settings.MEMORY_DEFAULT_TTL
+        if ttl:
+            meta["expires_at"] = now + ttl
+        return meta
+
+    @staticmethod
+    def _merge(existing: Optional[Dict[str, Any]], new: Dict[str, Any]) -> Dict[str, Any]:
+        """Metadata of a memory that just absorbed a near-duplicate."""
+        merged = dict(existing or {})
+        merged["last_seen"] = time.time()
+        merged["merged"] = merged.get("merged", 0) + 1
+        merged["importance"] = max(
+            merged.get("importance", settings.MEMORY_DEFAULT_IMPORTANCE), new.get("importance", 0)
         )
-        log.info("Vector Service Ready.")
+        if merged.get("expires_at"):
+            if new.get("expires_at"):
+                merged["expires_at"] = max(merged["expires_at"], new["expires_at"])
+            else:
+                # The new copy is permanent. Chroma merges metadata on update, so
+                # a deleted key would survive; 0 means "never expires" instead.
+                merged["expires_at"] = 0
+        return merged
+
+    def _write(self, texts: List[str], metadatas: List[Dict[str, Any]], vectors: np.ndarray) -> List[str]:
+        """Insert memories, merging near-duplicates into their top-1 neighbour."""
+        threshold = settings.MEMORY_DEDUP_SIMILARITY
+        ids: List[Optional[str]] = [None] * len(texts)
+        merges: Dict[str, Dict[str, Any]] = {}
+        fresh: List[int] = []
+
+        nearest = self._nearest_same_client(vectors, metadatas) if threshold < 1.0 and self.backend.count() else {}
+
+        for i, meta in enumerate(metadatas):
+            if i in nearest:
+                match_id, match_meta, similarity = nearest[i]
+                if similarity >= threshold and match_meta.get("client_id") == meta.get("client_id"):
+                    ids[i] = match_id
+                    merges[match_id] = self._merge(merges.get(match_id, match_meta), meta)
+                    continue
+            # Duplicates within the same batch
+            twin = next((j for j in fresh if float(vectors[i] @ vectors[j]) >= threshold
+                         and metadatas[j].get("client_id") == meta.get("client_id")), None)
+            if twin is not None:
+                ids[i] = ids[twin]
+                metadatas[twin] = self._merge(metadatas[twin], meta)
+                continue
+            ids[i] = str(uuid.uuid4())
+            fresh.append(i)
+
+        if fresh:
+            self.backend.add(
+                ids=[ids[i] for i in fresh], embeddings=vectors[fresh].tolist(),
+                documents=[texts[i] for i in fresh], metadatas=[metadatas[i] for i in fresh],
+            )
+            self.lexicon.add((ids[i], texts[i], metadatas[i]) for i in fresh)
+        if merges:
+            self.backend.update(ids=list(merges), metadatas=list(merges.values()))
+        self.stats["inserted"] += len(fresh)
+        self.stats["merged"] += len(texts) - len(fresh)
+        return ids
+
+    def _nearest_same_client(
+        self, vectors: np.ndarray, metadatas: List[Dict[str, Any]]
+    ) -> Dict[int, Tuple[str, Dict[str, Any], float]]:
+        """Top-1 neighbour (id, metadata, similarity) per row, searched within the row's client.
 
+        One backend query per distinct client in the batch, so another client's
+        neighbour can't hide a same-client duplicate.
+        """
+        groups: Dict[Any, List[int]] = {}
+        for i, meta in enumerate(metadatas):
+            groups.setdefault(meta.get("client_id"), []).append(i)
+        nearest = {}
+        for client_id, rows in groups.items():
+            where = {"client_id": client_id} if client_id is not None else None
+            res = self.backend.query(query_embeddings=vectors[rows].tolist(), n_results=1, where=where)
+            for k, i in enumerate(rows):
+                if res["ids"][k]:
+                    nearest[i] = (res["ids"][k][0], res["metadatas"][k][0] or {}, 1.0 - res["distances"][k][0])
+        return nearest
+
+    def touch(self, hits: List[Tuple[str, Dict[str, Any]]]):
+        """Refresh last_seen on recalled memories so frequently used ones never go stale.
+
+        Takes (id, full metadata) pairs; memories touched within the last
+        MEMORY_TOUCH_INTERVAL are skipped to keep recall from writing every time.
+        """
+        now = time.time()
+        due = [(doc_id, {**meta, "last_seen": now}) for doc_id, meta in hits
+               if meta and now - meta.get("last_seen", 0) > settings.MEMORY_TOUCH_INTERVAL]
+        if due:
+            self.backend.update(ids=[d[0] for d in due], metadatas=[d[1] for d in due])
+
+    def delete(self, ids: List[str]):
+        if ids:
+            self.backend.delete(ids)
+            self.lexicon.delete(ids)
+
+    @property
+    def embedding_fn(self):
+        """The underlying SentenceTransformer (kept for existing callers)."""
+        return self.embedder.model
+
+    # ── Single-item (sync) API ───────────────────────
     def add_memory(self, text: str, meta: dict) -> str:
-        doc_id = str(uuid.uuid4())
-        vector = self.embedding_fn.encode(text).tolist()
-        self.collection.add(
-            ids=[doc_id], embeddings=[vector], documents=[text], metadatas=[meta]
+        return self._write([text], [self._stamp(meta)], self.embedder.encode([text]))[0]
+
+    def search_memory(self, query: str, n_results: int = 3, filters: Dict[str, Any] = None):
+        vector = self.embedder.encode([query])[0].tolist()
+        return self.backend.query(query_embeddings=[vector], n_results=n_results, where=where_clause(filters))
+
+    # ── Bulk (async) API ─────────────────────────────
+    async def add_memories(self, items: List[Tuple[str, Dict[str, Any]]]) -> List[str]:
+        """Embed (text, metadata) pairs in one batch and insert them in one backend call."""
+        if not items:
+            return []
+        texts = [text for text, _ in items]
+        metadatas = [self._stamp(meta) for _, meta in items]
+        vectors = await self.embedder.embed_many(texts)
+        return await asyncio.to_thread(self._write, texts, metadatas, vectors)
+
+    async def search_many(
+        self, queries: List[str], n_results: int = 3, filters: Dict[str, Any] = None
+    ) -> Dict[str, Any]:
+        """Run several recall queries with one embedding pass and one backend query."""
+        if not queries:
+            return {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        vectors = await self.embedder.embed_many(queries)
+        return await asyncio.to_thread(
+            self.backend.query, query_embeddings=vectors.tolist(), n_results=n_results,
+            where=where_clause(filters),
         )
-        return doc_id
 
-    def search_memory(self, query: str, n_results: int = 3):
-        vector = self.embedding_fn.encode(query).tolist()
-        results = self.collection.query(query_embeddings=[vector], n_results=n_results)
-        return results
+    async def search_memory_async(self, query: str, n_results: int = 3, filters: Dict[str, Any] = None):
+        """Single query through the coalescing embedder (same shape as search_memory)."""
+        return await self.search_many([query], n_results, filters)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "backend": settings.VECTOR_BACKEND, **self.backend.metrics(), **self.stats,
+            "lexicon": self.lexicon.count(),
+        }
+
+    def close(self):
+        self.backend.close()
+        self.lexicon.close()
 
 
 # Singleton instance
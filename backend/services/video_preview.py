@@ -0,0 +1,127 @@
+"""
+Video Preview Service — Short preview clips and poster sprites via ffmpeg
+──────────────────────────────────────────────────────────────────────────
+Generates a few seconds of low-bitrate, silent video (or a strip of frames)
+from the lightest rendition of a result, cached in the media cache, so the
+dashboard can show motion instantly while the full video buffers.
+Disabled automatically when ffmpeg is not on PATH.
+
+ffmpeg opens the URL itself (following redirects and playlist references),
+so only URLs VideoAgent issued are accepted: preview_url() signs them and
+the route verifies the signature. ffmpeg is further limited to https and a
+plain MP4 demuxer, so a result can't point it at local files or playlists.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import os
+import secrets
+import shutil
+import tempfile
+from typing import Tuple
+from urllib.parse import quote, urlsplit
+
+from app.config import settings
+from services.media_cache import MediaCache, MediaError, media_cache
+from utils.logger import log
+
+FFMPEG = shutil.which("ffmpeg")
+
+PREVIEW_KINDS = {"clip": ("mp4", "video/mp4"), "sprite": ("jpg", "image/jpeg")}
+
+# Input restrictions applied before "-i": network protocols and demuxer
+INPUT_ARGS = ["-protocol_whitelist", "https,tls,tcp", "-f", "mp4"]
+
+_SECRET = (settings.VIDEO_PREVIEW_SECRET or secrets.token_hex(32)).encode()
+
+
+def sign(url: str) -> str:
+    return hmac.new(_SECRET, url.encode("utf-8"), hashlib.sha256).hexdigest()[:32]
+
+
+def verify(url: str, signature: str) -> bool:
+    return bool(signature) and hmac.compare_digest(sign(url), signature)
+
+
+class VideoPreviewService:
+    def __init__(self, cache: MediaCache = None):
+        self.cache = cache or media_cache
+        self._slots = asyncio.Semaphore(settings.VIDEO_PREVIEW_CONCURRENCY)
+        if settings.VIDEO_PREVIEWS_ENABLED and not FFMPEG:
+            log.warning("ffmpeg not found — video previews disabled.")
+
+    @property
+    def available(self) -> bool:
+        return bool(settings.VIDEO_PREVIEWS_ENABLED and FFMPEG)
+
+    def _args(self, kind: str, source: str, out: str) -> list:
+        seconds = str(settings.VIDEO_PREVIEW_SECONDS)
+        width = settings.VIDEO_PREVIEW_WIDTH
+        if kind == "clip":
+            return [
+                FFMPEG, "-nostdin", "-loglevel", "error", "-y", "-t", seconds, *INPUT_ARGS, "-i", source,
+                "-an", "-vf", f"scale={width}:-2", "-c:v", "libx264", "-preset", "veryfast",
+                "-crf", "32", "-movflags", "+faststart", out,
+            ]
+        # Sprite: one frame every 2 s, tiled into a single strip
+        frames = max(1, settings.VIDEO_PREVIEW_SECONDS // 2)
+        return [
+            FFMPEG, "-nostdin", "-loglevel", "error", "-y", "-t", seconds, *INPUT_ARGS, "-i", source,
+            "-vf", f"fps=0.5,scale={width // 2}:-2,tile={frames}x1", "-frames:v", "1", out,
+        ]
+
+    async def _render(self, kind: str, source: str) -> bytes:
+        ext, _ = PREVIEW_KINDS[kind]
+        fd, out = tempfile.mkstemp(suffix=f".{ext}")
+        os.close(fd)
+        try:
+            async with self._slots:
+                proc = await asyncio.create_subprocess_exec(
+                    *self._args(kind, source, out),
+                    stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE,
+                )
+                try:
+                    _, stderr = await asyncio.wait_for(proc.communicate(), settings.VIDEO_PREVIEW_TIMEOUT)
+                except asyncio.TimeoutError:
+                    proc.kill()
+                    await proc.wait()
+                    raise MediaError("Preview generation timed out", 504)
+            if proc.returncode != 0:
+                raise MediaError(f"ffmpeg failed: {stderr.decode(errors='ignore')[:200]}")
+            with open(out, "rb") as f:
+                return f.read()
+        finally:
+            try:
+                os.remove(out)
+            except OSError:
+                pass
+
+    async def preview(self, url: str, kind: str = "clip", signature: str = "") -> Tuple[str, str]:
+        """(path, media type) of the cached preview for a video URL issued by preview_url()."""
+        if not self.available:
+            raise MediaError("Video previews are not available", 404)
+        if kind not in PREVIEW_KINDS:
+            raise MediaError(f"Unknown preview kind '{kind}'", 400)
+        if not verify(url, signature):
+            raise MediaError("Preview URL not issued by this server", 403)
+        if urlsplit(url).scheme != "https":
+            raise MediaError("Previews need an https video URL", 400)
+        # Reading straight from the URL lets ffmpeg stop after a few seconds
+        # instead of downloading the whole file.
+        await self.cache.check_url(url)
+        ext, media_type = PREVIEW_KINDS[kind]
+        name = f"{self.cache.key(url)}_{kind}.{ext}"
+        path = await self.cache.derived(name, lambda: self._render(kind, url))
+        return path, media_type
+
+
+def preview_url(url: str, kind: str = "clip") -> str:
+    """Public URL of a preview for a video (generated on first request)."""
+    return (
+        f"{settings.MEDIA_PUBLIC_BASE}/api/media/preview?url={quote(url, safe='')}"
+        f"&kind={kind}&sig={sign(url)}"
+    )
+
+
+video_preview = VideoPreviewService()
@@ -0,0 +1,118 @@
+"""
+Wiki Index — Persistent query → Wikipedia page/thumbnail mapping
+─────────────────────────────────────────────────────────────────
+Remembers which page title (and lead image) a query resolved to, so repeat
+celebrities and landmarks are answered without any network call.
+Misses are remembered too, for a shorter time, to avoid re-querying
+Wikipedia for things it has no picture of.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+from app.config import settings
+from utils.logger import log
+
+
+def normalize_query(query: str) -> str:
+    return " ".join((query or "").lower().split())
+
+
+class WikiIndex:
+    def __init__(self, path: str = None):
+        self.path = path or settings.WIKI_INDEX_PATH
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.stats = {"hits": 0, "misses": 0, "negative_hits": 0}
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS wiki_index ("
+                " query TEXT PRIMARY KEY, title TEXT, thumbnail TEXT, updated REAL NOT NULL)"
+            )
+            self._conn.commit()
+            log.info(f"Wiki index opened at {self.path}")
+        return self._conn
+
+    def get(self, query: str) -> Optional[Dict[str, str]]:
+        """
+        Return {"title", "thumbnail", "stale"} for a known query, {} for a
+        remembered miss, or None if the query must be looked up. Stale
+        entries are still served; callers refresh them in the background.
+        """
+        key = normalize_query(query)
+        with self._lock:
+            row = self._db().execute(
+                "SELECT title, thumbnail, updated FROM wiki_index WHERE query = ?", (key,)
+            ).fetchone()
+        if row is None:
+            self.stats["misses"] += 1
+            return None
+        title, thumbnail, updated = row
+        age = time.time() - updated
+        if not thumbnail:
+            if age > settings.WIKI_INDEX_NEGATIVE_TTL:
+                self.stats["misses"] += 1
+                return None
+            self.stats["negative_hits"] += 1
+            return {}
+        self.stats["hits"] += 1
+        return {"title": title, "thumbnail": thumbnail, "stale": age > settings.WIKI_INDEX_TTL}
+
+    def put(self, query: str, title: str = None, thumbnail: str = None):
+        self.put_many([(query, title, thumbnail)])
+
+    def put_many(self, rows: Iterable[tuple]):
+        """Store (query, title, thumbnail) rows in one transaction."""
+        now = time.time()
+        data = [(normalize_query(q), t, th, now) for q, t, th in rows]
+        if not data:
+            return
+        with self._lock:
+            db = self._db()
+            db.executemany(
+                "INSERT OR REPLACE INTO wiki_index (query, title, thumbnail, updated) VALUES (?, ?, ?, ?)",
+                data,
+            )
+            db.commit()
+
+    def stale_titles(self, limit: int = 50) -> List[str]:
+        """Titles whose thumbnails are past their TTL (for batched refresh)."""
+        cutoff = time.time() - settings.WIKI_INDEX_TTL
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT DISTINCT title FROM wiki_index WHERE thumbnail IS NOT NULL AND updated < ? LIMIT ?",
+                (cutoff, limit),
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def refresh_titles(self, thumbnails: Dict[str, Optional[str]]):
+        """Update every query that resolved to one of these titles."""
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            db.executemany(
+                "UPDATE wiki_index SET thumbnail = ?, updated = ? WHERE title = ?",
+                [(thumb, now, title) for title, thumb in thumbnails.items()],
+            )
+            db.commit()
+
+    def metrics(self) -> Dict[str, int]:
+        with self._lock:
+            size = self._db().execute("SELECT COUNT(*) FROM wiki_index").fetchone()[0]
+        return {**self.stats, "entries": size}
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+wiki_index = WikiIndex()
@@ -0,0 +1,35 @@
+"""
+Shared test setup: the backend directory on sys.path (so `app`, `services`
+and `utils` import as they do under uvicorn) and a fixture for overriding
+settings for one test.
+
+Module-level service singletons are created on import, so the file-backed
+ones are pointed at a scratch directory (and the in-process vector index)
+before app.config is loaded.
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_SCRATCH = tempfile.mkdtemp(prefix="jarvis-tests-")
+os.environ.update({
+    "VECTOR_BACKEND": "quantized",
+    "QUANT_INDEX_DIR": os.path.join(_SCRATCH, "memory_index"),
+    "MEMORY_LEXICON_PATH": os.path.join(_SCRATCH, "memory_lexicon.sqlite3"),
+})
+
+from app.config import settings  # noqa: E402
+
+
+@pytest.fixture
+def configure(monkeypatch):
+    """configure(NAME=value, …) → settings overrides undone after the test."""
+    def apply(**values):
+        for name, value in values.items():
+            monkeypatch.setattr(settings, name, value)
+    return apply
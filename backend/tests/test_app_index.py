@@ -0,0 +1,98 @@
+import os
+import stat
+
+import pytest
+
+import services.app_index as app_index
+from services.app_index import AppIndex, is_denied
+
+pytestmark = pytest.mark.skipif(os.name == "nt", reason="uses POSIX executables and .desktop files")
+
+
+def executable(directory, name):
+    path = directory / name
+    path.write_text("#!/bin/sh\n")
+    path.chmod(path.stat().st_mode | stat.S_IXUSR)
+    return str(path)
+
+
+def desktop_file(directory, filename, name, command, **extra):
+    lines = ["[Desktop Entry]", "Type=Application", f"Name={name}", f"Exec={command}"]
+    lines += [f"{k}={v}" for k, v in extra.items()]
+    (directory / filename).write_text("\n".join(lines) + "\n")
+
+
+@pytest.fixture
+def index(tmp_path, monkeypatch, configure):
+    bin_dir, apps = tmp_path / "bin", tmp_path / "applications"
+    bin_dir.mkdir()
+    apps.mkdir()
+    for name in ("code", "gimp", "ls", "shutdown", "rm", "firefox"):
+        executable(bin_dir, name)
+    desktop_file(apps, "code.desktop", "Visual Studio Code", "code %F", Keywords="editor;ide;")
+    desktop_file(apps, "gimp.desktop", "GNU Image Manipulation Program", "gimp-2.10 %U", GenericName="Image Editor")
+    desktop_file(apps, "logout.desktop", "Log Out", "gnome-session-quit --logout")
+    desktop_file(apps, "hidden.desktop", "Hidden Tool", "hidden", NoDisplay="true")
+
+    monkeypatch.setenv("PATH", str(bin_dir))
+    monkeypatch.setattr(app_index, "desktop_dirs", lambda: [str(apps)])
+    configure(
+        APP_INDEX_PATH=str(tmp_path / "app_index.json"),
+        APP_ALIASES_PATH=str(tmp_path / "app_aliases.json"),
+        APP_ALIASES={"editor": "code", "browser": "firefox", "nuke": "rm -rf /"},
+    )
+    idx = AppIndex()
+    idx.refresh()
+    return idx
+
+
+def names(results):
+    return [r["name"] for r in results]
+
+
+def test_exact_and_fuzzy_launcher_matches(index):
+    assert index.resolve("visual studio code").name == "Visual Studio Code"
+    assert index.resolve("open vs code").argv == ["code"]           # Acronym of the desktop entry
+    assert index.resolve("image editor").name == "GNU Image Manipulation Program"
+    assert index.resolve("visul studio").name == "Visual Studio Code"   # Typo fallback
+
+
+def test_bare_executables_match_by_exact_name_only(index):
+    assert index.resolve("firefox").argv[0].endswith("/bin/firefox")
+    assert index.resolve("fire") is None
+    assert index.resolve("firefx") is None
+
+
+def test_denylisted_commands_are_never_indexed(index):
+    assert is_denied(["/sbin/shutdown", "-h", "now"])
+    assert is_denied(["mkfs.ext4"])
+    assert not is_denied(["gimp"])
+    for query in ("shutdown", "rm", "log out"):
+        assert index.resolve(query) is None
+    assert index.resolve("hidden tool") is None
+
+
+def test_aliases_name_one_installed_app(index):
+    editor = index.resolve("editor")
+    assert (editor.name, editor.source, editor.argv) == ("editor", "alias", ["code"])   # The desktop entry
+    assert index.resolve("browser").argv[0].endswith("/bin/firefox")
+    assert index.resolve("nuke") is None   # Alias with arguments: ignored
+
+    index.add_alias("paint", "gimp")
+    assert index.resolve("paint").argv[0].endswith("/bin/gimp")
+    with pytest.raises(ValueError):
+        index.add_alias("wipe", "rm")
+    with pytest.raises(ValueError):
+        index.add_alias("danger", "firefox --kiosk")
+
+
+def test_refresh_only_rescans_what_changed(index, tmp_path):
+    assert index.refresh() == 0
+    executable(tmp_path / "bin", "blender")
+    os.utime(tmp_path / "bin", (1, 1))   # Make sure the directory mtime differs
+    assert index.refresh() == 1
+    assert index.resolve("blender") is not None
+
+    reloaded = AppIndex()
+    assert reloaded.refresh() == 0   # Persisted state matches the disk
+    assert reloaded.resolve("blender") is not None
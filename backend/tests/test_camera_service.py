@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from services.camera_service import CameraService, CameraUnavailable, parse_source
+
+cv2 = pytest.importorskip("cv2")
+
+
+@pytest.fixture
+def clip(tmp_path):
+    """A 30-frame 64×48 video whose frame i is filled with value 8·i."""
+    path = str(tmp_path / "clip.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 30, (64, 48))
+    for i in range(30):
+        writer.write(np.full((48, 64, 3), 8 * i, np.uint8))
+    writer.release()
+    return path
+
+
+@pytest.fixture
+def camera(clip, configure):
+    configure(CAMERA_IDLE_TIMEOUT=5.0, CAMERA_OPEN_TIMEOUT=5.0)
+    camera = CameraService(clip, buffer_frames=4)
+    yield camera
+    camera.stop()
+
+
+def test_parse_source():
+    assert parse_source("2") == 2
+    assert parse_source("clip.mp4") == "clip.mp4"
+
+
+def test_frames_arrive_in_order_from_one_capture_thread(camera):
+    seq, _, frame = camera.latest()
+    assert frame.shape == (48, 64, 3)
+    seen = [seq]
+    for _ in range(5):
+        seq, _, _ = camera.wait_frame(seq)
+        seen.append(seq)
+    assert seen == sorted(set(seen))
+    assert camera.stats["opens"] == 1
+
+
+def test_ring_buffer_keeps_the_newest_frames(camera):
+    with camera.subscription():
+        seq, _, _ = camera.latest()
+        seq, _, _ = camera.wait_frame(seq + 5)
+        recent = camera.recent()
+    assert 1 <= len(recent) <= 4
+    assert [s for s, _, _ in recent] == sorted(s for s, _, _ in recent)
+    assert recent[-1][0] >= seq
+
+
+def test_copies_are_independent_of_the_ring(camera):
+    _, _, frame = camera.latest(copy=True)
+    before = frame.copy()
+    camera.wait_frame(camera.latest()[0] + 4)   # Ring slots are overwritten meanwhile
+    np.testing.assert_array_equal(frame, before)
+
+
+def test_missing_source_raises(tmp_path, configure):
+    configure(CAMERA_OPEN_TIMEOUT=2.0)
+    camera = CameraService(str(tmp_path / "missing.avi"))
+    try:
+        with pytest.raises(CameraUnavailable):
+            camera.latest()
+    finally:
+        camera.stop()
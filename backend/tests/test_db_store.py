@@ -0,0 +1,103 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from services.db_service import MongoStore, SqliteStore
+
+
+def sqlite_store(tmp_path):
+    return SqliteStore(str(tmp_path / "jarvis.sqlite3"))
+
+
+def mongo_store(tmp_path):
+    mongomock = pytest.importorskip("mongomock")
+    return MongoStore(mongomock.MongoClient()["jarvis_test"])
+
+
+@pytest.fixture(params=[sqlite_store, mongo_store], ids=["sqlite", "mongo"])
+def store(request, tmp_path):
+    store = request.param(tmp_path)
+    yield store
+    asyncio.run(store.close())
+
+
+def docs(n, start=None):
+    start = start or datetime.now(timezone.utc) - timedelta(minutes=n)
+    return [
+        {"client_id": "a" if i % 2 else "b", "kind": "turn", "n": i, "ts": start + timedelta(seconds=i)}
+        for i in range(n)
+    ]
+
+
+def test_round_trip_newest_first(store):
+    async def run():
+        await store.ensure_collection("logs", 3600, [[("client_id", 1), ("ts", -1)]])
+        await store.insert_many("logs", docs(10))
+        return await store.count("logs"), await store.find("logs", {"client_id": "a"}, limit=3)
+
+    count, found = asyncio.run(run())
+    assert count == 10
+    assert [d["n"] for d in found] == [9, 7, 5]
+    assert all("_id" not in d for d in found)
+
+
+def test_empty_collection_and_filters(store):
+    async def run():
+        await store.ensure_collection("logs")
+        await store.insert_many("logs", [])
+        await store.insert_many("logs", docs(4))
+        return (
+            await store.find("logs", {"client_id": "nobody"}),
+            await store.find("logs", {"client_id": "b", "kind": "turn"}, limit=10),
+        )
+
+    missing, both = asyncio.run(run())
+    assert missing == []
+    assert [d["n"] for d in both] == [2, 0]
+
+
+def test_sqlite_purges_expired_documents(tmp_path, configure):
+    configure(SQLITE_PURGE_INTERVAL=0)
+    store = sqlite_store(tmp_path)
+    old = datetime.now(timezone.utc) - timedelta(hours=2)
+
+    async def run():
+        await store.ensure_collection("logs", ttl=3600)
+        await store.insert_many("logs", docs(3, start=old))
+        await store.insert_many("logs", docs(2))   # Triggers the purge
+        return await store.count("logs")
+
+    try:
+        assert asyncio.run(run()) == 2
+        assert store.metrics()["purged"] == 3
+    finally:
+        asyncio.run(store.close())
+
+
+def test_sqlite_persists_across_reopen(tmp_path):
+    first = sqlite_store(tmp_path)
+
+    async def write():
+        await first.ensure_collection("sessions")
+        await first.insert_many("sessions", [{"client_id": "a", "ts": time.time(), "text": "héllo"}])
+        await first.close()
+
+    asyncio.run(write())
+    second = sqlite_store(tmp_path)
+    try:
+        assert asyncio.run(second.find("sessions"))[0]["text"] == "héllo"
+    finally:
+        asyncio.run(second.close())
+
+
+def test_sqlite_rejects_unsafe_names(tmp_path):
+    store = sqlite_store(tmp_path)
+    try:
+        with pytest.raises(ValueError):
+            asyncio.run(store.ensure_collection('logs"; DROP TABLE x; --'))
+        with pytest.raises(ValueError):
+            asyncio.run(store.find("logs", {"a') OR 1=1 --": 1}))
+    finally:
+        asyncio.run(store.close())
@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+from services.db_service import MongoStore, SqliteStore
+from services.interaction_log import InteractionLog, compact
+
+
+@pytest.fixture(params=["sqlite", "mongo"])
+def store(request, tmp_path):
+    if request.param == "mongo":
+        mongomock = pytest.importorskip("mongomock")
+        store = MongoStore(mongomock.MongoClient()["jarvis_test"])
+    else:
+        store = SqliteStore(str(tmp_path / "log.sqlite3"))
+    yield store
+    asyncio.run(store.close())
+
+
+def test_batches_are_written_per_collection(store, configure):
+    configure(LOG_BATCH_SIZE=3, LOG_FLUSH_INTERVAL=0.05)
+    log = InteractionLog(store)
+
+    async def run():
+        await log.start()
+        for i in range(7):
+            log.interaction(client_id="a", command=f"c{i}")
+        log.error(client_id="a", error="boom")
+        await log.stop()
+        return await store.count("interactions"), await store.count("errors")
+
+    assert asyncio.run(run()) == (7, 1)
+    assert log.stats["written"] == 8 and log.stats["batches"] >= 3
+    assert log.metrics()["queue"] == 0
+
+
+def test_backpressure_drops_instead_of_blocking(store, configure):
+    configure(LOG_QUEUE_MAX=5, LOG_SAMPLE_ABOVE=1.0, LOG_FLUSH_INTERVAL=60)
+    log = InteractionLog(store)
+
+    async def run():
+        await log.start()
+        kept = [log.record("interactions", {"n": i}) for i in range(8)]
+        await log.stop()
+        return kept
+
+    assert asyncio.run(run()) == [True] * 5 + [False] * 3
+    assert log.stats["dropped"] == 3
+
+
+def test_failed_flush_sheds_the_backlog(configure):
+    configure(LOG_BATCH_SIZE=2)
+
+    class DownStore:
+        async def ensure_collection(self, *args):
+            pass
+
+        async def insert_many(self, name, docs):
+            raise ConnectionError("mongod unreachable")
+
+    log = InteractionLog(DownStore())
+    log.running = True
+    for i in range(5):
+        log.record("interactions", {"n": i})
+
+    assert asyncio.run(log.flush()) is False
+    assert log.stats["failed"] == 5 and not log.queue
+
+
+def test_compact_bounds_payloads(configure):
+    configure(LOG_MAX_FIELD_CHARS=5, LOG_MAX_LIST_ITEMS=2)
+    out = compact({"text": "abcdefgh", "items": [1, 2, 3], "obj": object()})
+    assert out["text"] == "abcde…"
+    assert out["items"] == [1, 2]
+    assert isinstance(out["obj"], str)
@@ -0,0 +1,111 @@
+import asyncio
+import time
+import zlib
+
+import numpy as np
+import pytest
+
+from services.memory_lexicon import MemoryLexicon
+from services.memory_lifecycle import MemoryCompactor
+from services.quantized_index import QuantizedIndex
+from services.vector_service import VectorService
+
+STALE = time.time() - 90 * 86400
+
+
+class TopicEmbedder:
+    """Deterministic vectors: texts sharing the part after ':' are identical."""
+
+    def _vectors(self, texts):
+        out = []
+        for text in texts:
+            v = np.random.default_rng(zlib.crc32(text.split(":")[-1].encode())).normal(size=16)
+            out.append(v / np.linalg.norm(v))
+        return np.array(out, dtype=np.float32)
+
+    def encode(self, texts):
+        return self._vectors(texts)
+
+    async def embed_many(self, texts):
+        return self._vectors(texts)
+
+
+@pytest.fixture
+def vectors(tmp_path, configure):
+    configure(QUANT_SEARCH="exact", MEMORY_SUMMARY_GROUP=20, MEMORY_DEFAULT_TTL=0)
+    backend = QuantizedIndex(root=str(tmp_path / "q"))
+    yield VectorService(TopicEmbedder(), backend, MemoryLexicon(str(tmp_path / "lexicon.sqlite3")))
+    backend.close()
+
+
+def documents(vectors, client_id):
+    return vectors.backend.get({"client_id": client_id})["documents"]
+
+
+def test_merge_with_a_permanent_copy_never_expires(vectors):
+    async def run():
+        await vectors.add_memories([("a:temporary fact", {"client_id": "u", "ttl": 0.05})])
+        await vectors.add_memories([("b:temporary fact", {"client_id": "u"})])
+        await asyncio.sleep(0.1)
+        await MemoryCompactor(vectors).compact()
+
+    asyncio.run(run())
+    meta = vectors.backend.get({"client_id": "u"})["metadatas"]
+    assert len(meta) == 1 and meta[0]["expires_at"] == 0
+
+
+def test_ttl_memories_expire(vectors):
+    async def run():
+        await vectors.add_memories([("a:short lived", {"client_id": "u", "ttl": 0.05})])
+        await asyncio.sleep(0.1)
+        return await MemoryCompactor(vectors).compact()
+
+    assert asyncio.run(run())["expired"] == 1
+    assert documents(vectors, "u") == []
+
+
+def test_stale_memories_are_summarised_not_dropped(vectors):
+    calls = []
+
+    async def summarise(texts):
+        calls.append(len(texts))
+        return f"summary of {len(texts)}"
+
+    stale = {"created": STALE, "last_seen": STALE}
+
+    async def run():
+        await vectors.add_memories(
+            [(f"m{i}:fact {i}", {"client_id": "many", **stale}) for i in range(21)]
+            + [("x:lone fact", {"client_id": "lone", **stale}),
+               ("y:unimportant", {"client_id": "low", "importance": 0.1, **stale}),
+               ("p:from search", {"client_id": "mixed", "source": "search", **stale}),
+               ("q:from chat", {"client_id": "mixed", "source": "chat", **stale})]
+        )
+        compactor = MemoryCompactor(vectors)
+        compactor.set_summarizer(summarise)
+        return await compactor.compact()
+
+    stats = asyncio.run(run())
+    assert sorted(calls) == [2, 21]   # The 21st memory joins the previous chunk
+    assert documents(vectors, "many") == ["summary of 21"]
+    assert documents(vectors, "mixed") == ["summary of 2"]
+    assert documents(vectors, "lone") == ["x:lone fact"]
+    assert documents(vectors, "low") == []
+    assert stats["kept"] == 1
+
+
+def test_failed_summary_keeps_the_group(vectors):
+    async def down(texts):
+        raise ConnectionError("ollama unreachable")
+
+    async def run():
+        await vectors.add_memories(
+            [(f"m{i}:fact {i}", {"client_id": "u", "created": STALE, "last_seen": STALE}) for i in range(3)]
+        )
+        compactor = MemoryCompactor(vectors)
+        compactor.set_summarizer(down)
+        return await compactor.compact()
+
+    stats = asyncio.run(run())
+    assert stats["evicted"] == 0 and stats["kept"] == 3
+    assert len(documents(vectors, "u")) == 3
@@ -0,0 +1,64 @@
+import asyncio
+import sys
+import time
+
+import pytest
+
+from services.process_service import ProcessService
+
+
+def python(code):
+    return [sys.executable, "-c", code]
+
+
+@pytest.fixture(params=[False, True], ids=["asyncio", "threaded"])
+def service(request, configure):
+    configure(PROC_KILL_GRACE=0.5)
+    service = ProcessService()
+    service.threaded = request.param
+    return service
+
+
+def test_output_is_captured_and_capped(service, configure):
+    configure(PROC_MAX_OUTPUT_BYTES=1000)
+    lines = []
+
+    async def sink(process_id, stream, line):
+        lines.append((stream, line))
+
+    code = "import sys; print('hi'); print('err', file=sys.stderr); sys.stdout.write('x' * 100000)"
+    mp = asyncio.run(service.run(python(code), timeout=10, sink=sink))
+    assert (mp.status, mp.returncode) == ("exited", 0)
+    assert mp.total_bytes["stdout"] > 100000 and len(mp.output["stdout"]) == 1000
+    assert mp.truncated and "more bytes truncated" in mp.text("stdout")
+    assert ("stdout", "hi") in lines and ("stderr", "err") in lines
+
+
+def test_timeout_kills_a_silent_process(service):
+    start = time.monotonic()
+    mp = asyncio.run(service.run(python("import time; time.sleep(30)"), timeout=0.3))
+    assert mp.status == "timeout"
+    assert mp.returncode is not None and mp.returncode != 0
+    assert time.monotonic() - start < 5
+
+
+def test_timeout_covers_a_child_that_closed_its_pipes(service):
+    code = "import os, time; os.close(1); os.close(2); time.sleep(30)"
+    start = time.monotonic()
+    mp = asyncio.run(service.run(python(code), timeout=0.5))
+    assert mp.status == "timeout"
+    assert time.monotonic() - start < 5
+    assert not service.running
+
+
+def test_wait_returns_early_and_cancel_stops_it(service):
+    async def run():
+        mp = await service.run(python("import time; time.sleep(30)"), timeout=30, wait=0.1)
+        assert mp.status == "running"
+        assert [p["id"] for p in service.list()] == [mp.id]
+        assert await service.cancel(mp.id)
+        return mp
+
+    mp = asyncio.run(run())
+    assert mp.status == "cancelled"
+    assert service.get(mp.id) is mp and not service.running
@@ -0,0 +1,114 @@
+import numpy as np
+import pytest
+
+from services.quantized_index import QuantizedIndex, where_sql
+
+
+def unit_vectors(n, dim=16, seed=0):
+    v = np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+    return v / np.linalg.norm(v, axis=1, keepdims=True)
+
+
+@pytest.fixture
+def index(tmp_path, configure):
+    configure(QUANT_SEARCH="exact")
+    idx = QuantizedIndex(root=str(tmp_path / "q"))
+    yield idx
+    idx.close()
+
+
+def fill(index, n=50):
+    vectors = unit_vectors(n)
+    index.add(
+        ids=[f"m{i}" for i in range(n)],
+        embeddings=vectors,
+        documents=[f"doc {i}" for i in range(n)],
+        metadatas=[{"client_id": "a" if i % 2 else "b", "importance": i / n} for i in range(n)],
+    )
+    return vectors
+
+
+def test_where_sql_translates_nested_conditions():
+    sql, params = where_sql({"$and": [{"expires_at": {"$gt": 0}}, {"expires_at": {"$lte": 10}}]})
+    assert sql == "((json_extract(metadata, ?) > ?) AND (json_extract(metadata, ?) <= ?))"
+    assert params == ["$.expires_at", 0, "$.expires_at", 10]
+
+    sql, params = where_sql({"client_id": "a", "source": {"$in": ["x", "y"]}})
+    assert "IN (?,?)" in sql and params == ["$.client_id", "a", "$.source", "x", "y"]
+
+
+def test_where_sql_edge_cases():
+    assert where_sql({"source": {"$in": []}}) == ("(0)", [])
+    assert where_sql({"source": {"$nin": []}}) == ("(1)", [])
+    with pytest.raises(ValueError):
+        where_sql({"source": {"$regex": "x"}})
+    with pytest.raises(ValueError):
+        where_sql({"source": {"$in": "x"}})
+
+
+def test_query_finds_the_stored_vector(index):
+    vectors = fill(index)
+    res = index.query(vectors[[7, 20]], n_results=3)
+    assert [ids[0] for ids in res["ids"]] == ["m7", "m20"]
+    assert res["documents"][0][0] == "doc 7"
+    assert res["distances"][0][0] == pytest.approx(0.0, abs=0.02)   # int8 rounding only
+    assert res["distances"][0] == sorted(res["distances"][0])
+
+
+def test_where_filter_applies_before_top_k(index):
+    vectors = fill(index)
+    res = index.query(vectors[[8]], n_results=5, where={"client_id": "a"})
+    assert len(res["ids"][0]) == 5
+    assert all(m["client_id"] == "a" for m in res["metadatas"][0])
+    assert "m8" not in res["ids"][0]
+
+
+def test_delete_update_and_compact(index):
+    vectors = fill(index, 10)
+    index.delete(["m3", "m4"])
+    assert index.count() == 8
+    assert "m3" not in index.query(vectors[[3]], n_results=10)["ids"][0]
+
+    index.update(["m5"], [{"client_id": "c"}])
+    assert index.get({"client_id": "c"})["ids"] == ["m5"]
+
+    assert index.compact() == 2
+    assert index.metrics()["tombstones"] == 0
+    assert index.query(vectors[[9]], n_results=1)["ids"][0] == ["m9"]
+
+
+def test_readding_an_id_replaces_it(index):
+    fill(index, 4)
+    replacement = unit_vectors(1, seed=99)
+    index.add(["m1"], replacement, ["new"], [{"client_id": "z"}])
+    assert index.count() == 4
+    assert index.query(replacement, n_results=1)["documents"][0] == ["new"]
+
+
+def test_reopen_from_disk(tmp_path, configure):
+    configure(QUANT_SEARCH="exact")
+    root = str(tmp_path / "q")
+    first = QuantizedIndex(root=root)
+    vectors = fill(first, 20)
+    first.delete(["m0"])
+    first.close()
+
+    second = QuantizedIndex(root=root)
+    try:
+        assert second.count() == 19
+        assert second.query(vectors[[12]], n_results=1)["ids"][0] == ["m12"]
+        assert second.get({"client_id": "b"}, limit=3)["ids"] == ["m2", "m4", "m6"]
+    finally:
+        second.close()
+
+
+def test_ivf_search_matches_exact_top_hit(tmp_path, configure):
+    configure(QUANT_SEARCH="ivf", QUANT_IVF_NPROBE=4)
+    idx = QuantizedIndex(root=str(tmp_path / "q"))
+    try:
+        vectors = fill(idx, 200)
+        idx.train(nlist=8)
+        res = idx.query(vectors[[42, 150]], n_results=1)
+        assert [ids[0] for ids in res["ids"]] == ["m42", "m150"]
+    finally:
+        idx.close()
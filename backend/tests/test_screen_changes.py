@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+
+from services.screen_service import ScreenWatcher, dirty_rects, tile_changes
+
+
+def reference_changes(previous, current, tile, stride):
+    """Per-tile mean over the subsampled pixels, one tile at a time."""
+    rows, cols = -(-previous.shape[0] // tile), -(-previous.shape[1] // tile)
+    out = np.zeros((rows, cols))
+    for r in range(rows):
+        for c in range(cols):
+            ys = [y for y in range(0, previous.shape[0], stride) if y // tile == r] or [previous.shape[0] - 1]
+            xs = [x for x in range(0, previous.shape[1], stride) if x // tile == c] or [previous.shape[1] - 1]
+            a = previous[np.ix_(ys, xs)][:, :, 1].astype(int)
+            b = current[np.ix_(ys, xs)][:, :, 1].astype(int)
+            out[r, c] = np.abs(b - a).mean()
+    return out
+
+
+@pytest.mark.parametrize("stride", [1, 2, 3, 4, 5, 7, 16, 40])
+@pytest.mark.parametrize("shape", [(96, 128), (100, 70), (33, 65)])
+def test_tile_changes_matches_reference(stride, shape):
+    rng = np.random.default_rng(stride)
+    previous = rng.integers(0, 256, (*shape, 3), dtype=np.uint8)
+    current = previous.copy()
+    current[40:60, 10:30] = rng.integers(0, 256, (20, 20, 3), dtype=np.uint8)[: current[40:60, 10:30].shape[0]]
+
+    got = tile_changes(previous, current, tile=16, stride=stride)
+    assert got.shape == (-(-shape[0] // 16), -(-shape[1] // 16))
+    np.testing.assert_allclose(got, reference_changes(previous, current, 16, min(stride, 16)))
+
+
+def test_narrow_edge_tile_is_still_sampled():
+    previous = np.zeros((100, 100, 3), dtype=np.uint8)
+    current = previous.copy()
+    current[97:, 97:] = 255   # Only inside the 4 px edge tiles, which stride 5 steps over
+
+    dirty = tile_changes(previous, current, tile=16, stride=5) > 4.0
+    assert np.argwhere(dirty).tolist() == [[6, 6]]
+
+
+def test_change_lands_in_the_right_tile_with_an_odd_stride():
+    previous = np.zeros((128, 128, 3), dtype=np.uint8)
+    current = previous.copy()
+    current[70:90, 100:120] = 255   # Tile (row 2, col 3) at 32 px
+
+    dirty = tile_changes(previous, current, tile=32, stride=3) > 4.0
+    assert np.argwhere(dirty).tolist() == [[2, 3]]
+
+
+def test_dirty_rects_respect_blocks_and_frame_edges():
+    mask = np.zeros((4, 6), dtype=bool)
+    mask[0:2, 0:6] = True
+    rects = dirty_rects(mask, tile=10, shape=(35, 55), block=(1, 0))
+    assert [r for r, _ in rects] == [(0, 0, 55, 10), (0, 10, 55, 10)]
+
+    rects = dirty_rects(mask, tile=10, shape=(35, 55), block=2)
+    assert len(rects) == 3
+    assert sum(len(tiles) for _, tiles in rects) == 12
+
+
+class FakeCapture:
+    available = True
+
+    def __init__(self, frame):
+        self.frame = frame
+
+    def grab(self):
+        return self.frame
+
+
+def test_watcher_reanalyses_only_changed_regions(configure):
+    configure(SCREEN_TILE_SIZE=32, SCREEN_DIFF_STRIDE=3, SCREEN_REGION_TILES=2, SCREEN_OCR_ENABLED=False)
+    capture = FakeCapture(np.zeros((128, 256, 3), dtype=np.uint8))
+    watcher = ScreenWatcher(capture)
+    seen = []
+    watcher.register("boxes", lambda crop, rect: seen.append(rect) or rect)
+
+    first = watcher.step()
+    assert first["analyses"] == 8 and first["pending"] == 0   # 4×8 tiles in 2×2 blocks
+
+    seen.clear()
+    assert watcher.step()["analyses"] == 0   # Static screen: diff only
+
+    frame = capture.frame.copy()
+    frame[5:20, 70:90] = 200
+    capture.frame = frame
+    assert watcher.step()["analyses"] == 1
+    assert seen == [(64, 0, 64, 64)]
+    assert len(watcher.results("boxes")) == 8
+
+
+def test_watcher_budget_defers_regions(configure):
+    configure(SCREEN_TILE_SIZE=32, SCREEN_REGION_TILES=1, SCREEN_OCR_ENABLED=False)
+    watcher = ScreenWatcher(FakeCapture(np.zeros((64, 64, 3), dtype=np.uint8)))
+    watcher.register("boxes", lambda crop, rect: rect)
+
+    assert watcher.step(budget=0)["pending"] == 4
+    second = watcher.step()
+    assert second["analyses"] == 4 and second["pending"] == 0
@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+
+from services.db_service import SqliteStore
+from services.session_service import SessionService
+
+
+@pytest.fixture
+def store(tmp_path, configure):
+    configure(SESSION_PERSIST=True, SESSION_MAX_TURNS=3, SESSION_RESTORE_TIMEOUT=1.0)
+    store = SqliteStore(str(tmp_path / "sessions.sqlite3"))
+    yield store
+    asyncio.run(store.close())
+
+
+def test_turns_and_summary_survive_a_restart(store):
+    async def first_run():
+        sessions = SessionService()
+        await sessions.start(store)
+        for i in range(5):
+            sessions.record_turn("client-1", f"question {i}", f"answer {i}")
+        sessions._persist("client-1", "summary", summary="Earlier questions 0 and 1.")
+        await sessions.stop()
+
+    async def second_run():
+        sessions = SessionService()
+        await sessions.start(store)
+        await sessions.restore("client-1")
+        return sessions
+
+    asyncio.run(first_run())
+    sessions = asyncio.run(second_run())
+    session = sessions.sessions["client-1"]
+    assert [t.user for t in session.turns] == ["question 2", "question 3", "question 4"]
+    assert session.summary == "Earlier questions 0 and 1."
+    assert not session.pending
+    assert "Earlier: Earlier questions 0 and 1." in sessions.context_for("client-1")
+    assert sessions.persist_stats["restored"] == 1
+
+
+def test_restore_keeps_a_live_session(store):
+    async def run():
+        sessions = SessionService()
+        await sessions.start(store)
+        sessions.record_turn("client-1", "stored", "turn")
+        await sessions.stop()
+
+        sessions = SessionService()
+        await sessions.start(store)
+        sessions.record_turn("client-1", "live", "turn")
+        await sessions.restore("client-1")
+        await sessions.stop()
+        return sessions
+
+    sessions = asyncio.run(run())
+    assert [t.user for t in sessions.sessions["client-1"].turns] == ["live"]
+
+
+def test_unknown_client_and_slow_store(store):
+    class SlowStore:
+        async def ensure_collection(self, *args):
+            pass
+
+        async def find(self, *args):
+            await asyncio.sleep(5)
+            return []
+
+    async def run():
+        sessions = SessionService()
+        await sessions.start(store)
+        await sessions.restore("nobody")
+        slow = SessionService()
+        await slow.start(SlowStore())
+        await slow.restore("client-1", timeout=0.05)
+        return sessions, slow
+
+    sessions, slow = asyncio.run(run())
+    assert "nobody" not in sessions.sessions
+    assert "client-1" not in slow.sessions
+    assert slow.persist_stats["restore_misses"] == 1
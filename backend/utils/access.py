@@ -0,0 +1,60 @@
+"""
+JARVIS Access Guard
+─────────────────────────────
+Protects endpoints that expose the camera, processes or the desktop.
+
+Loopback clients are trusted while API_TRUST_LOCALHOST is on (turn it off
+behind a reverse proxy, where every request looks local), unless a browser
+sent the request from a page on another host (its Origin header), since
+CORS is open to every origin. Anyone else must
+present API_TOKEN as `Authorization: Bearer …`, an `X-API-Token` header or
+a `token` query parameter (for <img> and WebSocket URLs, which can't set
+headers). With no API_TOKEN configured, remote clients are refused.
+"""
+
+import hmac
+import ipaddress
+from urllib.parse import urlsplit
+
+from fastapi import HTTPException, Request, WebSocket, status
+from starlette.requests import HTTPConnection
+
+from app.config import settings
+
+
+def _is_loopback(host: str) -> bool:
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return host == "localhost"
+
+
+def presented_token(conn: HTTPConnection) -> str:
+    auth = conn.headers.get("authorization", "")
+    if auth.lower().startswith("bearer "):
+        return auth[7:].strip()
+    return conn.headers.get("x-api-token") or conn.query_params.get("token") or ""
+
+
+def allowed(conn: HTTPConnection) -> bool:
+    host = conn.client.host if conn.client else ""
+    origin = conn.headers.get("origin")
+    local_page = origin is None or _is_loopback(urlsplit(origin).hostname or "")
+    if settings.API_TRUST_LOCALHOST and _is_loopback(host) and local_page:
+        return True
+    token = presented_token(conn)
+    return bool(settings.API_TOKEN and token) and hmac.compare_digest(token.encode(), settings.API_TOKEN.encode())
+
+
+async def require_access(request: Request):
+    """Router/endpoint dependency: 403 unless the caller is local or holds the token."""
+    if not allowed(request):
+        raise HTTPException(status_code=403, detail="Local access or a valid API token is required")
+
+
+async def guard_websocket(websocket: WebSocket) -> bool:
+    """Close an unauthorised WebSocket before accepting it; True when it may proceed."""
+    if allowed(websocket):
+        return True
+    await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+    return False
@@ -0,0 +1,92 @@
+"""
+JARVIS Request Deadlines
+─────────────────────────────
+A per-request time budget created by the ChiefAgent and propagated to every
+agent through BaseAgent.execute. Agents read it via current_deadline() and
+degrade (fewer results, no fallbacks, no briefing) instead of overrunning.
+"""
+
+import math
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from app.config import settings
+
+
+class Deadline:
+    def __init__(self, budget: Optional[float] = None, label: str = ""):
+        self.budget = budget  # None → unbounded
+        self.label = label
+        self.started = time.monotonic()
+        self.stages_cut: List[str] = []
+
+    @classmethod
+    def for_source(cls, source: str) -> "Deadline":
+        """Pick the budget for a request based on where it came from."""
+        budgets = {
+            "voice_client": settings.DEADLINE_VOICE,
+            "dashboard": settings.DEADLINE_DASHBOARD,
+        }
+        budget = budgets.get(source, settings.DEADLINE_DEFAULT)
+        return cls(budget if budget > 0 else None, label=source)
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def remaining(self) -> float:
+        if self.budget is None:
+            return math.inf
+        return max(0.0, self.budget - self.elapsed)
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def allows(self, seconds: float = None) -> bool:
+        """True if at least `seconds` (default DEADLINE_MIN_STAGE) are left."""
+        if seconds is None:
+            seconds = settings.DEADLINE_MIN_STAGE
+        return self.remaining() >= seconds
+
+    def timeout(self, cap: Optional[float] = None) -> Optional[float]:
+        """Timeout for a single call: the remaining budget, optionally capped."""
+        remaining = self.remaining()
+        if cap is not None:
+            remaining = min(cap, remaining)
+        return None if math.isinf(remaining) else remaining
+
+    def cut(self, stage: str):
+        """Record a stage that was skipped or truncated to meet the deadline."""
+        if stage not in self.stages_cut:
+            self.stages_cut.append(stage)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "budget": self.budget,
+            "elapsed": round(self.elapsed, 3),
+            "stages_cut": list(self.stages_cut),
+        }
+
+    def __repr__(self):
+        return f"<Deadline label='{self.label}' remaining={self.remaining():.2f}>"
+
+
+_current: ContextVar[Optional[Deadline]] = ContextVar("jarvis_deadline", default=None)
+
+
+def current_deadline() -> Deadline:
+    """Deadline of the request being processed (unbounded outside a request)."""
+    deadline = _current.get()
+    return deadline if deadline is not None else Deadline()
+
+
+@contextmanager
+def use_deadline(deadline: Optional[Deadline]):
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
@@ -0,0 +1,17 @@
+"""
+Ranking helpers shared by hybrid (lexical + vector) retrieval.
+"""
+
+from typing import Dict, Hashable, Iterable, List
+
+
+def reciprocal_rank_fusion(rankings: Iterable[List[Hashable]], k: int = 60) -> Dict[Hashable, float]:
+    """
+    Fuse ranked id lists: score(d) = Σ 1 / (k + rank(d)), rank starting at 1.
+    Only ranks are used, so BM25 and cosine scores need no calibration.
+    """
+    fused: Dict[Hashable, float] = {}
+    for ranking in rankings:
+        for rank, key in enumerate(ranking, start=1):
+            fused[key] = fused.get(key, 0.0) + 1.0 / (k + rank)
+    return fused
@@ -28,9 +28,10 @@ class ConnectionManager:
     async def send_message(self, message: str, websocket: WebSocket):
         await websocket.send_text(message)
 
-    async def broadcast(self, message: str):
+    async def broadcast(self, message: str, exclude: WebSocket = None):
         for connection in self.active_connections:
-            await connection.send_text(message)
+            if connection is not exclude:
+                await connection.send_text(message)
 
 
 manager = ConnectionManager()
@@ -2,7 +2,11 @@
 WebSocket Routes
 ────────────────
 Handles the /ws/chief WebSocket endpoint.
-Streams LLM responses and executes agent actions.
+Streams LLM responses and executes agent actions (including shell commands),
+so it is limited to local clients or API_TOKEN holders (utils.access).
+
+/ws/hands streams hand-tracking landmark updates while connected; like the
+vision routes it is limited to local clients or API_TOKEN holders.
 """
 
 import json
@@ -11,6 +15,8 @@ import re
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
 from agents.chief_agent import chief_agent
+from services.hand_tracker import hand_tracker
+from utils.access import guard_websocket
 from utils.logger import log
 from .manager import manager
 
@@ -20,6 +26,9 @@ router = APIRouter()
 @router.websocket("/ws/chief")
 async def websocket_endpoint(websocket: WebSocket):
     log.info("WebSocket connection attempt on /ws/chief")
+    if not await guard_websocket(websocket):
+        log.warning("Refused /ws/chief connection (not local, no API token)")
+        return
     await manager.connect(websocket)
     try:
         while True:
@@ -33,3 +42,24 @@ async def websocket_endpoint(websocket: WebSocket):
     except Exception as e:
         log.error(f"WebSocket unexpected error: {e}")
         manager.disconnect(websocket)
+
+
+@router.websocket("/ws/hands")
+async def hands_endpoint(websocket: WebSocket):
+    if not await guard_websocket(websocket):
+        return
+    await websocket.accept()
+    if not hand_tracker.available:
+        await websocket.send_text(json.dumps({"type": "error", "message": "Hand tracking unavailable (needs mediapipe and cv2)"}))
+        await websocket.close()
+        return
+    await hand_tracker.add_listener(websocket)
+    try:
+        while True:
+            await websocket.receive_text()   # Only used to detect disconnects
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        log.error(f"Hands WebSocket error: {e}")
+    finally:
+        hand_tracker.remove_listener(websocket)
@@ -26,17 +26,31 @@ const VideoMessageItem = ({ vid, shouldPlay }) => {
             {isPlaying ? (
                 <video
                     src={vid.video_url}
+                    poster={vid.thumbnail}
                     controls
                     autoPlay
                     className="w-full h-full object-cover"
                 />
             ) : (
                 <>
-                    <img
-                        src={vid.thumbnail}
-                        alt={vid.title}
-                        className="w-full h-full object-cover opacity-70 group-hover:opacity-50 transition-opacity"
-                    />
+                    {vid.preview_url ? (
+                        // Short low-bitrate loop shown while the full video is not loaded
+                        <video
+                            src={vid.preview_url}
+                            poster={vid.thumbnail}
+                            muted
+                            autoPlay
+                            loop
+                            playsInline
+                            className="w-full h-full object-cover opacity-70 group-hover:opacity-50 transition-opacity"
+                        />
+                    ) : (
+                        <img
+                            src={vid.thumbnail}
+                            alt={vid.title}
+                            className="w-full h-full object-cover opacity-70 group-hover:opacity-50 transition-opacity"
+                        />
+                    )}
                     <div className="absolute inset-0 flex items-center justify-center">
                         <button
                             onClick={() => setIsPlaying(true)}
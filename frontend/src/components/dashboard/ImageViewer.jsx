@@ -8,6 +8,7 @@ import {
     ExternalLink,
     Image as ImageIcon,
 } from "lucide-react";
+import { sizedMediaUrl } from "../../utils/media";
 
 const ImageViewer = ({ images, activeIndex, onClose }) => {
     const [current, setCurrent] = useState(activeIndex || 0);
@@ -75,7 +76,7 @@ const ImageViewer = ({ images, activeIndex, onClose }) => {
                 {/* Main Image Container */}
                 <div className="relative flex-1 min-h-0 rounded-3xl overflow-hidden bg-white/[0.02] border border-white/10 shadow-2xl flex items-center justify-center group">
                     <img
-                        src={img?.image_url || img?.thumbnail}
+                        src={sizedMediaUrl(img?.image_url || img?.thumbnail, Math.min(window.innerWidth, 1024))}
                         alt={img?.title || "Image"}
                         className="max-w-full max-h-[70vh] object-contain transition-transform duration-500 group-hover:scale-[1.01]"
                         onError={(e) => {
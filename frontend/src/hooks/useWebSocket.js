@@ -1,6 +1,30 @@
 import { useState, useEffect, useRef, useCallback } from 'react';
 
 const WS_URL = 'ws://127.0.0.1:8000/ws/chief';
+// Per-tab id (kept across reloads) so the backend can keep conversation context across turns
+const stored = (storage, key, make) => {
+    try {
+        const value = storage.getItem(key) || make();
+        storage.setItem(key, value);
+        return value;
+    } catch {
+        return make();   // Storage disabled: fall back to a per-load id
+    }
+};
+const CLIENT_ID = stored(window.sessionStorage, 'jarvis-client-id', () => `dash-${Math.random().toString(36).slice(2, 10)}`);
+// Long-term memory owner; unset means the server default (MEMORY_USER_ID), shared with the voice client
+const USER_ID = (() => { try { return window.localStorage.getItem('jarvis-user-id') || undefined; } catch { return undefined; } })();
+
+// Viewport/bandwidth hints so the backend can pick lighter media renditions
+const clientHints = () => {
+    const conn = navigator.connection || {};
+    return {
+        viewport_width: window.innerWidth,
+        dpr: window.devicePixelRatio || 1,
+        downlink_mbps: conn.downlink,
+        save_data: Boolean(conn.saveData),
+    };
+};
 
 export const useWebSocket = () => {
     const [isConnected, setIsConnected] = useState(false);
@@ -103,7 +127,7 @@ export const useWebSocket = () => {
 
     const sendMessage = useCallback((command) => {
         if (ws.current && isConnected) {
-            ws.current.send(JSON.stringify({ command, source: "dashboard" }));
+            ws.current.send(JSON.stringify({ command, source: "dashboard", client_id: CLIENT_ID, user_id: USER_ID, client_hints: clientHints() }));
         } else {
             console.warn("WebSocket is not connected");
         }
@@ -0,0 +1,14 @@
+// Helpers for URLs served by the backend media proxy (/api/media).
+
+const MAX_WIDTH = 1920;
+
+// Re-target a proxied image URL at the given CSS width (device pixels included).
+// Non-proxied URLs are returned unchanged.
+export const sizedMediaUrl = (url, cssWidth) => {
+    if (!url || !url.includes("/api/media?")) return url;
+    const dpr = window.devicePixelRatio || 1;
+    const width = Math.min(MAX_WIDTH, Math.round(cssWidth * dpr));
+    const u = new URL(url, window.location.href);
+    u.searchParams.set("w", String(width));
+    return u.toString();
+};